@@ -3,26 +3,109 @@ PepHaul Order Form - Web Application
 Full order management with payment tracking and admin controls
 """
 
-from flask import Flask, render_template, request, jsonify, session, make_response
+from flask import Flask, render_template, request, jsonify, session, make_response, g, stream_with_context, has_request_context
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
 import base64
 import math
 import html
+import logging
+import re as _re
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
+from itertools import islice, zip_longest
+from operator import itemgetter
 import secrets
+import random
+import threading
 import time
+import traceback
 
 # Load environment variables
 load_dotenv()
 
+try:
+    import orjson
+except ImportError:  # optional speedup - falls back to Flask's stdlib json provider
+    orjson = None
+
+# orjson flags shared by every orjson encode below (the provider, _dumps_bytes)
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+if orjson is not None:
+    from flask.json.provider import DefaultJSONProvider
+
+    class OrjsonProvider(DefaultJSONProvider):
+        """Serialize jsonify() responses with orjson (large order/product listings)"""
+
+        def dumps(self, obj, **kwargs):
+            option = ORJSON_OPTIONS
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            if kwargs.get('sort_keys', self.sort_keys):
+                option |= orjson.OPT_SORT_KEYS
+            try:
+                return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+            except (TypeError, orjson.JSONEncodeError):
+                # e.g. ints beyond 64 bits - let the stdlib encoder handle it
+                return super().dumps(obj, **kwargs)
+
+        def loads(self, s, **kwargs):
+            # orjson.JSONDecodeError is a ValueError, so request.get_json() error handling is unchanged
+            return orjson.loads(s)
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+# No key sorting / pretty-printing for API responses (Flask 3 equivalents of JSON_SORT_KEYS / JSONIFY_PRETTYPRINT_REGULAR)
+app.json.sort_keys = False
+app.json.compact = True
 app.secret_key = os.getenv('SECRET_KEY', secrets.token_hex(32))
 
+def _dumps_bytes(obj):
+    """Encode one JSON value to bytes (orjson when available, else the app's JSON provider)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=app.json.default, option=ORJSON_OPTIONS)
+        except (TypeError, orjson.JSONEncodeError):
+            pass
+    return app.json.dumps(obj).encode('utf-8')
+
+def fast_json_response(payload, status=200):
+    """jsonify() for the large list endpoints - encodes straight to bytes with orjson when available"""
+    return app.response_class(_dumps_bytes(payload), status=status, mimetype='application/json')
+
+def stream_json_array(items, chunk_size=64):
+    """Stream a list as a JSON array, encoding chunk_size elements at a time instead of one big body"""
+    def generate():
+        yield b'['
+        chunk = []
+        for i, item in enumerate(items):
+            # Separator travels with its element so len(chunk) counts items, not items + commas
+            chunk.append(b',' + _dumps_bytes(item) if i else _dumps_bytes(item))
+            if len(chunk) >= chunk_size:
+                yield b''.join(chunk)
+                chunk = []
+        chunk.append(b']')
+        yield b''.join(chunk)
+    return app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+# Debug diagnostics go through logging so they cost nothing unless LOG_LEVEL=DEBUG.
+# Only this module's logger is configured - the root logger is left to gunicorn / the host.
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    logger.addHandler(_log_handler)
+    logger.propagate = False  # own handler - don't print twice if the root logger also has one
+
 # Configuration
 ADMIN_FEE_PHP = float(os.getenv('ADMIN_FEE_PHP', 300))  # Base rate for tiered calculation (₱300 per 50 vials)
 FALLBACK_EXCHANGE_RATE = float(os.getenv('FALLBACK_EXCHANGE_RATE', 59.95))
@@ -37,7 +120,14 @@ TELEGRAM_BOT_USERNAME = os.getenv('TELEGRAM_BOT_USERNAME', 'pephaul_bot')  # Bot
 # Simple cache to reduce Google Sheets API calls
 _cache = {}
 _cache_timestamps = {}
+# '_'-terminated key prefix -> cached keys under it ('order_stats_' -> {'order_stats_PepHaul Entry-01', ...}),
+# so prefix invalidation only touches the matching keys instead of scanning the whole cache
+_cache_prefix_index = defaultdict(set)
+_cache_prefix_index_lock = threading.Lock()
 CACHE_DURATION = 60  # seconds - default fallback cache duration
+# Per-key locks so concurrent misses on the same key trigger a single refill
+_cache_refill_locks = defaultdict(threading.Lock)
+_cache_refill_locks_guard = threading.Lock()
 # In-memory qty-change tracker for richer finalize Telegram summaries.
 # Shape: {order_id: {"PRODUCT||type": {"old_qty": int, "new_qty": int}}}
 _order_qty_change_log = {}
@@ -192,6 +282,39 @@ def _normalize_order_record_keys(record):
             out[ks] = v
     return out
 
+def _is_rate_limit_error(e):
+    """True for Google Sheets quota / rate-limit errors (HTTP 429)"""
+    error_str = str(e)
+    return '429' in error_str or 'RESOURCE_EXHAUSTED' in error_str or 'RATE_LIMIT_EXCEEDED' in error_str
+
+# Caps in-flight Sheets writes so concurrent requests don't burst through the per-user write quota
+SHEETS_WRITE_SEMAPHORE = threading.Semaphore(5)
+
+def retry_on_429(max_retries=5, base_delay=1.0):
+    """Retry a Sheets call on 429 with exponential backoff + jitter (honours Retry-After when present)"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(max_retries):
+                try:
+                    with SHEETS_WRITE_SEMAPHORE:
+                        return func(*args, **kwargs)
+                except Exception as e:
+                    if not _is_rate_limit_error(e) or attempt >= max_retries - 1:
+                        raise
+                    wait_time = base_delay * (2 ** attempt)
+                    response = getattr(e, 'response', None)
+                    retry_after = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+                    try:
+                        wait_time = max(wait_time, float(retry_after))
+                    except (TypeError, ValueError):
+                        pass
+                    wait_time += random.uniform(0, base_delay)
+                    print(f"Rate limit hit in {func.__name__}, retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})")
+                    time.sleep(wait_time)
+        return wrapper
+    return decorator
+
 def get_cached(key, fetch_func, cache_duration=CACHE_DURATION):
     """Get cached data or fetch if expired - with rate limit protection"""
     now = time.time()
@@ -199,7 +322,17 @@ def get_cached(key, fetch_func, cache_duration=CACHE_DURATION):
         if now - _cache_timestamps[key] < cache_duration:
             return _cache[key]
     
-    # Cache miss or expired - fetch new data with retry logic
+    with _cache_refill_locks_guard:
+        refill_lock = _cache_refill_locks[key]
+    with refill_lock:
+        # Another thread may have refilled while we waited
+        if key in _cache and key in _cache_timestamps:
+            if time.time() - _cache_timestamps[key] < cache_duration:
+                return _cache[key]
+        return _refill_cache(key, fetch_func, time.time())
+
+def _refill_cache(key, fetch_func, now):
+    """Fetch and store a cache entry with retry logic (caller holds the key's refill lock)"""
     max_retries = 3
     retry_delay = 1
     
@@ -208,13 +341,11 @@ def get_cached(key, fetch_func, cache_duration=CACHE_DURATION):
             data = fetch_func()
             # Only cache non-None values
             if data is not None:
-                _cache[key] = data
-                _cache_timestamps[key] = now
+                cache_set(key, data, now)
             return data
         except Exception as e:
-            error_str = str(e)
             # Check for rate limit error
-            if ('429' in error_str or 'RESOURCE_EXHAUSTED' in error_str or 'RATE_LIMIT_EXCEEDED' in error_str) and attempt < max_retries - 1:
+            if _is_rate_limit_error(e) and attempt < max_retries - 1:
                 wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
                 print(f"Rate limit hit for {key}, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
                 time.sleep(wait_time)
@@ -222,23 +353,76 @@ def get_cached(key, fetch_func, cache_duration=CACHE_DURATION):
             # If it's not a rate limit error or we've exhausted retries, raise
             raise
 
+def _cache_is_fresh(key, cache_duration=CACHE_DURATION):
+    """True if key holds a cached value younger than cache_duration"""
+    return key in _cache and time.time() - _cache_timestamps.get(key, 0) < cache_duration
+
+def cache_peek(key, default=None):
+    """Last cached value for key regardless of age (no fetch, no expiry check)"""
+    return _cache.get(key, default)
+
+def _cache_key_prefixes(key):
+    """Every '_'-terminated prefix of a cache key ('order_stats_X' -> 'order_', 'order_stats_')"""
+    if not isinstance(key, str):
+        return []
+    return [key[:i + 1] for i, ch in enumerate(key) if ch == '_']
+
+def cache_set(key, data, now=None):
+    """Store a cache entry and register it in the prefix index"""
+    _cache[key] = data
+    _cache_timestamps[key] = time.time() if now is None else now
+    prefixes = _cache_key_prefixes(key)
+    if prefixes:
+        with _cache_prefix_index_lock:
+            for prefix in prefixes:
+                _cache_prefix_index[prefix].add(key)
+
+def _cache_drop(key):
+    """Remove one cache entry and its prefix index entries"""
+    _cache.pop(key, None)
+    _cache_timestamps.pop(key, None)
+    prefixes = _cache_key_prefixes(key)
+    if prefixes:
+        with _cache_prefix_index_lock:
+            for prefix in prefixes:
+                keys = _cache_prefix_index.get(prefix)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del _cache_prefix_index[prefix]
+
 def clear_cache(key=None):
     """Clear specific cache key or all cache"""
     if key:
-        _cache.pop(key, None)
-        _cache_timestamps.pop(key, None)
+        _cache_drop(key)
     else:
         _cache.clear()
         _cache_timestamps.clear()
-
-def clear_cache_prefix(prefix: str):
-    """Clear cached keys starting with prefix (e.g., 'orders_')."""
-    if not prefix:
+        with _cache_prefix_index_lock:
+            _cache_prefix_index.clear()
+
+def clear_cache_prefix(*prefixes: str):
+    """Clear cached keys starting with any of the prefixes (e.g., 'orders_').
+    Prefixes ending in '_' are looked up in the prefix index; anything else falls back to a scan."""
+    prefixes = tuple(p for p in prefixes if p)
+    if not prefixes:
         return
-    for k in list(_cache.keys()):
-        if isinstance(k, str) and k.startswith(prefix):
-            _cache.pop(k, None)
-            _cache_timestamps.pop(k, None)
+    keys = set()
+    with _cache_prefix_index_lock:
+        for prefix in prefixes:
+            if prefix.endswith('_'):
+                keys.update(_cache_prefix_index.get(prefix, ()))
+            else:
+                keys.update(k for k in list(_cache) if isinstance(k, str) and k.startswith(prefix))
+    for k in keys:
+        _cache_drop(k)
+
+def _first_present(record, *keys, default=''):
+    """Value of the first key present in record - same as nested record.get(a, record.get(b, ...)) without evaluating every fallback"""
+    for key in keys:
+        if key in record:
+            return record[key]
+    return default
 
 def normalize_telegram_username(username):
     """Normalize Telegram username for consistent matching."""
@@ -253,6 +437,10 @@ def _format_php(amount):
     except Exception:
         return "₱0.00"
 
+def _format_items(order):
+    """Bullet list of an order's items for Telegram messages."""
+    return '\n'.join(f"• {i['product_name']} ({i['order_type']} x{i['qty']})" for i in order.get('items', ()))
+
 def _to_float(value, default=0.0):
     """Safely cast arbitrary numeric-ish values to float."""
     try:
@@ -443,7 +631,6 @@ def _fetch_pephaulers_chat_map():
             chat_id = str(raw_chat_id).strip() if raw_chat_id is not None else ''
             if chat_id:
                 contacts[username] = chat_id
-                contacts[f"@{username}"] = chat_id
     except Exception as e:
         print(f"Could not load PepHaulers chat map: {e}")
 
@@ -506,16 +693,15 @@ def resolve_telegram_recipient(recipient):
     username = normalize_telegram_username(recipient)
     
     # First, check the telegram_customers mapping (users who have messaged the bot)
-    chat_id = telegram_customers.get(username) or telegram_customers.get(f"@{username}")
+    chat_id = telegram_customers.get(username)
     if chat_id:
         return str(chat_id)
 
     # Then check persisted contacts from PepHaulers sheet.
     sheet_contacts = get_cached('pephaulers_chat_map', _fetch_pephaulers_chat_map, cache_duration=300) or {}
-    chat_id = sheet_contacts.get(username) or sheet_contacts.get(f"@{username}")
+    chat_id = sheet_contacts.get(username)  # keyed by normalized username, like telegram_customers
     if chat_id:
-        telegram_customers[username] = str(chat_id)
-        telegram_customers[f"@{username}"] = str(chat_id)
+        telegram_customers.remember(username, chat_id)
         return str(chat_id)
     
     # Try to get chat ID from Telegram API (only works if user has messaged the bot)
@@ -523,14 +709,13 @@ def resolve_telegram_recipient(recipient):
         try:
             url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getChat"
             data = {'chat_id': f"@{username}"}
-            response = requests.post(url, data=data, timeout=5)
+            response = telegram_http.post(url, data=data, timeout=(3, 5))
             if response.status_code == 200:
                 result = response.json()
                 if result.get('ok') and result.get('result'):
                     chat_id = str(result['result'].get('id'))
                     # Cache it for future use
-                    telegram_customers[username] = chat_id
-                    telegram_customers[f"@{username}"] = chat_id
+                    telegram_customers.remember(username, chat_id)
                     upsert_pephauler_contact(username, chat_id)
                     print(f"Auto-resolved Telegram username @{username} to chat_id: {chat_id}")
                     return chat_id
@@ -696,6 +881,33 @@ def build_products_updated_summary(items):
 
     return "\n".join(lines)
 
+# Shared keep-alive session for Telegram Bot API calls - reuses pooled HTTPS connections instead of a new
+# TCP + TLS handshake per message. Only connection failures are retried (a retried sendMessage could double-post).
+telegram_http = requests.Session()
+telegram_http.mount('https://', HTTPAdapter(
+    pool_connections=2, pool_maxsize=10,
+    max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2)
+))
+# (connect, read) timeouts: fail fast when Telegram is unreachable, keep the read budget for slow replies
+TELEGRAM_TIMEOUT = (3, 10)
+
+# Telegram sends are slow HTTP calls - request handlers hand them off here instead of blocking the response
+_notification_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='notify')
+# Independent external reads a request overlaps with its own Sheets calls (result is awaited in the request)
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='prefetch')
+
+def _log_background_failure(future):
+    """Done-callback: surface exceptions from background notification tasks"""
+    exc = future.exception()
+    if exc is not None:
+        print(f"⚠️ Background notification failed: {exc}")
+
+def notify_in_background(func, *args, **kwargs):
+    """Run a notification function on the background pool (fire-and-forget, failures are logged)"""
+    future = _notification_executor.submit(func, *args, **kwargs)
+    future.add_done_callback(_log_background_failure)
+    return future
+
 def send_telegram_notification(message, parse_mode='HTML'):
     """Send notification to admin(s) via Telegram bot - supports multiple recipients (chat IDs or usernames)"""
     if not TELEGRAM_BOT_TOKEN:
@@ -752,9 +964,11 @@ def send_telegram_notification(message, parse_mode='HTML'):
             data = {
                 'chat_id': chat_id,
                 'text': message,
-                'parse_mode': parse_mode
+                'parse_mode': parse_mode,
+                # Notifications are short status messages; skip server-side link previews
+                'disable_web_page_preview': True
             }
-            response = requests.post(url, data=data, timeout=10)
+            response = telegram_http.post(url, json=data, timeout=TELEGRAM_TIMEOUT)
             if response.status_code == 200:
                 success_count += 1
                 print(f"Telegram notification sent successfully to chat_id: {chat_id}")
@@ -770,6 +984,20 @@ def send_telegram_notification(message, parse_mode='HTML'):
 VIALS_PER_KIT = 10
 MAX_KITS_DEFAULT = 100  # Default max kits per product
 
+# (products list, {code: vials_per_kit}) for the last products list seen - get_products() hands out
+# the same cached list until the price list is re-read, so the map is only rebuilt then
+_product_vials_index = (None, {})
+
+def get_product_vials_map(products=None):
+    """Product code -> vials per kit (rebuilt only when the products list changed)"""
+    global _product_vials_index
+    if products is None:
+        products = get_products()
+    cached = _product_vials_index
+    if cached[0] is not products:
+        cached = _product_vials_index = (products, {p['code']: p.get('vials_per_kit', VIALS_PER_KIT) for p in products})
+    return cached[1]
+
 def calculate_tiered_admin_fee(items, products=None):
     """
     Calculate tiered admin fee based on total vials ordered.
@@ -789,8 +1017,8 @@ def calculate_tiered_admin_fee(items, products=None):
     if products is None:
         products = get_products()
     
-    # Build product lookup for vials_per_kit
-    product_vials_map = {p['code']: p.get('vials_per_kit', VIALS_PER_KIT) for p in products}
+    # Product lookup for vials_per_kit
+    product_vials_map = get_product_vials_map(products)
     
     # Calculate total vials
     total_vials = 0
@@ -806,10 +1034,13 @@ def calculate_tiered_admin_fee(items, products=None):
             else:
                 total_vials += qty
     
-    # Tiered admin fee: ₱300 for every 50 vials (or part thereof)
-    admin_fee = math.ceil(total_vials / 50) * 300 if total_vials > 0 else 0
-    
-    return admin_fee
+    return admin_fee_for_vials(total_vials)
+
+def admin_fee_for_vials(total_vials):
+    """Tiered admin fee: ₱300 for every 50 vials (or part thereof), in integer arithmetic"""
+    if isinstance(total_vials, float):
+        total_vials = math.ceil(total_vials)  # fractional vial counts round up like before
+    return (total_vials + 49) // 50 * 300 if total_vials > 0 else 0
 
 
 # Supplier filter is controlled from Admin Panel and should be applied per PepHaul Entry tab.
@@ -953,6 +1184,21 @@ def infer_supplier_from_orders() -> str:
         pass
     return 'Default'
 
+# "PepHaul Entry" or "PepHaul Entry-NN" (group 1 = the number)
+_PEPHAUL_TAB_RE = _re.compile(r'^PepHaul Entry(?:-(\d+))?$')
+
+def pephaul_tab_sort_key(name):
+    """Sort "PepHaul Entry-01" first, then the old "PepHaul Entry", then other numbered tabs, then anything else"""
+    m = _PEPHAUL_TAB_RE.match(name)
+    if not m:
+        return (2, name)
+    num = m.group(1)
+    if num is None:
+        return (1, 0)  # Old unnumbered name
+    if num == '01':
+        return (0, 1)
+    return (1, int(num))
+
 def list_pephaul_tabs():
     """Get list of all PepHaul Entry tabs from Google Sheets"""
     if not sheets_client:
@@ -960,32 +1206,14 @@ def list_pephaul_tabs():
         return []
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        all_sheets = spreadsheet.worksheets()
-        
         # Filter tabs that start with "PepHaul Entry"
-        pephaul_tabs = [ws.title for ws in all_sheets if ws.title.startswith('PepHaul Entry')]
+        pephaul_tabs = [title for title in _sheet_titles(_get_spreadsheet()) if title.startswith('PepHaul Entry')]
         
         # Sort tabs: "PepHaul Entry-01" first, then other numbered ones, then old "PepHaul Entry"
-        def sort_key(name):
-            if name == 'PepHaul Entry-01':
-                return (0, 1)  # Highest priority
-            if name == 'PepHaul Entry':
-                return (1, 0)  # Second priority (old name)
-            # Extract number from "PepHaul Entry-02", "PepHaul Entry-03", etc.
-            if '-' in name:
-                try:
-                    num = int(name.split('-')[-1])
-                    return (1, num)  # After -01, sorted by number
-                except:
-                    return (2, name)
-            return (2, name)
-        
-        pephaul_tabs.sort(key=sort_key)
+        pephaul_tabs.sort(key=pephaul_tab_sort_key)
         return pephaul_tabs
     except Exception as e:
         print(f"❌ Error listing PepHaul tabs: {e}")
-        import traceback
         traceback.print_exc()
         return []
 
@@ -993,9 +1221,114 @@ def list_pephaul_tabs():
 sheets_client = None
 drive_service = None
 
+# Opened Spreadsheet handle + worksheets by title, reused so helpers skip the open_by_key/worksheet() metadata RPCs
+_SPREADSHEET_CACHE = {'spreadsheet': None, 'worksheets': {}}
+_spreadsheet_cache_lock = threading.Lock()
+
+def _get_spreadsheet():
+    """Get the (cached) opened Spreadsheet handle"""
+    with _spreadsheet_cache_lock:
+        if _SPREADSHEET_CACHE['spreadsheet'] is None:
+            _SPREADSHEET_CACHE['spreadsheet'] = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
+        return _SPREADSHEET_CACHE['spreadsheet']
+
+def _get_worksheet(name):
+    """Get a (cached) worksheet by title - raises if the worksheet does not exist"""
+    with _spreadsheet_cache_lock:
+        worksheet = _SPREADSHEET_CACHE['worksheets'].get(name)
+    if worksheet is not None:
+        return worksheet
+    try:
+        worksheet = _get_spreadsheet().worksheet(name)
+    except Exception as e:
+        # A missing tab only concerns that title; keep the Spreadsheet and other handles (fallback tabs,
+        # Product Locks, Timeline). Anything else (connection/auth) may mean a bad handle - drop it all.
+        invalidate_spreadsheet_cache(name if _is_missing_sheet_error(e) else None)
+        raise
+    with _spreadsheet_cache_lock:
+        _SPREADSHEET_CACHE['worksheets'][name] = worksheet
+    return worksheet
+
+def _remember_worksheet(worksheet):
+    """Cache a worksheet handle we just created"""
+    with _spreadsheet_cache_lock:
+        _SPREADSHEET_CACHE['worksheets'][worksheet.title] = worksheet
+    return worksheet
+
+def invalidate_spreadsheet_cache(name=None):
+    """Drop a cached worksheet handle (or everything) so the next lookup refetches it"""
+    with _spreadsheet_cache_lock:
+        if name:
+            _SPREADSHEET_CACHE['worksheets'].pop(name, None)
+        else:
+            _SPREADSHEET_CACHE['spreadsheet'] = None
+            _SPREADSHEET_CACHE['worksheets'].clear()
+
+def _is_missing_sheet_error(e):
+    """True when a call went to a tab/range that no longer exists (tab renamed or deleted under a cached handle)"""
+    if type(e).__name__ == 'WorksheetNotFound':
+        return True
+    error_str = str(e)
+    return 'Unable to parse range' in error_str or 'No grid with id' in error_str or 'NOT_FOUND' in error_str
+
+def drop_stale_pephaul_worksheet(e):
+    """After a missing-sheet error, forget the cached PepHaul Entry handles so the next lookup refetches/falls back"""
+    if _is_missing_sheet_error(e):
+        for name in _pephaul_worksheet_names():
+            invalidate_spreadsheet_cache(name)
+
+def _sheet_titles(spreadsheet):
+    """Titles of all tabs, from a metadata read limited to sheet titles (no Worksheet objects/grid properties)"""
+    meta = spreadsheet.fetch_sheet_metadata(params={'fields': 'sheets.properties.title'})
+    return [sheet['properties']['title'] for sheet in meta.get('sheets', [])]
+
+def sheet_column_index(headers):
+    """Header -> 0-based column position for a header row (first occurrence wins, like headers.index)"""
+    col_idx = {}
+    for i, header in enumerate(headers):
+        col_idx.setdefault(header, i)
+    return col_idx
+
+def get_sheet_headers(worksheet):
+    """Row-1 headers of a worksheet (stripped), cached briefly per worksheet so writes skip the row_values(1) read"""
+    return list(get_cached(
+        f'sheet_headers_{worksheet.id}',
+        lambda: [str(h or '').strip() for h in worksheet.row_values(1)],
+        cache_duration=300
+    ))
+
+def invalidate_sheet_headers(worksheet):
+    """Drop the cached header row after adding a column header"""
+    clear_cache(f'sheet_headers_{worksheet.id}')
+
+@retry_on_429()
+def delete_rows_batched(worksheet, row_numbers):
+    """Delete 1-based sheet rows in a single batchUpdate (bottom-up, adjacent rows merged into one range)"""
+    rows = list(row_numbers)
+    if not rows:
+        return
+    # Callers collect rows in one top-down scan, so they're normally already strictly ascending -
+    # then reversing is enough; only sort/dedupe when they aren't
+    if any(a >= b for a, b in zip(rows, islice(rows, 1, None))):
+        rows = sorted(set(rows))
+    rows.reverse()
+    requests_body = []
+    start = end = rows[0]
+    for row_num in rows[1:] + [None]:
+        if row_num is not None and row_num == start - 1:
+            start = row_num
+            continue
+        requests_body.append({'deleteDimension': {'range': {
+            'sheetId': worksheet.id, 'dimension': 'ROWS', 'startIndex': start - 1, 'endIndex': end
+        }}})
+        if row_num is not None:
+            start = end = row_num
+    worksheet.spreadsheet.batch_update({'requests': requests_body})
+
 def init_google_services():
     """Initialize Google Sheets and Drive clients"""
     global sheets_client, drive_service
+    invalidate_spreadsheet_cache()
     try:
         import gspread
         from google.oauth2.service_account import Credentials
@@ -1038,7 +1371,6 @@ def init_google_services():
             print("❌ No Google credentials found - set GOOGLE_CREDENTIALS_JSON env variable")
             
     except Exception as e:
-        import traceback
         print(f"❌ Error initializing Google services: {e}")
         traceback.print_exc()
 
@@ -1057,6 +1389,8 @@ def ensure_worksheets_exist():
             try:
                 old_worksheet = spreadsheet.worksheet('PepHaul Entry')
                 old_worksheet.update_title('PepHaul Entry-01')
+                invalidate_spreadsheet_cache('PepHaul Entry')
+                invalidate_spreadsheet_cache('PepHaul Entry-01')
                 print("✅ Renamed 'PepHaul Entry' to 'PepHaul Entry-01'")
             except Exception as e:
                 print(f"⚠️ Could not rename tab: {e}")
@@ -1099,8 +1433,7 @@ def get_product_locks():
         return {}
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = spreadsheet.worksheet('Product Locks')
+        worksheet = _get_worksheet('Product Locks')
         records = worksheet.get_all_records()
         
         locks = {}
@@ -1115,60 +1448,106 @@ def get_product_locks():
                 }
         return locks
     except:
+        invalidate_spreadsheet_cache('Product Locks')
         return {}
 
+PRODUCT_LOCK_HEADERS = ['Product Code', 'Max Kits', 'Is Locked', 'Locked Date', 'Locked By']
+
+def _get_product_locks_worksheet():
+    """Return the Product Locks worksheet, creating it / repairing headers if needed"""
+    try:
+        worksheet = _get_worksheet('Product Locks')
+    except Exception as e:
+        print(f"⚠️ Product Locks worksheet not found, creating it...")
+        worksheet = _remember_worksheet(_get_spreadsheet().add_worksheet(title='Product Locks', rows=100, cols=5))
+        # Add headers
+        worksheet.update('A1:E1', [PRODUCT_LOCK_HEADERS])
+    
+    # Ensure headers exist
+    try:
+        headers = worksheet.row_values(1)
+        if not headers or headers[0] != 'Product Code':
+            worksheet.update('A1:E1', [PRODUCT_LOCK_HEADERS])
+    except:
+        worksheet.update('A1:E1', [PRODUCT_LOCK_HEADERS])
+    return worksheet
+
 def set_product_lock(product_code, is_locked, max_kits=None, admin_name='Admin'):
-    """Set product lock status"""
+    """Set product lock status (one row read + one batch write via set_product_locks_bulk)"""
+    updated_codes, _ = set_product_locks_bulk([product_code], is_locked, max_kits, admin_name)
+    if not updated_codes:
+        print(f"❌ Error setting product lock for {product_code}")
+        return False
+    print(f"✅ Product {product_code} lock status updated: {'Locked' if is_locked else 'Unlocked'}")
+    return True
+
+@retry_on_429()
+def _write_product_locks(worksheet, updates):
+    """Send Product Locks cell updates as one batch write"""
+    # USER_ENTERED like the update_cell() calls this replaces (Locked Date parses as a date, Max Kits as a number)
+    worksheet.batch_update(updates, value_input_option='USER_ENTERED')
+
+def set_product_locks_bulk(product_codes, is_locked, max_kits=None, admin_name='Admin'):
+    """
+    Set lock status for many products with a single read and a single batch write.
+    Returns (updated_codes, failed_codes).
+    """
+    codes = []
+    seen = set()
+    for code in product_codes or []:
+        code = str(code or '').strip()
+        if code and code not in seen:
+            seen.add(code)
+            codes.append(code)
+    
     if not sheets_client:
         print("❌ Error: sheets_client not initialized")
-        return False
+        return [], codes
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
+        worksheet = _get_product_locks_worksheet()
         
-        # Ensure Product Locks worksheet exists
-        try:
-            worksheet = spreadsheet.worksheet('Product Locks')
-        except Exception as e:
-            print(f"⚠️ Product Locks worksheet not found, creating it...")
-            worksheet = spreadsheet.add_worksheet(title='Product Locks', rows=100, cols=5)
-            # Add headers
-            worksheet.update('A1:E1', [['Product Code', 'Max Kits', 'Is Locked', 'Locked Date', 'Locked By']])
+        # One read to map product code -> row number
+        all_values = worksheet.get_all_values()
+        row_by_code = {}
+        for row_idx, row in enumerate(all_values[1:], start=2):
+            code = str(row[0]).strip() if row else ''
+            if code and code not in row_by_code:
+                row_by_code[code] = row_idx
         
-        # Ensure headers exist
-        try:
-            headers = worksheet.row_values(1)
-            if not headers or headers[0] != 'Product Code':
-                worksheet.update('A1:E1', [['Product Code', 'Max Kits', 'Is Locked', 'Locked Date', 'Locked By']])
-        except:
-            worksheet.update('A1:E1', [['Product Code', 'Max Kits', 'Is Locked', 'Locked Date', 'Locked By']])
+        next_row = max(len(all_values) + 1, 2)
+        locked_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S') if is_locked else ''
+        locked_by = admin_name if is_locked else ''
+        lock_values = ['Yes' if is_locked else 'No', locked_date, locked_by]
         
-        # Find existing row or add new
-        try:
-            cell = worksheet.find(product_code)
-            row = cell.row
-        except Exception as e:
-            # Product not found, add new row
-            all_values = worksheet.get_all_values()
-            row = len(all_values) + 1
-            if row == 1:  # Only header row exists
-                row = 2
-            worksheet.update_cell(row, 1, product_code)
-        
-        # Update values
-        if max_kits is not None:
-            worksheet.update_cell(row, 2, max_kits)
-        worksheet.update_cell(row, 3, 'Yes' if is_locked else 'No')
-        worksheet.update_cell(row, 4, datetime.now().strftime('%Y-%m-%d %H:%M:%S') if is_locked else '')
-        worksheet.update_cell(row, 5, admin_name if is_locked else '')
-        
-        print(f"✅ Product {product_code} lock status updated: {'Locked' if is_locked else 'Unlocked'}")
-        return True
+        updates = []
+        for code in codes:
+            row = row_by_code.get(code)
+            is_new_row = row is None
+            if is_new_row:
+                row = next_row
+                next_row += 1
+            
+            if max_kits is not None:
+                updates.append({'range': f'A{row}:E{row}', 'values': [[code, max_kits] + lock_values]})
+            else:
+                if is_new_row:
+                    updates.append({'range': f'A{row}', 'values': [[code]]})
+                updates.append({'range': f'C{row}:E{row}', 'values': [lock_values]})
+        
+        if updates:
+            # New rows may extend past the current grid
+            if next_row - 1 > worksheet.row_count:
+                worksheet.add_rows(next_row - 1 - worksheet.row_count)
+            _write_product_locks(worksheet, updates)
+        
+        print(f"✅ {len(codes)} products lock status updated: {'Locked' if is_locked else 'Unlocked'}")
+        return codes, []
     except Exception as e:
-        print(f"❌ Error setting product lock for {product_code}: {e}")
-        import traceback
+        print(f"❌ Error bulk setting product locks: {e}")
         traceback.print_exc()
-        return False
+        invalidate_spreadsheet_cache('Product Locks')
+        return [], codes
 
 # In-memory order form lock (persists while server runs, or use Google Sheets for persistence)
 _order_form_locked = False
@@ -1187,7 +1566,6 @@ _per_tab_lock_status = {}
 # We store formatted lock messages as *sanitized HTML* so the public page can render safely.
 from html.parser import HTMLParser
 from html import escape as _html_escape
-import re as _re
 
 _ALLOWED_LOCK_TAGS = {
     'b', 'strong', 'i', 'em', 'u', 'br',
@@ -1331,27 +1709,28 @@ def sanitize_lock_message_html(raw_html: str) -> str:
 # In-memory theme (persists while server runs, or use Google Sheets for persistence)
 _current_theme = "default"
 
-def _fetch_order_form_lock():
-    """Internal function to fetch lock status from sheets"""
+def _fetch_order_form_lock(records=None):
+    """Internal function to fetch lock status from sheets (records: Settings rows already read by a batch prefetch)"""
     global _order_form_locked, _order_form_lock_message
     
     # Try to get from Google Sheets for persistence
     if sheets_client:
         try:
-            spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-            
-            # Check if Settings sheet exists
-            try:
-                worksheet = spreadsheet.worksheet('Settings')
-            except:
-                # Create Settings sheet if doesn't exist
-                worksheet = spreadsheet.add_worksheet(title='Settings', rows=10, cols=5)
-                worksheet.update('A1:C1', [['Setting', 'Value', 'Updated']])
-                worksheet.update('A2:C2', [['Order Form Locked', 'No', '']])
-                worksheet.update('A3:C3', [['Lock Message', '', '']])
-                return {'is_locked': False, 'message': ''}
-            
-            records = worksheet.get_all_records()
+            if records is None:
+                spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
+                
+                # Check if Settings sheet exists
+                try:
+                    worksheet = spreadsheet.worksheet('Settings')
+                except:
+                    # Create Settings sheet if doesn't exist
+                    worksheet = spreadsheet.add_worksheet(title='Settings', rows=10, cols=5)
+                    worksheet.update('A1:C1', [['Setting', 'Value', 'Updated']])
+                    worksheet.update('A2:C2', [['Order Form Locked', 'No', '']])
+                    worksheet.update('A3:C3', [['Lock Message', '', '']])
+                    return {'is_locked': False, 'message': ''}
+                
+                records = worksheet.get_all_records()
             for record in records:
                 if record.get('Setting') == 'Order Form Locked':
                     _order_form_locked = str(record.get('Value', '')).lower() == 'yes'
@@ -1502,11 +1881,10 @@ def set_order_cancellation_control(is_disabled, message=''):
             # still control cancellation even if Sheets is temporarily unavailable.
 
     clear_cache('settings_cancellation')
-    _cache['settings_cancellation'] = {
+    cache_set('settings_cancellation', {
         'is_disabled': _order_cancellation_disabled,
         'message': _order_cancellation_message
-    }
-    _cache_timestamps['settings_cancellation'] = time.time()
+    })
     return True
 
 def _fetch_per_tab_lock_status():
@@ -1789,7 +2167,6 @@ def set_order_goal(goal_amount):
                 # Don't fail completely - update in-memory value so UI reflects change
                 return True  # Return True so UI updates, but log the error
             print(f"Error setting order goal: {e}")
-            import traceback
             traceback.print_exc()
             # Still return True since we updated the in-memory value and cleared cache
             return True
@@ -1815,6 +2192,7 @@ def _fetch_orders_from_sheets(tab_name=None):
         
         # Get current tab name dynamically (use provided tab_name or fallback to current)
         current_tab = tab_name if tab_name else get_current_pephaul_tab()
+        cache_tab = current_tab  # tab the caller caches these rows under (before any fallback below)
         
         # Check if current tab exists, with fallback logic
         if current_tab not in all_worksheets:
@@ -1966,15 +2344,19 @@ def _fetch_orders_from_sheets(tab_name=None):
                             print(f"📋 Record {i+1} [Order: {order_id_val}] [{tg_key}]: {value_repr} (type: {type(value).__name__})")
                             break  # Only log first telegram column found
         
+        # Normalize telegram values once as the rows enter the cache (lookup reuses these columns)
+        _orders_telegram_index[cache_tab] = (records, _build_orders_columns(records))
+        _orders_search_index[cache_tab] = (records, _build_orders_search_rows(records))
+        _orders_listing_index[cache_tab] = (records, _build_orders_listing_columns(records))
+        _orders_row_index[cache_tab] = (records, _build_order_row_index(all_values, order_id_col_index or 0))
+        
         return records
     except IndexError as e:
         print(f"Error reading orders (index out of range - worksheet may be empty or malformed): {e}")
-        import traceback
         traceback.print_exc()
         return []
     except Exception as e:
         print(f"Error reading orders: {e}")
-        import traceback
         traceback.print_exc()
         return []
 
@@ -2036,7 +2418,30 @@ def get_orders_from_sheets():
     return _enrich_orders_with_supplier(orders)
 
 def get_order_by_id(order_id):
-    """Get a specific order by ID"""
+    """Get a specific order by ID.
+
+    Memoized on flask.g for the current request: a route that looks the same
+    order up several times only rebuilds it once. The memo is tied to the raw
+    orders cache entry, so once a write clears the cache the next lookup
+    re-reads the sheet instead of returning the pre-write order.
+    """
+    if not has_request_context():
+        return _load_order_by_id(order_id)
+    cache_key = f'orders_{get_current_pephaul_tab()}'
+    key = str(order_id).strip()
+    memo = g.get('order_by_id')
+    if memo is not None and memo[0] is _cache.get(cache_key) and key in memo[1]:
+        return memo[1][key]
+    order = _load_order_by_id(order_id)
+    # Bind to the cache entry the order was just built from (the load may have refilled it)
+    source = _cache.get(cache_key)
+    if memo is None or memo[0] is not source:
+        memo = g.order_by_id = (source, {})
+    memo[1][key] = order
+    return order
+
+def _load_order_by_id(order_id):
+    """Rebuild a single order from the cached orders list."""
     orders = get_orders_from_sheets()
     # Normalize record keys defensively (covers cases where records were cached pre-normalization)
     orders = [_normalize_order_record_keys(o) for o in orders] if isinstance(orders, list) else orders
@@ -2233,9 +2638,7 @@ def save_order_to_sheets(order_data, order_id=None):
             worksheet.update(f'A{next_row}:Y{end_row}', rows_to_add)
         
         # Clear cache since orders changed (tab-scoped keys)
-        clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
+        clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         
         return order_id
         
@@ -2257,6 +2660,7 @@ def update_order_status(
         return False
     
     try:
+        from gspread.utils import rowcol_to_a1
         spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
         worksheet = get_pephaul_worksheet(spreadsheet)
         if not worksheet:
@@ -2275,12 +2679,15 @@ def update_order_status(
             headers[0] = 'Order ID'
         
         # Ensure extended payment columns exist for partial-payment tracking.
+        # Missing headers are written in the same batch_update as the order fields below.
+        updates = []
         required_dynamic_headers = ['Partial Payment', 'Remaining Balance']
         for req_header in required_dynamic_headers:
             if req_header not in headers:
                 next_col = len(headers) + 1
-                worksheet.update_cell(1, next_col, req_header)
+                updates.append({'range': rowcol_to_a1(1, next_col), 'values': [[req_header]]})
                 headers.append(req_header)
+        header_updates = len(updates)
 
         # Find column indices dynamically
         col_order_status = headers.index('Order Status') if 'Order Status' in headers else None
@@ -2291,38 +2698,43 @@ def update_order_status(
         col_amount_paid = headers.index('Partial Payment') if 'Partial Payment' in headers else None
         col_remaining_balance = headers.index('Remaining Balance') if 'Remaining Balance' in headers else None
         
-        # Find all rows with this order ID
-        cells = worksheet.findall(order_id)
+        # Get the first row (order header row) - this is where order-level fields are stored.
+        # Same match as findall(order_id)[0] (first row with a cell equal to the ID), from the values already read.
+        first_row = next((row_num for row_num, row in enumerate(all_values, start=1) if order_id in row), None)
         
-        if not cells:
+        if first_row is None:
             print(f"Order ID {order_id} not found in sheet")
             return False
         
-        # Get the first row (order header row) - this is where order-level fields are stored
-        first_row = cells[0].row
-        
-        # Update order-level fields on the first row only
+        # Update order-level fields on the first row only (column indices are 0-based, A1 is 1-based)
+        def set_field(col, value):
+            updates.append({'range': rowcol_to_a1(first_row, col + 1), 'values': [[value]]})
+
         if status and col_order_status is not None:
-            worksheet.update_cell(first_row, col_order_status + 1, status)  # +1 because update_cell is 1-indexed
+            set_field(col_order_status, status)
         if locked is not None and col_locked is not None:
-            worksheet.update_cell(first_row, col_locked + 1, 'Yes' if locked else 'No')
+            set_field(col_locked, 'Yes' if locked else 'No')
             print(f"🔒 Updating Locked column (index {col_locked + 1}) to {'Yes' if locked else 'No'} for order {order_id}")
         if payment_status and col_payment_status is not None:
-            worksheet.update_cell(first_row, col_payment_status + 1, payment_status)
+            set_field(col_payment_status, payment_status)
         if payment_screenshot:
             if col_payment_link is not None:
-                worksheet.update_cell(first_row, col_payment_link + 1, payment_screenshot)
+                set_field(col_payment_link, payment_screenshot)
             if col_payment_date is not None:
-                worksheet.update_cell(first_row, col_payment_date + 1, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                set_field(col_payment_date, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         if amount_paid_php is not None and col_amount_paid is not None:
-            worksheet.update_cell(first_row, col_amount_paid + 1, f"{_to_float(amount_paid_php, 0.0):.2f}")
+            set_field(col_amount_paid, f"{_to_float(amount_paid_php, 0.0):.2f}")
         if remaining_balance_php is not None and col_remaining_balance is not None:
-            worksheet.update_cell(first_row, col_remaining_balance + 1, f"{_to_float(remaining_balance_php, 0.0):.2f}")
+            set_field(col_remaining_balance, f"{_to_float(remaining_balance_php, 0.0):.2f}")
+        
+        if updates:
+            # One values.batchUpdate; USER_ENTERED like the update_cell() calls this replaces
+            worksheet.batch_update(updates, value_input_option='USER_ENTERED')
+            if header_updates:
+                invalidate_sheet_headers(worksheet)
         
         # Clear cache since orders changed (tab-scoped keys)
-        clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
+        clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         
         print(
             f"✅ Updated order {order_id}: status={status}, locked={locked}, payment_status={payment_status}, "
@@ -2331,10 +2743,79 @@ def update_order_status(
         return True
     except Exception as e:
         print(f"Error updating order: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
+def bulk_update_order_status(order_ids, locked):
+    """Set Locked on many orders with one sheet read and batched writes.
+
+    Like update_order_status, only each order's first row is written.
+    Returns (updated_ids, failed_ids) - failed covers orders not found and any batch that couldn't be written.
+    """
+    if not sheets_client:
+        return [], list(order_ids)
+    
+    from gspread.utils import rowcol_to_a1
+    worksheet = get_pephaul_worksheet()
+    if not worksheet:
+        return [], list(order_ids)
+    
+    all_values = worksheet.get_all_values()
+    if not all_values:
+        return [], list(order_ids)
+    
+    headers = _normalize_order_sheet_headers(all_values[0])
+    if 'Locked' not in headers:
+        print("Locked column not found in PepHaul Entry sheet")
+        return [], list(order_ids)
+    col_locked = headers.index('Locked') + 1
+    col_order_id = headers.index('Order ID') if 'Order ID' in headers else 0
+    
+    # First row per requested order, in one pass over the rows already read
+    wanted = {str(oid).strip() for oid in order_ids} - {''}
+    first_rows = {}
+    for row_num, row in enumerate(all_values[1:], start=2):
+        if len(row) > col_order_id:
+            row_order_id = row[col_order_id].strip()
+            if row_order_id in wanted and row_order_id not in first_rows:
+                first_rows[row_order_id] = row_num
+                if len(first_rows) == len(wanted):
+                    break
+    
+    value = 'Yes' if locked else 'No'
+    found = list(first_rows.items())
+    updated_ids = []
+    failed_ids = []
+    # Google Sheets API allows up to 100 updates per batch
+    batch_size = 100
+    try:
+        for i in range(0, len(found), batch_size):
+            batch = found[i:i + batch_size]
+            try:
+                worksheet.batch_update(
+                    [{'range': rowcol_to_a1(row_num, col_locked), 'values': [[value]]} for _, row_num in batch],
+                    value_input_option='USER_ENTERED'
+                )
+            except Exception as e:
+                # Earlier batches are already written - report this and the unsent batches as failed
+                print(f"❌ Error writing lock status batch: {e}")
+                drop_stale_pephaul_worksheet(e)
+                failed_ids.extend(oid for oid, _ in found[i:])
+                break
+            updated_ids.extend(oid for oid, _ in batch)
+    finally:
+        if updated_ids:
+            clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
+    
+    # Orders not in the sheet, in request order (each once)
+    seen = set()
+    for oid in order_ids:
+        oid = str(oid).strip()
+        if oid and oid not in first_rows and oid not in seen:
+            seen.add(oid)
+            failed_ids.append(oid)
+    return updated_ids, failed_ids
+
 def add_items_to_order(order_id, new_items, exchange_rate, telegram_username=None, is_post_payment=False):
     """Add items to an existing order
     
@@ -2377,12 +2858,11 @@ def add_items_to_order(order_id, new_items, exchange_rate, telegram_username=Non
         
         # If order_id not provided, find by telegram username
         if not order_id and telegram_username:
-            telegram_normalized = telegram_username.lower().strip().lstrip('@')
+            telegram_normalized = normalize_telegram_username(telegram_username)
             # Find first order row matching telegram username
             for row_num, row in enumerate(all_values[1:], start=2):
                 if len(row) > col_telegram:
-                    row_telegram = str(row[col_telegram]).lower().strip().lstrip('@')
-                    if row_telegram == telegram_normalized:
+                    if normalize_telegram_username(row[col_telegram]) == telegram_normalized:
                         # Found matching order, get order_id from this row
                         if len(row) > col_indices['order_id']:
                             order_id = row[col_indices['order_id']]
@@ -2565,9 +3045,7 @@ def add_items_to_order(order_id, new_items, exchange_rate, telegram_username=Non
             
             # Delete ALL rows for this order
             if all_order_rows:
-                all_order_rows.sort(reverse=True)
-                for row_num in all_order_rows:
-                    worksheet.delete_rows(row_num)
+                delete_rows_batched(worksheet, all_order_rows)
                 insert_row = first_order_row
             else:
                 insert_row = first_order_row
@@ -2648,20 +3126,18 @@ def add_items_to_order(order_id, new_items, exchange_rate, telegram_username=Non
             print(f"✅ Updated order {order_id} with {len(final_items)} items")
         
         # Clear cache since orders changed (tab-scoped keys)
-        clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
+        clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         
         return True
     except Exception as e:
         print(f"Error adding items: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
 def recalculate_order_total(order_id, is_post_payment_addition=False):
     """Recalculate order total after adding items - sums all product line totals + admin fee
     For post-payment additions, calculates original total + additional items (without admin fee)
+    Returns the order dict with the written totals applied (None/False if nothing was recalculated)
     """
     order = get_order_by_id(order_id)
     if not order:
@@ -2744,11 +3220,18 @@ def recalculate_order_total(order_id, is_post_payment_addition=False):
                     if not (is_post_payment_addition and first_row_payment_status and first_row_payment_status.lower() == 'paid'):
                         admin_fee_col = headers.index('Admin Fee PHP') if 'Admin Fee PHP' in headers else 12
                         worksheet.update_cell(row_num, admin_fee_col + 1, admin_fee)
+                        order['admin_fee_php'] = admin_fee
+                    order['grand_total_php'] = grand_total
+                    order['amount_paid_php'], order['remaining_balance_php'] = derive_payment_amounts(
+                        grand_total, order.get('payment_status'), order.get('amount_paid_php')
+                    )
                     break
+            
+            # Hand back the order we already loaded (with the new totals) so callers don't re-read it
+            return order
                     
         except Exception as e:
             print(f"Error recalculating order total: {e}")
-            import traceback
             traceback.print_exc()
     else:
         # Fallback calculation if sheets_client not available
@@ -2871,7 +3354,6 @@ def upload_to_drive(file_data, filename, order_id):
             if 'storage quota' in error_str.lower() or 'storageQuotaExceeded' in error_str:
                 print("⚠️ Service Account storage quota exceeded - falling back to Imgur")
             else:
-                import traceback
                 traceback.print_exc()
     else:
         print("⚠️ Google Drive not configured - using Imgur fallback")
@@ -2898,7 +3380,7 @@ def _fetch_inventory_stats():
         
         # Build product lookup for vials_per_kit and supplier
         products = get_products()
-        product_vials_map = {p['code']: p.get('vials_per_kit', VIALS_PER_KIT) for p in products}
+        product_vials_map = get_product_vials_map(products)
         
         # Build map of product_code -> supplier for products (for inferring supplier if missing)
         code_to_supplier_map = {}
@@ -2977,7 +3459,6 @@ def _fetch_inventory_stats():
         return inventory
     except Exception as e:
         print(f"Error calculating inventory stats: {e}")
-        import traceback
         traceback.print_exc()
         # Return empty inventory
         return {}
@@ -2987,15 +3468,16 @@ def get_inventory_stats():
     tab_name = get_current_pephaul_tab()
     return get_cached(f'inventory_{tab_name}', _fetch_inventory_stats, cache_duration=300)  # 5 minutes - derived data, can cache longer
 
-def _fetch_products_from_sheets():
-    """Internal function to fetch products from Price List tab, with fallback to alternate tab"""
+def _fetch_products_from_sheets(prefetched_records=None):
+    """Internal function to fetch products from Price List tab, with fallback to alternate tab
+    (prefetched_records: Price List rows already read by a batch prefetch)"""
     if not sheets_client:
         print("⚠️ sheets_client is None - cannot fetch products from Google Sheets")
         return None
     
     try:
         print("📊 Fetching products from Google Sheets...")
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
+        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID) if prefetched_records is None else None
         
         # Try to find Price List worksheet first
         worksheet = None
@@ -3003,8 +3485,11 @@ def _fetch_products_from_sheets():
         tab_name = None
         
         try:
-            worksheet = spreadsheet.worksheet('Price List')
-            records = worksheet.get_all_records()
+            if prefetched_records is not None:
+                records = prefetched_records
+            else:
+                worksheet = spreadsheet.worksheet('Price List')
+                records = worksheet.get_all_records()
             tab_name = 'Price List'
             print(f"📋 Found {len(records)} records in 'Price List' tab")
         except Exception as e:
@@ -3115,7 +3600,6 @@ def _fetch_products_from_sheets():
         
     except Exception as e:
         print(f"❌ Error reading products from sheet: {e}")
-        import traceback
         traceback.print_exc()
         return None
 
@@ -3132,7 +3616,6 @@ def get_products():
             print(f"⚠️ Cached products is empty or None: {cached_products}")
     except Exception as e:
         print(f"❌ Error loading products from sheet, using fallback: {e}")
-        import traceback
         traceback.print_exc()
     
     # Fallback to hardcoded list
@@ -3362,9 +3845,47 @@ def get_products():
         {"code": "B1210", "name": "B12", "kit_price": 75, "vial_price": 7.5, "vials_per_kit": 10},
     ]
 
+# Product lookup index: (CODE, SUPPLIER) -> first matching product, CODE -> [products]
+ProductIndex = namedtuple('ProductIndex', ['by_key', 'by_code'])
+_product_index_cache = None  # (products list it was built from, ProductIndex)
 
-def get_exchange_rate():
-    """Fetch live USD to PHP exchange rate"""
+def get_product_index(products=None):
+    """Index for a get_products() list - built once per cached list, shared by every request"""
+    global _product_index_cache
+    if products is None:
+        products = get_products()
+    cached = _product_index_cache
+    if cached is not None and cached[0] is products:
+        return cached[1]
+    by_key = {}
+    by_code = {}
+    for p in products:
+        p_code = str(p.get('code', '')).strip().upper()
+        p_supplier = str(p.get('supplier', 'Default')).strip().upper()
+        by_key.setdefault((p_code, p_supplier), p)
+        by_code.setdefault(p_code, []).append(p)
+    index = ProductIndex(by_key, by_code)
+    _product_index_cache = (products, index)
+    return index
+
+def find_product(products, product_code, supplier):
+    """Case-insensitive code+supplier match, else the only product with that code (None if missing or ambiguous)"""
+    index = get_product_index(products)
+    code_upper = str(product_code).strip().upper()
+    product = index.by_key.get((code_upper, str(supplier).strip().upper()))
+    if product is None:
+        matching_codes = index.by_code.get(code_upper, ())
+        if len(matching_codes) == 1:
+            product = matching_codes[0]
+    return product
+
+
+def _fetch_exchange_rate():
+    """Fetch live USD to PHP exchange rate.
+
+    On failure returns the last cached live rate (re-cached for another window), or None
+    if there is none yet so the hardcoded fallback never gets cached.
+    """
     try:
         response = requests.get('https://api.exchangerate-api.com/v4/latest/USD', timeout=5)
         if response.status_code == 200:
@@ -3372,7 +3893,14 @@ def get_exchange_rate():
             return normalize_exchange_rate(live_rate)
     except:
         pass
-    return normalize_exchange_rate(FALLBACK_EXCHANGE_RATE)
+    # API down: keep the last live rate for another cache window instead of
+    # re-requesting (and waiting on the timeout) for every caller
+    return cache_peek('exchange_rate')
+
+def get_exchange_rate():
+    """Get USD to PHP exchange rate with caching"""
+    rate = get_cached('exchange_rate', _fetch_exchange_rate, cache_duration=300)  # 5 minutes - rate moves slowly
+    return rate if rate is not None else normalize_exchange_rate(FALLBACK_EXCHANGE_RATE)
 
 def _fetch_consolidated_order_stats():
     """Internal function to calculate consolidated order stats per supplier"""
@@ -3383,9 +3911,12 @@ def _fetch_consolidated_order_stats():
         
         print(f"📊 [Order Stats] Fetched {len(orders)} orders from PepHaul Entry tab")
         
+        # Sheet headers are fixed per cache cycle, so resolve the supplier column once
+        supplier_col = 'Supplier' if (orders and 'Supplier' in orders[0]) else 'supplier'
+        
         products = get_products()
         product_prices = {p['code']: {'kit_price': p['kit_price'], 'vial_price': p['vial_price']} for p in products}
-        product_vials_map = {p['code']: p.get('vials_per_kit', VIALS_PER_KIT) for p in products}
+        product_vials_map = get_product_vials_map(products)
         
         # Get inventory stats to calculate actual kits_generated (includes kits formed from vials)
         inventory = get_inventory_stats()
@@ -3414,7 +3945,7 @@ def _fetch_consolidated_order_stats():
             for order in orders:
                 if order.get('Order Status') == 'Cancelled':
                     continue
-                order_supplier = order.get('Supplier', '') or order.get('supplier', '')
+                order_supplier = order.get(supplier_col, '')
                 product_code = order.get('Product Code', '')
                 
                 # If order has supplier, use it; otherwise infer from products
@@ -3516,7 +4047,6 @@ def _fetch_consolidated_order_stats():
         }
     except Exception as e:
         print(f"Error calculating order stats: {e}")
-        import traceback
         traceback.print_exc()
         # Return default stats - safely get suppliers
         try:
@@ -3550,6 +4080,17 @@ def get_consolidated_order_stats():
     tab_name = get_current_pephaul_tab()
     return get_cached(f'order_stats_{tab_name}', _fetch_consolidated_order_stats, cache_duration=180)  # 3 minutes - match orders cache duration
 
+def admin_required(view):
+    """Reject non-admin sessions with 401 before the view runs (and before any JSON body is parsed)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not session.get('is_admin'):
+            return jsonify({'error': 'Unauthorized'}), 401
+        g.is_admin = True
+        g.admin_name = session.get('admin_name', 'Admin')
+        return view(*args, **kwargs)
+    return wrapper
+
 # Routes
 @app.route('/health')
 def health_check():
@@ -3615,6 +4156,58 @@ def index():
                 products_by_code[product_code] = []
             products_by_code[product_code].append(product)
         
+        orders = get_orders_from_sheets()
+        
+        # Build a map of product code to telegram usernames
+        product_telegram_map = {}
+        for order in orders:
+            product_code = order.get('Product Code', '')
+            if not product_code:
+                continue
+            
+            # Get telegram username
+            telegram_value = None
+            for key in order.keys():
+                if 'telegram' in key.lower():
+                    value = order.get(key, None)
+                    if value is not None:
+                        value_str = str(value).strip()
+                        if value_str:
+                            telegram_value = value_str.replace('@', '')
+                            break
+            
+            # Fallback to common variations
+            if telegram_value is None:
+                for fallback_key in ['Telegram Username', 'telegram username', 'Telegram Username ', 'TelegramUsername']:
+                    value = order.get(fallback_key, None)
+                    if value is not None:
+                        value_str = str(value).strip()
+                        if value_str:
+                            telegram_value = value_str.replace('@', '')
+                            break
+            
+            if telegram_value:
+                if product_code not in product_telegram_map:
+                    product_telegram_map[product_code] = set()
+                product_telegram_map[product_code].add(telegram_value)
+        
+        # Incomplete kits (products with remaining vials that don't form complete kits)
+        # are collected in the same pass that attaches inventory stats
+        incomplete_kits = []
+        
+        def track_incomplete_kit(product, stats):
+            total_vials = stats.get('total_vials', 0)
+            vials_per_kit = product.get('vials_per_kit', VIALS_PER_KIT)
+            remaining_vials = total_vials % vials_per_kit
+            if remaining_vials > 0:  # Has incomplete kit
+                pending_vials = vials_per_kit - remaining_vials
+                product['pending_vials'] = pending_vials
+                # Add telegram usernames for this product
+                product_code = product.get('code', '')
+                product['pep_haulers'] = sorted(product_telegram_map.get(product_code, ()))
+                incomplete_kits.append(product)
+                print(f"✅ Added to incomplete_kits: {product_code}, {total_vials} vials, {remaining_vials} remaining, {pending_vials} pending")
+        
         # Track which products we've already added to avoid duplicates
         added_products = set()
         products_with_orders = []
@@ -3630,6 +4223,7 @@ def index():
                     product['inventory'] = stats
                     products_with_orders.append(product)
                     added_products.add(key)
+                    track_incomplete_kit(product, stats)
                     print(f"✅ Added product to products_with_orders: {product_code} ({supplier}), {total_vials} vials")
                 elif product_code in products_by_code:
                     # Try to find product with matching supplier
@@ -3641,6 +4235,7 @@ def index():
                             product['inventory'] = stats
                             products_with_orders.append(product)
                             added_products.add((product_code, p_supplier))
+                            track_incomplete_kit(product, stats)
                             print(f"✅ Added product to products_with_orders (supplier match): {product_code} ({supplier}), {total_vials} vials")
                             found = True
                             break
@@ -3665,6 +4260,7 @@ def index():
                 if stats.get('total_vials', 0) > 0:
                     products_with_orders.append(product)
                     added_products.add(key)
+                    track_incomplete_kit(product, stats)
         
         # Sort products: Complete kits first (by # of kits, descending), then others by proximity
         def sort_key(product):
@@ -3686,61 +4282,9 @@ def index():
         
         products_with_orders.sort(key=sort_key)
         
-        # Filter incomplete kits (products with remaining vials that don't form complete kits)
-        incomplete_kits = []
-        orders = get_orders_from_sheets()
-        
-        # Build a map of product code to telegram usernames
-        product_telegram_map = {}
-        for order in orders:
-            product_code = order.get('Product Code', '')
-            if not product_code:
-                continue
-            
-            # Get telegram username
-            telegram_value = None
-            for key in order.keys():
-                if 'telegram' in key.lower():
-                    value = order.get(key, None)
-                    if value is not None:
-                        value_str = str(value).strip()
-                        if value_str:
-                            telegram_value = value_str.replace('@', '')
-                            break
-            
-            # Fallback to common variations
-            if telegram_value is None:
-                for fallback_key in ['Telegram Username', 'telegram username', 'Telegram Username ', 'TelegramUsername']:
-                    value = order.get(fallback_key, None)
-                    if value is not None:
-                        value_str = str(value).strip()
-                        if value_str:
-                            telegram_value = value_str.replace('@', '')
-                            break
-            
-            if telegram_value:
-                if product_code not in product_telegram_map:
-                    product_telegram_map[product_code] = set()
-                product_telegram_map[product_code].add(telegram_value)
-        
-        for product in products_with_orders:
-            stats = product['inventory']
-            total_vials = stats.get('total_vials', 0)
-            if total_vials > 0:
-                vials_per_kit = product.get('vials_per_kit', VIALS_PER_KIT)
-                remaining_vials = total_vials % vials_per_kit
-                if remaining_vials > 0:  # Has incomplete kit
-                    pending_vials = vials_per_kit - remaining_vials
-                    product['pending_vials'] = pending_vials
-                    # Add telegram usernames for this product
-                    product_code = product.get('code', '')
-                    telegram_usernames = sorted(list(product_telegram_map.get(product_code, set())))
-                    product['pep_haulers'] = telegram_usernames
-                    incomplete_kits.append(product)
-                    print(f"✅ Added to incomplete_kits: {product_code}, {total_vials} vials, {remaining_vials} remaining, {pending_vials} pending")
-        
-        # Sort incomplete kits by pending vials (ascending - least needed first)
-        incomplete_kits.sort(key=lambda p: p.get('pending_vials', 10))
+        # Sort incomplete kits by pending vials (ascending - least needed first),
+        # ties keep the same kit-completion order as products_with_orders
+        incomplete_kits.sort(key=lambda p: (p.get('pending_vials', 10), sort_key(p)))
         
         # Group products by supplier
         products_by_supplier = {}
@@ -3887,7 +4431,6 @@ def index():
                 tab_supplier = suppliers[0] if suppliers and len(suppliers) > 0 else 'Default'
         except Exception as e:
             print(f"⚠️ Error determining tab_supplier: {e}")
-            import traceback
             traceback.print_exc()
             tab_supplier = suppliers[0] if suppliers and len(suppliers) > 0 else 'Default'
             supplier_filter = 'all'
@@ -3926,7 +4469,6 @@ def index():
         return response
     except Exception as e:
         app.logger.error(f"Error loading index page: {str(e)}")
-        import traceback
         app.logger.error(traceback.format_exc())
         return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
@@ -4029,7 +4571,7 @@ def api_admin_sync_telegram_users():
         if not (webhook_url and webhook_temporarily_disabled):
             return
         try:
-            restore_resp = requests.post(
+            restore_resp = telegram_http.post(
                 f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/setWebhook",
                 json={'url': webhook_url},
                 timeout=10
@@ -4043,7 +4585,7 @@ def api_admin_sync_telegram_users():
 
     try:
         # If a webhook is active, temporarily disable it so getUpdates can run.
-        webhook_info_resp = requests.get(
+        webhook_info_resp = telegram_http.get(
             f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getWebhookInfo",
             timeout=10
         )
@@ -4051,7 +4593,7 @@ def api_admin_sync_telegram_users():
         webhook_url = str((webhook_info.get('result') or {}).get('url') or '').strip()
 
         if webhook_url:
-            delete_resp = requests.post(
+            delete_resp = telegram_http.post(
                 f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/deleteWebhook",
                 json={'drop_pending_updates': False},
                 timeout=10
@@ -4077,7 +4619,7 @@ def api_admin_sync_telegram_users():
             if last_update_id is not None:
                 params['offset'] = last_update_id + 1
 
-            updates_resp = requests.get(
+            updates_resp = telegram_http.get(
                 f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/getUpdates",
                 params=params,
                 timeout=20
@@ -4132,8 +4674,7 @@ def api_admin_sync_telegram_users():
 
         synced_count = 0
         for username, chat_id in discovered_users.items():
-            telegram_customers[username] = chat_id
-            telegram_customers[f"@{username}"] = chat_id
+            telegram_customers.remember(username, chat_id)
             upsert_pephauler_contact(username, chat_id)
             synced_count += 1
 
@@ -4238,7 +4779,6 @@ def _upsert_shipping_details_tab(telegram_username, full_name, contact_number, m
 
     except Exception as e:
         print(f"⚠️ _upsert_shipping_details_tab error: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
@@ -4425,7 +4965,6 @@ def api_admin_sync_shipping_details():
                 msg = f"Error in {tab_name}: {tab_err}"
                 print(f"  ❌ {msg}")
                 diagnostics.append(msg)
-                import traceback
                 traceback.print_exc()
 
         if total_updated > 0:
@@ -4442,7 +4981,6 @@ def api_admin_sync_shipping_details():
 
     except Exception as e:
         print(f"❌ sync-shipping-details error: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -4535,7 +5073,6 @@ def api_admin_debug_orders():
             'sample_rows': sample,
         })
     except Exception as e:
-        import traceback
         return jsonify({'error': str(e), 'traceback': traceback.format_exc()}), 500
 
 @app.route('/api/admin/products')
@@ -4605,7 +5142,7 @@ def api_admin_products():
         product['max_kits'] = lock.get('max_kits', MAX_KITS_DEFAULT)
         product['is_locked'] = lock.get('is_locked', False) or inv.get('kits_generated', 0) >= lock.get('max_kits', MAX_KITS_DEFAULT)
         
-        telegram_usernames = sorted(list(product_telegram_map.get(code, set())))
+        telegram_usernames = sorted(product_telegram_map.get(code, ()))
         product['pep_haulers'] = telegram_usernames
 
         breakdown = []
@@ -4646,16 +5183,59 @@ def api_lock_product():
             return jsonify({'error': 'Failed to update product lock status. Check server logs for details.'}), 500
     except Exception as e:
         print(f"❌ Error in api_lock_product: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+# Background bulk-lock jobs: job_id -> progress/result (in-process; the app runs a single gunicorn worker)
+_bulk_lock_jobs = {}
+_bulk_lock_jobs_lock = threading.Lock()
+BULK_LOCK_JOB_TTL = 3600  # seconds to keep finished job results around for polling
+
+def _run_bulk_lock_job(job_id, product_codes, is_locked, max_kits, admin_name):
+    """Worker thread body for a bulk lock/unlock job"""
+    action = 'locked' if is_locked else 'unlocked'
+    try:
+        # Single read + single batch write instead of one set_product_lock() per product
+        updated_codes, _ = set_product_locks_bulk(product_codes, is_locked, max_kits, admin_name)
+        updated_set = set(updated_codes)
+        failed_products = set()
+        for product_code in product_codes:
+            # Same normalisation as set_product_locks_bulk - also keeps unhashable JSON values (lists/dicts) out of the set
+            code = str(product_code or '').strip()
+            if code not in updated_set:
+                failed_products.add(code)
+        success_count = len(updated_codes)
+        failed_count = len(failed_products)
+        
+        print(f"✅ Bulk {action} complete: {success_count} succeeded, {failed_count} failed")
+        if failed_products and logger.isEnabledFor(logging.WARNING):
+            logger.warning("bulk lock failures: %s", list(islice(failed_products, 20)))
+        
+        result = {
+            'status': 'done',
+            'success': True,
+            'message': f'{success_count} products {action} successfully',
+            'success_count': success_count,
+            'failed_count': failed_count,
+            'done': len(product_codes)
+        }
+        if failed_products:
+            result['failed_products'] = list(islice(failed_products, 20))  # Limit to first 20 for response size
+    except Exception as e:
+        print(f"❌ Error in bulk lock job {job_id}: {e}")
+        traceback.print_exc()
+        result = {'status': 'error', 'success': False, 'error': f'Server error: {str(e)}'}
+    
+    with _bulk_lock_jobs_lock:
+        job = _bulk_lock_jobs.get(job_id)
+        if job is not None:
+            job.update(result)
+            job['finished_at'] = time.time()
+
 @app.route('/api/admin/products/bulk-lock', methods=['POST'])
+@admin_required
 def api_bulk_lock_products():
-    """Bulk lock/unlock multiple products at once - optimized for large batches"""
-    if not session.get('is_admin'):
-        return jsonify({'error': 'Unauthorized'}), 401
-    
+    """Bulk lock/unlock multiple products at once - runs in a background thread, returns 202 + job_id"""
     try:
         data = request.json or {}
         product_codes = data.get('product_codes', [])
@@ -4668,69 +5248,50 @@ def api_bulk_lock_products():
         if len(product_codes) == 0:
             return jsonify({'error': 'No product codes provided'}), 400
         
-        admin_name = session.get('admin_name', 'Admin')
-        success_count = 0
-        failed_count = 0
-        failed_products = []
-        
-        print(f"🔄 Starting bulk {'lock' if is_locked else 'unlock'} for {len(product_codes)} products...")
-        
-        # Process products in smaller batches with delays to avoid Google Sheets API rate limits
-        # Google Sheets API allows ~60 requests per minute per user, so we batch conservatively
-        batch_size = 5  # Smaller batches to be safe
-        import time
+        admin_name = g.admin_name
+        job_id = secrets.token_hex(8)
+        now = time.time()
+        
+        with _bulk_lock_jobs_lock:
+            # Drop finished jobs nobody polled
+            for old_id in [j for j, job in _bulk_lock_jobs.items() if now - job.get('finished_at', now) > BULK_LOCK_JOB_TTL]:
+                _bulk_lock_jobs.pop(old_id, None)
+            _bulk_lock_jobs[job_id] = {
+                'job_id': job_id,
+                'status': 'running',
+                'done': 0,
+                'total': len(product_codes)
+            }
         
-        for i in range(0, len(product_codes), batch_size):
-            batch = product_codes[i:i + batch_size]
-            batch_num = (i // batch_size) + 1
-            total_batches = (len(product_codes) + batch_size - 1) // batch_size
-            
-            print(f"  Processing batch {batch_num}/{total_batches} ({len(batch)} products)...")
-            
-            for product_code in batch:
-                try:
-                    if set_product_lock(product_code, is_locked, max_kits, admin_name):
-                        success_count += 1
-                    else:
-                        failed_count += 1
-                        failed_products.append(product_code)
-                        print(f"    ❌ Failed: {product_code}")
-                except Exception as e:
-                    failed_count += 1
-                    failed_products.append(product_code)
-                    print(f"    ❌ Error locking product {product_code}: {e}")
-            
-            # Delay between batches to respect rate limits (except for last batch)
-            if i + batch_size < len(product_codes):
-                time.sleep(0.2)  # 200ms delay between batches
+        print(f"🔄 Starting bulk {'lock' if is_locked else 'unlock'} job {job_id} for {len(product_codes)} products...")
+        threading.Thread(
+            target=_run_bulk_lock_job,
+            args=(job_id, product_codes, is_locked, max_kits, admin_name),
+            daemon=True
+        ).start()
         
-        action = 'locked' if is_locked else 'unlocked'
-        print(f"✅ Bulk {action} complete: {success_count} succeeded, {failed_count} failed")
-        
-        result = {
-            'success': True,
-            'message': f'{success_count} products {action} successfully',
-            'success_count': success_count,
-            'failed_count': failed_count
-        }
-        
-        if failed_products:
-            result['failed_products'] = failed_products[:20]  # Limit to first 20 for response size
-        
-        return jsonify(result)
+        return jsonify({'job_id': job_id, 'status': 'accepted', 'total': len(product_codes)}), 202
         
     except Exception as e:
         print(f"❌ Error in api_bulk_lock_products: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': f'Server error: {str(e)}'}), 500
 
+@app.route('/api/admin/products/bulk-lock/<job_id>')
+@admin_required
+def api_bulk_lock_products_status(job_id):
+    """Progress / result of a bulk lock job"""
+    with _bulk_lock_jobs_lock:
+        job = _bulk_lock_jobs.get(job_id)
+        job = dict(job) if job is not None else None
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
 @app.route('/api/admin/lock-order-form', methods=['POST'])
+@admin_required
 def api_lock_order_form():
     """Lock/unlock the entire order form"""
-    if not session.get('is_admin'):
-        return jsonify({'error': 'Unauthorized'}), 401
-    
     data = request.json
     is_locked = data.get('is_locked', True)
     message = sanitize_lock_message_html(data.get('message', 'Orders are currently closed. Thank you for your patience!'))
@@ -4775,11 +5336,9 @@ def api_get_order_goal():
     return jsonify({'goal': goal})
 
 @app.route('/api/admin/order-goal', methods=['POST'])
+@admin_required
 def api_set_order_goal():
     """Set order goal amount"""
-    if not session.get('is_admin'):
-        return jsonify({'error': 'Unauthorized'}), 401
-    
     data = request.json
     goal = data.get('goal')
     
@@ -4807,100 +5366,193 @@ def api_get_theme():
 # Timeline Management
 _timeline_entries = []
 
-def _fetch_timeline_entries(tab_name=None):
-    """Internal function to fetch timeline entries from sheets - filter by PepHaul Entry ID"""
-    global _timeline_entries
-    entries = []
-    
-    if not tab_name:
-        tab_name = get_current_pephaul_tab()
+TIMELINE_HEADERS = ['ID', 'PepHaul Entry ID', 'Date', 'Time', 'Details of Transaction', 'Sequence']
+
+_timeline_bootstrapped = False
+_timeline_bootstrap_lock = threading.Lock()
+
+def _ensure_timeline_sheet():
+    """Create the Timeline sheet (with headers) if missing - idempotent, runs its RPCs at most once per process"""
+    global _timeline_bootstrapped
+    if _timeline_bootstrapped:
+        return
+    with _timeline_bootstrap_lock:
+        if _timeline_bootstrapped:
+            return
+        spreadsheet = _get_spreadsheet()
+        worksheets = {ws.title: ws for ws in spreadsheet.worksheets()}
+        if 'Timeline' in worksheets:
+            _remember_worksheet(worksheets['Timeline'])
+        else:
+            worksheet = _remember_worksheet(spreadsheet.add_worksheet(title='Timeline', rows=100, cols=6))
+            worksheet.update('A1:F1', [TIMELINE_HEADERS])
+            print("✅ Created Timeline sheet")
+        _timeline_bootstrapped = True
+
+def _get_timeline_worksheet():
+    """Get the Timeline worksheet, bootstrapping it on first use (and again if the tab was deleted/renamed)"""
+    global _timeline_bootstrapped
+    _ensure_timeline_sheet()
+    try:
+        return _get_worksheet('Timeline')
+    except Exception as e:
+        if not _is_missing_sheet_error(e):
+            raise
+    # Tab went away while running - recreate it once, like the first bootstrap
+    with _timeline_bootstrap_lock:
+        _timeline_bootstrapped = False
+    _ensure_timeline_sheet()
+    return _get_worksheet('Timeline')
+
+def _timeline_sequence(value):
+    """Parse a sequence value (default to large number to sort at end if missing)"""
+    try:
+        return int(value) if value else 999999
+    except (ValueError, TypeError):
+        return 999999
+
+def _fetch_timeline_records():
+    """
+    Internal function to read every Timeline row once (shared by per-tab and all-entries views).
+    Uses get_all_values() with header positions resolved once, so rows are not turned into
+    gspread record dicts / numericised cell by cell.
+    """
+    if not sheets_client:
+        return []
     
     # Use single "Timeline" tab with PepHaul Entry ID column
     timeline_tab_name = 'Timeline'
     
-    if sheets_client:
+    try:
+        worksheet = _get_timeline_worksheet()
+        
         try:
-            spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-            
-            try:
-                worksheet = spreadsheet.worksheet(timeline_tab_name)
-                # Check if Sequence column exists, add if missing
-                headers = worksheet.row_values(1)
-                if headers and 'Sequence' not in headers:
-                    # Add Sequence column header
-                    worksheet.update('F1', [['Sequence']])
-                    # Initialize sequence values for existing entries (based on current row order)
-                    all_values = worksheet.get_all_values()
-                    for idx, row in enumerate(all_values[1:], start=2):
-                        if row and len(row) >= 1:  # Has ID
-                            worksheet.update(f'F{idx}', [[idx - 1]])  # Sequence = row index - 1
-            except Exception as e:
-                # Create Timeline sheet if doesn't exist with new column structure
-                try:
-                    worksheet = spreadsheet.add_worksheet(title=timeline_tab_name, rows=100, cols=6)
-                    worksheet.update('A1:F1', [['ID', 'PepHaul Entry ID', 'Date', 'Time', 'Details of Transaction', 'Sequence']])
-                    return []
-                except Exception as create_error:
-                    print(f"Error creating Timeline sheet: {create_error}")
-                    import traceback
-                    traceback.print_exc()
-                    return []
-            
-            try:
-                records = worksheet.get_all_records()
-            except Exception as e:
-                print(f"Error reading Timeline records: {e}")
-                import traceback
-                traceback.print_exc()
-                return []
-            
-            for record in records:
-                # Filter by current PepHaul tab (match PepHaul Entry ID column)
-                # Support both old "PepHaul Number" and new "PepHaul Entry ID" column names
-                pephaul_entry_id_raw = (
-                    record.get('PepHaul Entry ID', '') or
-                    record.get('PepHaul Number', '')
-                )
-                pephaul_entry_id = str(pephaul_entry_id_raw).strip() if pephaul_entry_id_raw is not None else ''
-                
-                # Flexible matching: exact match OR normalized match (case-insensitive, remove spaces/dashes)
-                # Handles: "PepHaul Entry-02" = "PepHaul02" = "pephaul entry 02" = "02"
-                def normalize_tab_name(name):
-                    """Normalize tab name for comparison: lowercase, remove spaces and dashes"""
-                    return name.lower().replace(' ', '').replace('-', '').replace('_', '')
-                
-                normalized_entry_id = normalize_tab_name(pephaul_entry_id)
-                normalized_tab_name = normalize_tab_name(tab_name)
-                
-                # Match if normalized names match OR if entry ID ends with same number
-                # E.g., "02" matches "PepHaul Entry-02", "PepHaul02" matches "PepHaul Entry-02"
-                is_match = (
-                    pephaul_entry_id == tab_name or  # Exact match
-                    normalized_entry_id == normalized_tab_name or  # Normalized match
-                    (normalized_entry_id and normalized_tab_name.endswith(normalized_entry_id)) or  # Entry ID is suffix
-                    (normalized_tab_name and normalized_entry_id.endswith(normalized_tab_name.replace('pephaulentry', '')))  # Tab number is suffix
-                )
-                
-                if is_match and record.get('ID') and record.get('Date'):
-                    # Get sequence value (default to large number to sort at end if missing)
-                    sequence = record.get('Sequence', 999999)
-                    try:
-                        sequence = int(sequence) if sequence else 999999
-                    except (ValueError, TypeError):
-                        sequence = 999999
-                    
-                    entries.append({
-                        'id': str(record.get('ID', '')),
-                        'pephaul_entry_id': pephaul_entry_id,
-                        'date': record.get('Date', ''),
-                        'time': record.get('Time', ''),
-                        'details': record.get('Details of Transaction', ''),
-                        'sequence': sequence
-                    })
+            all_values = worksheet.get_all_values()
         except Exception as e:
-            print(f"Error getting timeline entries: {e}")
-            import traceback
+            print(f"Error reading Timeline records: {e}")
             traceback.print_exc()
+            invalidate_spreadsheet_cache(timeline_tab_name)
+            return []
+        
+        if not all_values:
+            return []
+        headers = [str(h).strip() for h in all_values[0]]
+        rows = all_values[1:]
+        
+        # Check if Sequence column exists, add if missing
+        if headers and 'Sequence' not in headers:
+            # Initialize sequence values for existing entries (based on current row order)
+            worksheet.update(f'F1:F{len(rows) + 1}', [['Sequence']] + [[idx] for idx in range(1, len(rows) + 1)])
+            headers = (headers + [''] * 6)[:5] + ['Sequence'] + headers[6:]
+            rows = [(row + [''] * 6)[:5] + [str(idx)] + row[6:] for idx, row in enumerate(rows, start=1)]
+        
+        def col(name, default=None):
+            return headers.index(name) if name in headers else default
+        
+        # Resolve column positions once (falls back to the standard A-F layout)
+        id_idx = col('ID', 0)
+        date_idx = col('Date', 2)
+        time_idx = col('Time', 3)
+        details_idx = col('Details of Transaction', 4)
+        sequence_idx = col('Sequence', 5)
+        # Support both old "PepHaul Number" and new "PepHaul Entry ID" column names
+        pephaul_idx = col('PepHaul Entry ID')
+        legacy_pephaul_idx = col('PepHaul Number')
+        if pephaul_idx is None and legacy_pephaul_idx is None:
+            pephaul_idx = 1
+        width = max(i for i in (id_idx, date_idx, time_idx, details_idx, sequence_idx, pephaul_idx, legacy_pephaul_idx) if i is not None) + 1
+        
+        records = []
+        for row in rows:
+            if len(row) < width:
+                row = row + [''] * (width - len(row))
+            pephaul_entry_id = (
+                (row[pephaul_idx] if pephaul_idx is not None else '') or
+                (row[legacy_pephaul_idx] if legacy_pephaul_idx is not None else '')
+            )
+            records.append({
+                'id': str(row[id_idx]).strip(),
+                'pephaul_entry_id': str(pephaul_entry_id).strip(),
+                'date': row[date_idx],
+                'time': row[time_idx],
+                'details': row[details_idx],
+                'sequence': _timeline_sequence(row[sequence_idx])
+            })
+        return records
+    except Exception as e:
+        print(f"Error getting timeline entries: {e}")
+        traceback.print_exc()
+        invalidate_spreadsheet_cache(timeline_tab_name)
+        return []
+
+def get_timeline_records():
+    """Get raw Timeline rows (cached) - one Sheets read serves every tab's timeline"""
+    return get_cached('timeline_records', _fetch_timeline_records, cache_duration=300)  # 5 minutes
+
+def _fetch_timeline_row_index():
+    """Internal function to map Timeline entry ID -> sheet row (reads column A only)"""
+    ids = _get_timeline_worksheet().col_values(1)
+    row_index = {}
+    for row_idx, value in enumerate(ids[1:], start=2):
+        entry_id = str(value).strip()
+        if entry_id and entry_id not in row_index:
+            row_index[entry_id] = row_idx
+    return row_index
+
+def find_timeline_row(worksheet, entry_id):
+    """Find the sheet row for a Timeline entry ID via the cached ID index (None if not found)"""
+    entry_id = str(entry_id).strip()
+    row_index = get_cached('timeline_row_index', _fetch_timeline_row_index, cache_duration=300) or {}
+    row = row_index.get(entry_id)
+    # The sheet can be edited by hand, so confirm the cached row still holds this ID before writing to it
+    if row and str(worksheet.acell(f'A{row}').value or '').strip() == entry_id:
+        return row
+    clear_cache('timeline_row_index')
+    row_index = get_cached('timeline_row_index', _fetch_timeline_row_index, cache_duration=300) or {}
+    return row_index.get(entry_id)
+
+def clear_timeline_cache(tab_name=None):
+    """Clear the raw Timeline rows, the ID -> row index and the derived per-tab / all-entries caches"""
+    clear_cache('timeline_records')
+    clear_cache('timeline_row_index')
+    clear_cache('all_timeline_entries')
+    if tab_name:
+        clear_cache(f'timeline_entries_{tab_name}')
+    else:
+        clear_cache_prefix('timeline_entries_')
+
+def _fetch_timeline_entries(tab_name=None):
+    """Internal function to build timeline entries for a tab - filter by PepHaul Entry ID"""
+    global _timeline_entries
+    entries = []
+    
+    if not tab_name:
+        tab_name = get_current_pephaul_tab()
+    
+    # Flexible matching: exact match OR normalized match (case-insensitive, remove spaces/dashes)
+    # Handles: "PepHaul Entry-02" = "PepHaul02" = "pephaul entry 02" = "02"
+    def normalize_tab_name(name):
+        """Normalize tab name for comparison: lowercase, remove spaces and dashes"""
+        return name.lower().replace(' ', '').replace('-', '').replace('_', '')
+    
+    normalized_tab_name = normalize_tab_name(tab_name)
+    
+    for record in get_timeline_records() or []:
+        # Filter by current PepHaul tab (match PepHaul Entry ID column)
+        pephaul_entry_id = record['pephaul_entry_id']
+        normalized_entry_id = normalize_tab_name(pephaul_entry_id)
+        
+        # Match if normalized names match OR if entry ID ends with same number
+        # E.g., "02" matches "PepHaul Entry-02", "PepHaul02" matches "PepHaul Entry-02"
+        is_match = (
+            pephaul_entry_id == tab_name or  # Exact match
+            normalized_entry_id == normalized_tab_name or  # Normalized match
+            (normalized_entry_id and normalized_tab_name.endswith(normalized_entry_id)) or  # Entry ID is suffix
+            (normalized_tab_name and normalized_entry_id.endswith(normalized_tab_name.replace('pephaulentry', '')))  # Tab number is suffix
+        )
+        
+        if is_match and record['id'] and record['date']:
+            entries.append(dict(record))
     
     _timeline_entries = entries
     return entries
@@ -4913,76 +5565,15 @@ def get_timeline_entries(tab_name=None):
     return get_cached(cache_key, lambda: _fetch_timeline_entries(tab_name), cache_duration=300)  # 5 minutes
 
 def _fetch_all_timeline_entries():
-    """Internal function to fetch ALL timeline entries from sheets (not filtered by tab)"""
+    """Internal function to build ALL timeline entries (not filtered by tab)"""
     entries = []
     
-    timeline_tab_name = 'Timeline'
-    
-    if sheets_client:
-        try:
-            spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-            
-            try:
-                worksheet = spreadsheet.worksheet(timeline_tab_name)
-                # Check if Sequence column exists, add if missing
-                headers = worksheet.row_values(1)
-                if headers and 'Sequence' not in headers:
-                    # Add Sequence column header
-                    worksheet.update('F1', [['Sequence']])
-                    # Initialize sequence values for existing entries (based on current row order)
-                    all_values = worksheet.get_all_values()
-                    for idx, row in enumerate(all_values[1:], start=2):
-                        if row and len(row) >= 1:  # Has ID
-                            worksheet.update(f'F{idx}', [[idx - 1]])  # Sequence = row index - 1
-            except Exception as e:
-                # Create Timeline sheet if doesn't exist
-                try:
-                    worksheet = spreadsheet.add_worksheet(title=timeline_tab_name, rows=100, cols=6)
-                    worksheet.update('A1:F1', [['ID', 'PepHaul Entry ID', 'Date', 'Time', 'Details of Transaction', 'Sequence']])
-                    return []
-                except Exception as create_error:
-                    print(f"Error creating Timeline sheet: {create_error}")
-                    import traceback
-                    traceback.print_exc()
-                    return []
-            
-            try:
-                records = worksheet.get_all_records()
-            except Exception as e:
-                print(f"Error reading Timeline records: {e}")
-                import traceback
-                traceback.print_exc()
-                return []
-            
-            for record in records:
-                # Get PepHaul Entry ID (support both old and new column names)
-                pephaul_entry_id_raw = (
-                    record.get('PepHaul Entry ID', '') or
-                    record.get('PepHaul Number', '')
-                )
-                pephaul_entry_id = str(pephaul_entry_id_raw).strip() if pephaul_entry_id_raw is not None else ''
-                
-                # Include all entries (no filtering)
-                if record.get('ID') and record.get('Date'):
-                    # Get sequence value (default to large number to sort at end if missing)
-                    sequence = record.get('Sequence', 999999)
-                    try:
-                        sequence = int(sequence) if sequence else 999999
-                    except (ValueError, TypeError):
-                        sequence = 999999
-                    
-                    entries.append({
-                        'id': str(record.get('ID', '')),
-                        'pephaul_entry_id': pephaul_entry_id or 'Unknown',
-                        'date': record.get('Date', ''),
-                        'time': record.get('Time', ''),
-                        'details': record.get('Details of Transaction', ''),
-                        'sequence': sequence
-                    })
-        except Exception as e:
-            print(f"Error getting all timeline entries: {e}")
-            import traceback
-            traceback.print_exc()
+    for record in get_timeline_records() or []:
+        # Include all entries (no filtering)
+        if record['id'] and record['date']:
+            entry = dict(record)
+            entry['pephaul_entry_id'] = record['pephaul_entry_id'] or 'Unknown'
+            entries.append(entry)
     
     return entries
 
@@ -4991,6 +5582,26 @@ def get_all_timeline_entries():
     cache_key = 'all_timeline_entries'
     return get_cached(cache_key, _fetch_all_timeline_entries, cache_duration=300)  # 5 minutes
 
+_timeline_headers_checked = False
+
+def _migrate_timeline_headers(worksheet):
+    """One-shot (per process) Timeline header migration - old column name + missing Sequence column"""
+    global _timeline_headers_checked
+    if _timeline_headers_checked:
+        return
+    headers = worksheet.row_values(1)
+    updates = []
+    if headers and len(headers) >= 2:
+        # If old column name exists, update header row
+        if 'PepHaul Number' in headers and 'PepHaul Entry ID' not in headers and headers[1] == 'PepHaul Number':
+            updates.append({'range': 'B1', 'values': [['PepHaul Entry ID']]})
+        # Add Sequence column if missing
+        if 'Sequence' not in headers:
+            updates.append({'range': 'F1', 'values': [['Sequence']]})
+    if updates:
+        worksheet.batch_update(updates)
+    _timeline_headers_checked = True
+
 def add_timeline_entry(date, time, details, tab_name=None):
     """Add timeline entry to sheets - single Timeline tab with PepHaul Entry ID"""
     import uuid
@@ -5008,63 +5619,34 @@ def add_timeline_entry(date, time, details, tab_name=None):
         return False
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        
-        try:
-            worksheet = spreadsheet.worksheet(timeline_tab_name)
-            # Check if headers need updating (support migration from old column name)
-            headers = worksheet.row_values(1)
-            if headers and len(headers) >= 2:
-                # If old column name exists, update header row
-                if 'PepHaul Number' in headers and 'PepHaul Entry ID' not in headers:
-                    header_col_b = headers[1] if len(headers) > 1 else ''
-                    if header_col_b == 'PepHaul Number':
-                        worksheet.update('B1', [['PepHaul Entry ID']])
-                # Add Sequence column if missing
-                if 'Sequence' not in headers:
-                    worksheet.update('F1', [['Sequence']])
-        except Exception as e:
-            # Create Timeline sheet if doesn't exist with new column structure
-            try:
-                worksheet = spreadsheet.add_worksheet(title=timeline_tab_name, rows=100, cols=6)
-                worksheet.update('A1:F1', [['ID', 'PepHaul Entry ID', 'Date', 'Time', 'Details of Transaction', 'Sequence']])
-            except Exception as create_error:
-                print(f"Error creating Timeline sheet: {create_error}")
-                import traceback
-                traceback.print_exc()
-                return False
+        worksheet = _get_timeline_worksheet()
+        _migrate_timeline_headers(worksheet)
         
         # Append new row with PepHaul Entry ID and sequence
         try:
-            all_values = worksheet.get_all_values()
-            next_row = len(all_values) + 1
-            # Calculate next sequence number (max sequence + 1)
+            # Calculate next sequence number (max sequence + 1) from the cached Timeline rows
             max_sequence = 0
-            for row in all_values[1:]:  # Skip header
-                if len(row) >= 6:
-                    try:
-                        seq = int(row[5]) if row[5] else 0
-                        max_sequence = max(max_sequence, seq)
-                    except (ValueError, TypeError):
-                        pass
+            for record in get_timeline_records() or []:
+                if record['sequence'] != 999999:  # 999999 = missing sequence
+                    max_sequence = max(max_sequence, record['sequence'])
             next_sequence = max_sequence + 1
             
-            worksheet.update(f'A{next_row}:F{next_row}', [[entry_id, tab_name, date, time, details, next_sequence]])
+            # append_row lets Sheets find the next free row server-side (no full-sheet read)
+            worksheet.append_row([entry_id, tab_name, date, time, details, next_sequence], table_range='A1')
             
             # Clear cache for this tab
-            cache_key = f'timeline_entries_{tab_name}'
-            clear_cache(cache_key)
+            clear_timeline_cache(tab_name)
             
             return True
         except Exception as update_error:
             print(f"Error updating Timeline sheet: {update_error}")
-            import traceback
             traceback.print_exc()
+            invalidate_spreadsheet_cache(timeline_tab_name)
             return False
     except Exception as e:
         print(f"Error adding timeline entry: {e}")
-        import traceback
         traceback.print_exc()
+        invalidate_spreadsheet_cache(timeline_tab_name)
         return False
 
 @app.route('/api/timeline/all')
@@ -5079,7 +5661,6 @@ def api_get_all_timeline_entries():
         })
     except Exception as e:
         print(f"Error in api_get_all_timeline_entries: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({
             'success': False,
@@ -5100,30 +5681,23 @@ def delete_timeline_entry(entry_id, tab_name=None):
         return False
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = spreadsheet.worksheet(timeline_tab_name)
+        worksheet = _get_timeline_worksheet()
         
-        # Find the row with this ID (search in first column only)
-        all_values = worksheet.get_all_values()
-        target_row = None
-        for idx, row in enumerate(all_values[1:], start=2):
-            if row and len(row) >= 1 and str(row[0]).strip() == str(entry_id).strip():
-                target_row = idx
-                break
+        # Find the row with this ID (indexed on first column only)
+        target_row = find_timeline_row(worksheet, entry_id)
         
         if target_row:
             worksheet.delete_rows(target_row)
             # Clear cache for this tab
-            cache_key = f'timeline_entries_{tab_name}'
-            clear_cache(cache_key)
+            clear_timeline_cache(tab_name)
             return True
         else:
             print(f"Timeline entry ID {entry_id} not found")
             return False
     except Exception as e:
         print(f"Error deleting timeline entry: {e}")
-        import traceback
         traceback.print_exc()
+        invalidate_spreadsheet_cache(timeline_tab_name)
         return False
 
 
@@ -5140,20 +5714,10 @@ def update_timeline_entry(entry_id, date, time, details, tab_name=None):
         return False
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = spreadsheet.worksheet(timeline_tab_name)
-
-        all_values = worksheet.get_all_values()
-        if not all_values or len(all_values) < 2:
-            print("Timeline sheet is empty or has no data rows")
-            return False
+        worksheet = _get_timeline_worksheet()
 
         # Locate ID in first column only (avoid matching in details)
-        target_row = None
-        for idx, row in enumerate(all_values[1:], start=2):
-            if row and len(row) >= 1 and str(row[0]).strip() == str(entry_id).strip():
-                target_row = idx
-                break
+        target_row = find_timeline_row(worksheet, entry_id)
 
         if not target_row:
             print(f"Timeline entry ID {entry_id} not found")
@@ -5163,13 +5727,12 @@ def update_timeline_entry(entry_id, date, time, details, tab_name=None):
         # Column B (PepHaul Entry ID) stays the same
         worksheet.update(f'C{target_row}:E{target_row}', [[date, time, details]])
         # Clear cache for this tab
-        cache_key = f'timeline_entries_{tab_name}'
-        clear_cache(cache_key)
+        clear_timeline_cache(tab_name)
         return True
     except Exception as e:
         print(f"Error updating timeline entry: {e}")
-        import traceback
         traceback.print_exc()
+        invalidate_spreadsheet_cache(timeline_tab_name)
         return False
 
 
@@ -5185,8 +5748,7 @@ def reorder_timeline_entry(entry_id, direction, tab_name=None):
         return False
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = spreadsheet.worksheet(timeline_tab_name)
+        worksheet = _get_timeline_worksheet()
         
         all_values = worksheet.get_all_values()
         if not all_values or len(all_values) < 2:
@@ -5264,14 +5826,13 @@ def reorder_timeline_entry(entry_id, direction, tab_name=None):
             worksheet.update(f'F{entry["row_idx"]}', [[i]])
         
         # Clear cache for this tab
-        cache_key = f'timeline_entries_{tab_name}'
-        clear_cache(cache_key)
+        clear_timeline_cache(tab_name)
         
         return True
     except Exception as e:
         print(f"Error reordering timeline entry: {e}")
-        import traceback
         traceback.print_exc()
+        invalidate_spreadsheet_cache(timeline_tab_name)
         return False
 
 
@@ -5283,11 +5844,9 @@ def api_get_timeline():
     return jsonify({'entries': entries})
 
 @app.route('/api/admin/timeline', methods=['POST'])
+@admin_required
 def api_add_timeline():
     """Add timeline entry - tab-specific"""
-    if not session.get('is_admin'):
-        return jsonify({'error': 'Unauthorized'}), 401
-    
     data = request.json or {}
     date = data.get('date', '')
     time = data.get('time', '')
@@ -5303,11 +5862,9 @@ def api_add_timeline():
     return jsonify({'error': 'Failed to add timeline entry'}), 500
 
 @app.route('/api/admin/timeline/<entry_id>', methods=['DELETE'])
+@admin_required
 def api_delete_timeline(entry_id):
     """Delete timeline entry - tab-specific"""
-    if not session.get('is_admin'):
-        return jsonify({'error': 'Unauthorized'}), 401
-    
     tab_name = (request.json or {}).get('tab_name') if request.is_json else request.args.get('tab_name')
     tab_name = tab_name or get_current_pephaul_tab()
     
@@ -5318,11 +5875,9 @@ def api_delete_timeline(entry_id):
 
 
 @app.route('/api/admin/timeline/<entry_id>', methods=['PUT', 'PATCH'])
+@admin_required
 def api_update_timeline(entry_id):
     """Update timeline entry - tab-specific"""
-    if not session.get('is_admin'):
-        return jsonify({'error': 'Unauthorized'}), 401
-
     data = request.json or {}
     date = (data.get('date') or '').strip()
     time = (data.get('time') or '').strip()
@@ -5365,8 +5920,7 @@ def api_clear_timeline_cache():
     
     try:
         # Clear all timeline-related caches
-        clear_cache_prefix('timeline_entries_')
-        clear_cache('all_timeline_entries')
+        clear_timeline_cache()
         
         return jsonify({
             'success': True,
@@ -5392,8 +5946,7 @@ def _fetch_pephaul_tabs():
     """Fetch available PepHaul Entry tabs from the spreadsheet."""
     if not sheets_client:
         return []
-    spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-    titles = [ws.title for ws in spreadsheet.worksheets()]
+    titles = _sheet_titles(_get_spreadsheet())
     tabs = [t for t in titles if str(t).strip().lower().startswith('pephaul entry')]
 
     def _sort_key(name: str):
@@ -5421,16 +5974,13 @@ def api_pephaul_tabs():
         return jsonify({'success': True, 'current_tab': get_current_pephaul_tab(), 'tabs': tabs})
     except Exception as e:
         print(f"Error in api_pephaul_tabs: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'current_tab': get_current_pephaul_tab(), 'tabs': []}), 500
 
 @app.route('/api/admin/theme', methods=['POST'])
+@admin_required
 def api_set_theme():
     """Set theme"""
-    if not session.get('is_admin'):
-        return jsonify({'error': 'Unauthorized'}), 401
-    
     data = request.json
     theme_name = data.get('theme')
     
@@ -5463,6 +6013,303 @@ def api_products():
         })
     return jsonify(products)
 
+# Columnar (SoA) view of the cached order rows used by lookup: parallel lists indexed by row position,
+# plus normalized telegram -> [row positions] for exact matches
+OrdersColumns = namedtuple('OrdersColumns', ['order_ids', 'telegrams_raw', 'telegrams_norm', 'by_telegram'])
+
+# Per-tab lookup columns: tab_name -> (orders list they were built from, OrdersColumns)
+_orders_telegram_index = {}
+# Only refetch on a lookup miss when the cached orders are at least this old (seconds)
+LOOKUP_RETRY_MIN_CACHE_AGE = 15
+
+_TELEGRAM_COL_RE = _re.compile('telegram', _re.IGNORECASE)
+_TELEGRAM_FALLBACK_KEYS = ['Telegram Username', 'telegram username', 'Telegram Username ', 'TelegramUsername']
+
+def _telegram_columns(keys):
+    """Telegram-like column names in priority order (detected once per header set, not per row)"""
+    columns = [k for k in keys if _TELEGRAM_COL_RE.search(str(k))]
+    # Fallback to common variations
+    columns.extend(k for k in _TELEGRAM_FALLBACK_KEYS if k not in columns)
+    return columns
+
+def _order_telegram_value(order, telegram_columns=None):
+    """Return the raw telegram value of an order row (first non-empty telegram-like column)"""
+    for key in (telegram_columns if telegram_columns is not None else _telegram_columns(order.keys())):
+        value = order.get(key, None)
+        if value is not None and str(value).strip():
+            return value
+    return ''
+
+def _build_orders_columns(orders):
+    """Build the OrdersColumns view (one pass over the rows; rows without an Order ID get '' telegram)"""
+    order_ids = []
+    telegrams_raw = []
+    telegrams_norm = []
+    by_telegram = defaultdict(list)
+    # Rows of one cache build share the same (normalized) header keys
+    telegram_columns = _telegram_columns(orders[0].keys()) if orders else []
+    # Every item row of an order repeats its telegram - normalize each distinct raw value once
+    normalized_by_raw = {'': ''}
+    for pos, order in enumerate(orders or []):
+        order_id = order.get('Order ID', '')
+        order_telegram_raw = _order_telegram_value(order, telegram_columns) if order_id else ''
+        order_telegram_normalized = normalized_by_raw.get(order_telegram_raw)
+        if order_telegram_normalized is None:
+            order_telegram_normalized = normalized_by_raw[order_telegram_raw] = normalize_telegram_username(order_telegram_raw)
+        order_ids.append(order_id)
+        telegrams_raw.append(order_telegram_raw)
+        telegrams_norm.append(order_telegram_normalized)
+        if order_telegram_normalized:
+            by_telegram[order_telegram_normalized].append(pos)
+    return OrdersColumns(order_ids, telegrams_raw, telegrams_norm, dict(by_telegram))
+
+# Search view of the cached order rows: rows are (row position, order_id_lc, name_lc, telegram_lc);
+# trigrams maps each 3-char substring of those fields -> set of indexes into rows
+OrdersSearchIndex = namedtuple('OrdersSearchIndex', ['rows', 'trigrams'])
+
+# Per-tab search index: tab_name -> (orders list it was built from, OrdersSearchIndex)
+_orders_search_index = {}
+
+def _trigrams(text):
+    """All 3-character substrings of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _build_orders_search_rows(orders):
+    """Lowercase the searchable fields and index their trigrams once per cache build (rows without an Order ID are skipped)"""
+    rows = []
+    trigrams = defaultdict(set)
+    for pos, order in enumerate(orders or []):
+        order_id = order.get('Order ID', '')
+        if not order_id:
+            continue
+        name = _first_present(order, 'Name', 'Full Name')
+        row = (pos, str(order_id).lower(), str(name).lower(), str(order.get('Telegram Username', '')).lower())
+        row_index = len(rows)
+        rows.append(row)
+        for field in row[1:]:
+            for gram in _trigrams(field):
+                trigrams[gram].add(row_index)
+    return OrdersSearchIndex(rows, dict(trigrams))
+
+def _get_orders_search_index(tab_name, orders):
+    """Search index for the cached orders list (rebuilt only when the cached list changed)"""
+    cached = _orders_search_index.get(tab_name)
+    if cached is None or cached[0] is not orders:
+        cached = (orders, _build_orders_search_rows(orders))
+        _orders_search_index[tab_name] = cached
+    return cached[1]
+
+def _search_order_rows(index, query):
+    """Search rows whose order id, name or telegram contains query (lowercase), in sheet order"""
+    if len(query) < 3:
+        return [row for row in index.rows if query in row[2] or query in row[3] or query in row[1]]
+    # Candidates must contain every trigram of the query; intersect smallest posting lists first
+    postings = sorted((index.trigrams.get(gram, ()) for gram in _trigrams(query)), key=len)
+    if not postings[0]:
+        return []
+    candidates = set(postings[0]).intersection(*postings[1:])
+    rows = index.rows
+    return [rows[i] for i in sorted(candidates)
+            if query in rows[i][2] or query in rows[i][3] or query in rows[i][1]]
+
+# Columnar view of the fields /api/orders reads, resolved from the sheet headers once per fetch.
+# Values are the raw cell values (including header fallbacks like Name -> Full Name), one list per field.
+OrdersListingColumns = namedtuple('OrdersListingColumns', [
+    'order_id', 'order_date', 'full_name', 'telegram', 'grand_total', 'status', 'locked',
+    'payment_status', 'amount_paid', 'remaining_balance', 'mailing_address', 'tracking_number',
+    'product_code', 'product_name', 'order_type', 'qty', 'line_total'
+])
+
+# Where each listing column comes from: (candidate sheet headers in priority order, default when none present)
+_ORDERS_LISTING_SOURCES = OrdersListingColumns(
+    order_id=(('Order ID',), ''),
+    order_date=(('Order Date',), ''),
+    full_name=(('Name', 'Full Name'), ''),
+    telegram=(('Telegram Username',), ''),
+    grand_total=(('Grand Total PHP',), 0),
+    status=(('Order Status',), 'Pending'),
+    locked=(('Locked',), 'No'),
+    payment_status=(('Payment Status', 'Confirmed Paid?'), 'Unpaid'),
+    amount_paid=(('Partial Payment', 'Amount Paid PHP', 'Amount Paid'), ''),
+    remaining_balance=(('Remaining Balance', 'Remaining Balance PHP'), ''),
+    mailing_address=(('Mailing Address',), ''),
+    tracking_number=(('Tracking Number',), ''),
+    product_code=(('Product Code',), None),
+    product_name=(('Product Name',), ''),
+    order_type=(('Order Type',), ''),
+    qty=(('QTY',), 0),
+    line_total=(('Line Total PHP',), 0),
+)
+
+# Per-tab listing columns: tab_name -> (orders list they were built from, OrdersListingColumns)
+_orders_listing_index = {}
+
+def _build_orders_listing_columns(orders):
+    """
+    Split the order rows into per-field columns.
+    Rows of one sheet read share one header set, so the header fallbacks are resolved once
+    from the first row and every row is read with a single itemgetter call; rows that don't
+    match that header set fall back to per-row resolution.
+    """
+    orders = orders or []
+    if orders:
+        header_keys = orders[0].keys()
+        resolved = [next((k for k in keys if k in header_keys), None) for keys, _ in _ORDERS_LISTING_SOURCES]
+        present_keys = [k for k in resolved if k is not None]
+        width = len(orders[0])
+        if len(present_keys) > 1 and all(len(order) == width for order in orders):
+            try:
+                present_columns = iter(zip(*map(itemgetter(*present_keys), orders)))
+                return OrdersListingColumns(*(
+                    list(next(present_columns)) if key is not None else [default] * len(orders)
+                    for key, (_, default) in zip(resolved, _ORDERS_LISTING_SOURCES)
+                ))
+            except KeyError:
+                pass  # mixed header sets - resolve per row below
+    
+    columns = OrdersListingColumns(*([] for _ in OrdersListingColumns._fields))
+    for order in orders:
+        for column, (keys, default) in zip(columns, _ORDERS_LISTING_SOURCES):
+            column.append(_first_present(order, *keys, default=default))
+    return columns
+
+def _get_orders_listing_columns(tab_name, orders):
+    """Listing columns for the cached orders list (rebuilt only when the cached list changed)"""
+    cached = _orders_listing_index.get(tab_name)
+    if cached is None or cached[0] is not orders:
+        cached = (orders, _build_orders_listing_columns(orders))
+        _orders_listing_index[tab_name] = cached
+    return cached[1]
+
+# Sheet position of each order: Order ID -> 1-based row of its first sheet row, built from the same
+# get_all_values() read as the cached rows (the records themselves don't carry row numbers)
+OrderRowIndex = namedtuple('OrderRowIndex', ['order_id_col', 'rows'])
+
+# Per-tab row index: tab_name -> (orders list it was read with, OrderRowIndex)
+_orders_row_index = {}
+
+def _build_order_row_index(all_values, order_id_col):
+    """Build the OrderRowIndex from raw sheet values (first occurrence of each Order ID wins)"""
+    rows = {}
+    for row_num, row in enumerate(all_values[1:], start=2):
+        if len(row) > order_id_col and row[order_id_col]:
+            rows.setdefault(row[order_id_col], row_num)
+    return OrderRowIndex(order_id_col, rows)
+
+def find_order_first_row(worksheet, order_id):
+    """
+    1-based sheet row of an order's first row.
+    Uses the row index of the live orders cache and confirms it with a two-cell read (the row holds the
+    order, the row above doesn't); falls back to a full-sheet worksheet.find() if the index can't be trusted.
+    """
+    from gspread.utils import rowcol_to_a1
+    tab_name = get_current_pephaul_tab()
+    cached = _orders_row_index.get(tab_name)
+    # Only trust the index while the orders it was read with are still the cached ones (writes clear them)
+    if cached is not None and cached[0] is _cache.get(f'orders_{tab_name}'):
+        index = cached[1]
+        row_num = index.rows.get(order_id)
+        if row_num is not None:
+            col = index.order_id_col + 1
+            values = worksheet.get(f'{rowcol_to_a1(row_num - 1, col)}:{rowcol_to_a1(row_num, col)}')
+            values = [(row[0] if row else '') for row in values] + ['', '']
+            if values[1] == order_id and values[0] != order_id:
+                return row_num
+    cell = worksheet.find(order_id)
+    return cell.row if cell else None
+
+def _get_orders_telegram_columns(tab_name, orders):
+    """Lookup columns for the cached orders list (rebuilt only when the cached list changed)"""
+    cached = _orders_telegram_index.get(tab_name)
+    if cached is None or cached[0] is not orders:
+        cached = (orders, _build_orders_columns(orders))
+        _orders_telegram_index[tab_name] = cached
+    return cached[1]
+
+def _match_orders_by_telegram(tab_name, orders, telegram_normalized):
+    """
+    Return [(order, raw telegram)] rows for a normalized telegram username.
+    Exact (case-insensitive) matches come from a dict lookup; substring matching is only
+    used when there is no exact hit and scans the distinct telegram keys, not the rows.
+    The columns are built by _fetch_orders_from_sheets (rebuilt here if the cached list changed).
+    """
+    if not telegram_normalized:
+        return []
+    cols = _get_orders_telegram_columns(tab_name, orders)
+    
+    positions = cols.by_telegram.get(telegram_normalized)
+    if not positions:
+        # Fallback to substring match for flexibility (user input contained in order telegram).
+        # Test each distinct username once; sort positions to keep sheet row order.
+        positions = sorted(pos for t, rows in cols.by_telegram.items() if telegram_normalized in t for pos in rows)
+    return [(orders[i], cols.telegrams_raw[i]) for i in positions]
+
+def _group_lookup_orders(matches):
+    """Group matched [(order, raw telegram)] rows by Order ID into lookup results"""
+    # Bucket matched rows by Order ID in one pass; header fields are read once per order, not per row.
+    # Rows of one order arrive as a consecutive run, so the bucket dict is only probed when the ID changes.
+    rows_by_order = {}
+    current_id = None
+    rows = None
+    for match in matches:
+        order_id = match[0].get('Order ID', '')
+        if rows is None or order_id != current_id:
+            current_id = order_id
+            rows = rows_by_order.setdefault(order_id, [])
+        rows.append(match)
+    
+    results = []
+    for order_id, rows in rows_by_order.items():
+        order, order_telegram_raw = rows[0]
+        get = order.get
+        # Use the dynamically found telegram value instead of hardcoded column name
+        telegram_value_for_result = order_telegram_raw if order_telegram_raw else (
+            get('Telegram Username', '') or 
+            get('telegram username', '') or 
+            ''
+        )
+        
+        payment_status_value = _first_present(order, 'Payment Status', 'Confirmed Paid?', default='Unpaid')
+        grand_total_value = float(get('Grand Total PHP', 0) or 0)
+        amount_paid_php, remaining_balance_php = derive_payment_amounts(
+            grand_total_value,
+            payment_status_value,
+            _first_present(order, 'Partial Payment', 'Amount Paid PHP', 'Amount Paid'),
+            _first_present(order, 'Remaining Balance', 'Remaining Balance PHP')
+        )
+        
+        items = []
+        for row, _ in rows:
+            if row.get('Product Code'):
+                qty = int(row.get('QTY', 0) or 0)
+                # Only include items with quantity > 0
+                if qty > 0:
+                    items.append({
+                        'product_code': row.get('Product Code', ''),
+                        'product_name': row.get('Product Name', ''),
+                        'order_type': row.get('Order Type', 'Vial'),  # Default to 'Vial' if missing
+                        'qty': qty,
+                        'line_total_php': float(row.get('Line Total PHP', 0) or 0)
+                    })
+        
+        results.append({
+            'order_id': order_id,
+            'order_date': get('Order Date', ''),
+            'full_name': _first_present(order, 'Name', 'Full Name'),
+            'telegram': telegram_value_for_result,
+            'grand_total_php': grand_total_value,
+            'status': get('Order Status', 'Pending'),
+            'payment_status': payment_status_value,
+            'amount_paid_php': amount_paid_php,
+            'remaining_balance_php': remaining_balance_php,
+            'payment_screenshot': _first_present(order, 'Link to Payment', 'Payment Screenshot Link', 'Payment Screenshot'),
+            'contact_number': get('Contact Number', ''),
+            'mailing_address': get('Mailing Address', ''),
+            'tracking_number': get('Tracking Number', ''),
+            'items': items
+        })
+    return results
+
 @app.route('/api/orders/lookup')
 def api_orders_lookup():
     """Lookup orders by telegram - uses shorter cache for faster fetching"""
@@ -5473,325 +6320,103 @@ def api_orders_lookup():
     
     # Accept optional tab_name parameter from frontend, fallback to current tab
     requested_tab = request.args.get('tab_name', '').strip()
-    if requested_tab:
-        tab_name = requested_tab
-        print(f"📋 Using requested tab: {tab_name}")
-    else:
-        tab_name = get_current_pephaul_tab()
-        print(f"📋 Using current tab: {tab_name}")
+    tab_name = requested_tab or get_current_pephaul_tab()
     
     # Use shorter cache duration (30 seconds) for faster order lookup (tab-scoped)
     # Create a lambda that passes tab_name to _fetch_orders_from_sheets
-    orders = get_cached(f'orders_{tab_name}', lambda: _fetch_orders_from_sheets(tab_name), cache_duration=30)
+    cache_key = f'orders_{tab_name}'
+    orders = get_cached(cache_key, lambda: _fetch_orders_from_sheets(tab_name), cache_duration=30)
     
     # Normalize telegram username (remove @ if present for comparison)
     telegram_normalized = telegram.lstrip('@') if telegram else ''
     
-    # Debug: Log the lookup attempt
-    print(f"🔍 Looking up orders for telegram: '{telegram}' (normalized: '{telegram_normalized}') in tab: '{tab_name}'")
-    print(f"📊 Total orders in cache for tab '{tab_name}': {len(orders)}")
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("Looking up orders for telegram %r (normalized %r) in tab %r (%s cached rows, requested tab: %s)",
+                     telegram, telegram_normalized, tab_name, len(orders), bool(requested_tab))
+        if orders:
+            logger.debug("First order sample keys: %s, Order ID: %r", list(orders[0].keys())[:10], orders[0].get('Order ID', None))
+    
+    # Filter by telegram (hash lookup on the prebuilt per-tab index) and group by Order ID
+    matches = _match_orders_by_telegram(tab_name, orders, telegram_normalized)
+    result = _group_lookup_orders(matches)
+    if debug:
+        logger.debug("Found %s matching orders for %r (%s matches)", len(result), telegram, len(matches))
+    
+    # If no matches found, refetch once - but only when the cached rows could be stale.
+    # Rows fetched moments ago won't contain the username either (usually a typo).
+    cache_age = time.time() - _cache_timestamps.get(cache_key, 0)
+    if not matches and (not orders or cache_age > LOOKUP_RETRY_MIN_CACHE_AGE):
+        logger.info("Order lookup miss in %.0fs old cache for tab %r, refetching", cache_age, tab_name)
+        clear_cache(cache_key)
+        # Use the same tab_name (either requested or current)
+        orders = get_cached(cache_key, lambda: _fetch_orders_from_sheets(tab_name), cache_duration=30)
+        matches = _match_orders_by_telegram(tab_name, orders, telegram_normalized)
+        result = _group_lookup_orders(matches)
+        if debug:
+            logger.debug("Retry over %s rows: found %s matching orders (%s matches)", len(orders), len(result), len(matches))
     
-    # Debug: Show sample of what's in the cache
-    if orders and len(orders) > 0:
-        print(f"📋 First order sample keys: {list(orders[0].keys())[:10]}")
-        # Check if first order has Order ID
-        first_order_id = orders[0].get('Order ID', None)
-        print(f"📋 First order Order ID: {repr(first_order_id)}")
+    return fast_json_response(result)
+
+@app.route('/api/orders')
+def api_orders():
+    """Get all orders grouped by Order ID"""
+    # Listing reads the cached rows' columnar view directly - it needs no supplier enrichment
+    tab_name = get_current_pephaul_tab()
+    orders = get_cached(f'orders_{tab_name}', lambda: _fetch_orders_from_sheets(tab_name), cache_duration=180) or []
+    cols = _get_orders_listing_columns(tab_name, orders)
     
-    # Group by Order ID and filter by telegram
+    # Group by Order ID. An order's rows are appended together, so they arrive as consecutive runs:
+    # the group dict is only probed when the Order ID changes (sheet order is kept - no re-sort)
     grouped = {}
-    matched_count = 0
-    checked_count = 0
-    
-    for order in orders:
-        order_id = order.get('Order ID', '')
+    current_id = None
+    group = None
+    for i, order_id in enumerate(cols.order_id):
         if not order_id:
             continue
-        
-        checked_count += 1
-        
-        # Try multiple possible column name variations (case-insensitive, handle whitespace)
-        # Also check all keys that contain 'telegram' (case-insensitive)
-        order_telegram_raw = None
-        telegram_key_found = None
-        for key in order.keys():
-            if 'telegram' in key.lower():
-                value = order.get(key, '')
-                # Check if value exists and is not empty (even if it's just whitespace, we want to see it)
-                if value is not None:
-                    value_str = str(value).strip()
-                    if value_str:  # Only use if non-empty after stripping
-                        order_telegram_raw = value
-                        telegram_key_found = key
-                        break
-                    elif value_str == '' and order_telegram_raw is None:
-                        # Store empty string if we haven't found anything yet (for debugging)
-                        order_telegram_raw = value_str
-                        telegram_key_found = key
-        
-        # Fallback to common variations if not found
-        if order_telegram_raw is None:
-            for fallback_key in ['Telegram Username', 'telegram username', 'Telegram Username ', 'TelegramUsername']:
-                value = order.get(fallback_key, None)
-                if value is not None:
-                    value_str = str(value).strip()
-                    if value_str:
-                        order_telegram_raw = value
-                        telegram_key_found = fallback_key
-                        break
-        
-        # Default to empty string if still not found
-        if order_telegram_raw is None:
-            order_telegram_raw = ''
-        
-        # Convert to string and normalize
-        order_telegram_str = str(order_telegram_raw) if order_telegram_raw is not None else ''
-        order_telegram = order_telegram_str.lower().strip()
-        order_telegram_normalized = order_telegram.lstrip('@')
-        
-        # Debug: Log ALL orders for troubleshooting (limit to first 10 to avoid spam)
-        if checked_count <= 10:
-            print(f"  [{checked_count}] Order {order_id}: key='{telegram_key_found}', raw='{repr(order_telegram_raw)}', normalized='{order_telegram_normalized}'")
-            print(f"      Comparing: search='{telegram_normalized}' vs order='{order_telegram_normalized}'")
-        
-        # Match telegram with or without @ symbol (exact match after normalization)
-        matches = False
-        if telegram_normalized and order_telegram_normalized:
-            # Try exact match first (case-insensitive, whitespace trimmed)
-            if telegram_normalized == order_telegram_normalized:
-                matches = True
-                matched_count += 1
-                print(f"  ✅ MATCH! Order {order_id}: '{telegram_normalized}' == '{order_telegram_normalized}'")
-            # Fallback to substring match for flexibility (user input contained in order telegram)
-            elif telegram_normalized in order_telegram_normalized:
-                matches = True
-                matched_count += 1
-                print(f"  ✅ MATCH (substring)! Order {order_id}: '{telegram_normalized}' in '{order_telegram_normalized}'")
-        elif checked_count <= 10:
-            # Log why it didn't match (only for first 10 to avoid spam)
-            if not telegram_normalized:
-                print(f"      ⚠️ No match: search telegram is empty")
-            elif not order_telegram_normalized:
-                print(f"      ⚠️ No match: order telegram is empty")
-            else:
-                print(f"      ⚠️ No match: '{telegram_normalized}' != '{order_telegram_normalized}'")
-        
-        if not matches:
-            continue
-            
-        if order_id not in grouped:
-            # Use the dynamically found telegram value instead of hardcoded column name
-            telegram_value_for_result = order_telegram_raw if order_telegram_raw else (
-                order.get('Telegram Username', '') or 
-                order.get('telegram username', '') or 
-                ''
-            )
-            
-            payment_status_value = order.get('Payment Status', order.get('Confirmed Paid?', 'Unpaid'))
-            grand_total_value = float(order.get('Grand Total PHP', 0) or 0)
-            amount_paid_php, remaining_balance_php = derive_payment_amounts(
-                grand_total_value,
-                payment_status_value,
-                order.get('Partial Payment', order.get('Amount Paid PHP', order.get('Amount Paid', ''))),
-                order.get('Remaining Balance', order.get('Remaining Balance PHP', order.get('Remaining Balance', '')))
-            )
-
-            grouped[order_id] = {
-                'order_id': order_id,
-                'order_date': order.get('Order Date', ''),
-                'full_name': order.get('Name', order.get('Full Name', '')),
-                'telegram': telegram_value_for_result,
-                'grand_total_php': grand_total_value,
-                'status': order.get('Order Status', 'Pending'),
-                'payment_status': payment_status_value,
-                'amount_paid_php': amount_paid_php,
-                'remaining_balance_php': remaining_balance_php,
-                'payment_screenshot': order.get('Link to Payment', order.get('Payment Screenshot Link', order.get('Payment Screenshot', ''))),
-                'contact_number': order.get('Contact Number', ''),
-                'mailing_address': order.get('Mailing Address', ''),
-                'tracking_number': order.get('Tracking Number', ''),
-                'items': []
-            }
-        
-        if order.get('Product Code'):
-            qty = int(order.get('QTY', 0) or 0)
-            # Only include items with quantity > 0
-            if qty > 0:
-                grouped[order_id]['items'].append({
-                    'product_code': order.get('Product Code', ''),
-                    'product_name': order.get('Product Name', ''),
-                    'order_type': order.get('Order Type', 'Vial'),  # Default to 'Vial' if missing
-                    'qty': qty,
-                    'line_total_php': float(order.get('Line Total PHP', 0) or 0)
-                })
-    
-    result = list(grouped.values())
-    print(f"✅ Found {len(result)} matching orders for '{telegram}' ({matched_count} matches)")
-    
-    # If no matches found, clear cache and retry once
-    if len(result) == 0 and matched_count == 0:
-        print(f"⚠️ No matches found, clearing cache and retrying...")
-        clear_cache_prefix('orders_')
-        # Use the same tab_name (either requested or current)
-        orders = get_cached(f'orders_{tab_name}', lambda: _fetch_orders_from_sheets(tab_name), cache_duration=30)
-        print(f"📊 Retry: Total orders after cache clear: {len(orders)}")
-        
-        # Retry the lookup with improved column detection
-        grouped = {}
-        retry_matched_count = 0
-        retry_checked_count = 0
-        
-        for order in orders:
-            order_id = order.get('Order ID', '')
-            if not order_id:
-                continue
-            
-            retry_checked_count += 1
-            
-            # Use same improved column lookup as main loop
-            order_telegram_raw = None
-            telegram_key_found = None
-            for key in order.keys():
-                if 'telegram' in key.lower():
-                    value = order.get(key, '')
-                    if value is not None:
-                        value_str = str(value).strip()
-                        if value_str:
-                            order_telegram_raw = value
-                            telegram_key_found = key
-                            break
-            
-            if order_telegram_raw is None:
-                for fallback_key in ['Telegram Username', 'telegram username', 'Telegram Username ', 'TelegramUsername']:
-                    value = order.get(fallback_key, None)
-                    if value is not None:
-                        value_str = str(value).strip()
-                        if value_str:
-                            order_telegram_raw = value
-                            telegram_key_found = fallback_key
-                            break
-            
-            if order_telegram_raw is None:
-                order_telegram_raw = ''
-            
-            order_telegram = str(order_telegram_raw).lower().strip()
-            order_telegram_normalized = order_telegram.lstrip('@')
-            
-            if retry_checked_count <= 5:
-                print(f"  [RETRY {retry_checked_count}] Order {order_id}: key='{telegram_key_found}', telegram='{order_telegram_raw}' (normalized: '{order_telegram_normalized}')")
-            
-            matches = False
-            if telegram_normalized and order_telegram_normalized:
-                if telegram_normalized == order_telegram_normalized:
-                    matches = True
-                    retry_matched_count += 1
-                    print(f"  ✅ RETRY MATCH! Order {order_id}: '{telegram_normalized}' == '{order_telegram_normalized}'")
-                elif telegram_normalized in order_telegram_normalized:
-                    matches = True
-                    retry_matched_count += 1
-                    print(f"  ✅ RETRY MATCH (substring)! Order {order_id}: '{telegram_normalized}' in '{order_telegram_normalized}'")
-            
-            if not matches:
-                continue
-                
-            if order_id not in grouped:
-                telegram_value_for_result = order_telegram_raw if order_telegram_raw else (
-                    order.get('Telegram Username', '') or 
-                    order.get('telegram username', '') or 
-                    ''
-                )
-                
-                payment_status_value = order.get('Payment Status', order.get('Confirmed Paid?', 'Unpaid'))
-                grand_total_value = float(order.get('Grand Total PHP', 0) or 0)
+        if order_id != current_id:
+            current_id = order_id
+            group = grouped.get(order_id)
+            if group is None:
+                payment_status_value = cols.payment_status[i]
+                grand_total_value = float(cols.grand_total[i] or 0)
                 amount_paid_php, remaining_balance_php = derive_payment_amounts(
                     grand_total_value,
                     payment_status_value,
-                    order.get('Partial Payment', order.get('Amount Paid PHP', order.get('Amount Paid', ''))),
-                    order.get('Remaining Balance', order.get('Remaining Balance PHP', order.get('Remaining Balance', '')))
+                    cols.amount_paid[i],
+                    cols.remaining_balance[i]
                 )
-
-                grouped[order_id] = {
+                group = grouped[order_id] = {
                     'order_id': order_id,
-                    'order_date': order.get('Order Date', ''),
-                    'full_name': order.get('Name', order.get('Full Name', '')),
-                    'telegram': telegram_value_for_result,
+                    'order_date': cols.order_date[i],
+                    'full_name': cols.full_name[i],
+                    'telegram': cols.telegram[i],
                     'grand_total_php': grand_total_value,
-                    'status': order.get('Order Status', 'Pending'),
+                    'status': cols.status[i],
+                    'locked': str(cols.locked[i]).lower() == 'yes',
                     'payment_status': payment_status_value,
                     'amount_paid_php': amount_paid_php,
                     'remaining_balance_php': remaining_balance_php,
-                    'payment_screenshot': order.get('Link to Payment', order.get('Payment Screenshot Link', order.get('Payment Screenshot', ''))),
-                    'contact_number': order.get('Contact Number', ''),
-                    'mailing_address': order.get('Mailing Address', ''),
+                    'mailing_address': cols.mailing_address[i],
+                    'tracking_number': cols.tracking_number[i],
                     'items': []
                 }
-            
-            if order.get('Product Code'):
-                qty = int(order.get('QTY', 0) or 0)
-                if qty > 0:
-                    grouped[order_id]['items'].append({
-                        'product_code': order.get('Product Code', ''),
-                        'product_name': order.get('Product Name', ''),
-                        'order_type': order.get('Order Type', 'Vial'),
-                        'qty': qty,
-                        'line_total_php': float(order.get('Line Total PHP', 0) or 0)
-                    })
         
-        result = list(grouped.values())
-        print(f"✅ Retry result: Found {len(result)} matching orders ({retry_matched_count} matches)")
-    
-    return jsonify(result)
-
-@app.route('/api/orders')
-def api_orders():
-    """Get all orders grouped by Order ID"""
-    orders = get_orders_from_sheets()
-    
-    # Group by Order ID
-    grouped = {}
-    for order in orders:
-        order_id = order.get('Order ID', '')
-        if not order_id:
-            continue
-            
-        if order_id not in grouped:
-            payment_status_value = order.get('Payment Status', order.get('Confirmed Paid?', 'Unpaid'))
-            grand_total_value = float(order.get('Grand Total PHP', 0) or 0)
-            amount_paid_php, remaining_balance_php = derive_payment_amounts(
-                grand_total_value,
-                payment_status_value,
-                order.get('Partial Payment', order.get('Amount Paid PHP', order.get('Amount Paid', ''))),
-                order.get('Remaining Balance', order.get('Remaining Balance PHP', order.get('Remaining Balance', '')))
-            )
-            grouped[order_id] = {
-                'order_id': order_id,
-                'order_date': order.get('Order Date', ''),
-                'full_name': order.get('Name', order.get('Full Name', '')),
-                'telegram': order.get('Telegram Username', ''),
-                'grand_total_php': grand_total_value,
-                'status': order.get('Order Status', 'Pending'),
-                'locked': str(order.get('Locked', 'No')).lower() == 'yes',
-                'payment_status': payment_status_value,
-                'amount_paid_php': amount_paid_php,
-                'remaining_balance_php': remaining_balance_php,
-                'mailing_address': order.get('Mailing Address', ''),
-                'tracking_number': order.get('Tracking Number', ''),
-                'items': []
-            }
-        
-        if order.get('Product Code'):
-            qty = int(order.get('QTY', 0) or 0)
+        product_code = cols.product_code[i]
+        if product_code:
+            qty = int(cols.qty[i] or 0)
             # Only include items with quantity > 0
             if qty > 0:
-                grouped[order_id]['items'].append({
-                    'product_code': order.get('Product Code', ''),
-                    'product_name': order.get('Product Name', ''),
-                    'order_type': order.get('Order Type', ''),
+                group['items'].append({
+                    'product_code': product_code,
+                    'product_name': cols.product_name[i],
+                    'order_type': cols.order_type[i],
                     'qty': qty,
-                    'line_total_php': float(order.get('Line Total PHP', 0) or 0)
+                    'line_total_php': float(cols.line_total[i] or 0)
                 })
     
-    return jsonify(list(grouped.values()))
+    # Grouping needs every row, but the (often multi-MB) body is encoded and sent in chunks
+    return stream_json_array(grouped.values())
 
 @app.route('/api/orders/<order_id>')
 def api_get_order(order_id):
@@ -5836,29 +6461,56 @@ def api_download_invoice(order_id):
 def api_search_orders():
     """Search orders by email or name"""
     query = request.args.get('q', '').lower()
-    orders = get_orders_from_sheets()
+    # Search reads the cached rows directly - it needs no supplier enrichment
+    tab_name = get_current_pephaul_tab()
+    orders = get_cached(f'orders_{tab_name}', lambda: _fetch_orders_from_sheets(tab_name), cache_duration=180) or []
     
     matching = {}
-    for order in orders:
+    # Trigram index narrows queries of 3+ chars to candidate rows; shorter queries scan the lowercased fields
+    for row in _search_order_rows(_get_orders_search_index(tab_name, orders), query):
+        order = orders[row[0]]
         order_id = order.get('Order ID', '')
-        if not order_id:
-            continue
-            
-        name = str(order.get('Name', order.get('Full Name', ''))).lower()
-        telegram = str(order.get('Telegram Username', '')).lower()
-        
-        if query in name or query in telegram or query in order_id.lower():
-            if order_id not in matching:
-                matching[order_id] = {
-                    'order_id': order_id,
-                    'full_name': order.get('Name', order.get('Full Name', '')),
-                    'telegram': order.get('Telegram Username', ''),
-                    'status': order.get('Order Status', 'Pending'),
-                    'payment_status': order.get('Payment Status', order.get('Confirmed Paid?', 'Unpaid')),
-                    'grand_total_php': float(order.get('Grand Total PHP', 0) or 0)
-                }
+        if matching.get(order_id) is None:
+            matching[order_id] = {
+                'order_id': order_id,
+                'full_name': _first_present(order, 'Name', 'Full Name'),
+                'telegram': order.get('Telegram Username', ''),
+                'status': order.get('Order Status', 'Pending'),
+                'payment_status': _first_present(order, 'Payment Status', 'Confirmed Paid?', default='Unpaid'),
+                'grand_total_php': float(order.get('Grand Total PHP', 0) or 0)
+            }
     
-    return jsonify(list(matching.values()))
+    return fast_json_response(list(matching.values()))
+
+def _records_from_values(values):
+    """Rows from a values read -> record dicts like worksheet.get_all_records() (None if headers aren't unique)"""
+    from gspread.utils import numericise_all
+    if not values:
+        return []
+    # get_all_values() pads every row (header included) to the widest row
+    width = max(len(row) for row in values)
+    padded = [list(row) + [''] * (width - len(row)) for row in values]
+    keys = padded[0]
+    if len(set(keys)) != len(keys):
+        return None  # get_all_records() rejects duplicate headers - leave it to the regular read
+    return [dict(zip(keys, numericise_all(row))) for row in padded[1:]]
+
+def _prefetch_submission_sheets():
+    """Refill the order-form lock and product caches from one batched values read when both are stale"""
+    if not sheets_client or _cache_is_fresh('settings_lock', 600) or _cache_is_fresh('products_sheet', 60):
+        return
+    try:
+        value_ranges = _get_spreadsheet().values_batch_get(["'Settings'", "'Price List'"]).get('valueRanges', [])
+        settings_records = _records_from_values(value_ranges[0].get('values', []))
+        product_records = _records_from_values(value_ranges[1].get('values', []))
+    except Exception as e:
+        # e.g. Settings tab not created yet - the regular per-sheet reads handle that
+        print(f"⚠️ Batched submission prefetch failed, using per-sheet reads: {e}")
+        return
+    if settings_records is not None:
+        get_cached('settings_lock', lambda: _fetch_order_form_lock(settings_records), cache_duration=600)
+    if product_records:
+        get_cached('products_sheet', lambda: _fetch_products_from_sheets(product_records), cache_duration=60)
 
 @app.route('/api/submit-order', methods=['POST'])
 def api_submit_order():
@@ -5872,12 +6524,12 @@ def api_submit_order():
             }), 400
         
         data = request.json
-        print(f"📥 Received order submission request")
-        print(f"📥 Full name: {data.get('full_name', 'MISSING')}")
-        print(f"📥 Telegram: {data.get('telegram', 'MISSING')}")
-        print(f"📥 Items count: {len(data.get('items', []))}")
-        print(f"📥 Items: {data.get('items', [])}")
-        print(f"📥 Supplier: {data.get('supplier', 'MISSING')}")
+        # Per-item diagnostics are debug-level (lazy %-formatting, skipped entirely unless LOG_LEVEL=DEBUG)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Received order submission: full_name=%r telegram=%r supplier=%r items=%s",
+                         data.get('full_name', 'MISSING'), data.get('telegram', 'MISSING'),
+                         data.get('supplier', 'MISSING'), data.get('items', []))
         
         # Validate required fields
         if not data.get('full_name') or not data.get('full_name').strip():
@@ -5904,6 +6556,17 @@ def api_submit_order():
                     'success': False,
                     'error': f'Item {idx + 1}: Quantity must be a positive number'
                 }), 400
+            # Whole quantities stay ints so pricing and the vial count use integer arithmetic
+            if isinstance(item['qty'], float) and item['qty'].is_integer():
+                item['qty'] = int(item['qty'])
+        
+        # The exchange rate is an independent HTTP call - on a cold cache fetch it alongside the Sheets reads below
+        exchange_rate_future = None
+        if not _cache_is_fresh('exchange_rate', 300):
+            exchange_rate_future = _prefetch_executor.submit(get_exchange_rate)
+        
+        # Settings + Price List in one Sheets request when both caches are cold
+        _prefetch_submission_sheets()
         
         # Check if order form is locked
         try:
@@ -5920,7 +6583,8 @@ def api_submit_order():
         
         # Get exchange rate with error handling
         try:
-            exchange_rate = normalize_exchange_rate(get_exchange_rate())
+            rate = exchange_rate_future.result() if exchange_rate_future is not None else get_exchange_rate()
+            exchange_rate = normalize_exchange_rate(rate)
         except Exception as e:
             print(f"⚠️ Error getting exchange rate: {e}, using fallback")
             exchange_rate = normalize_exchange_rate(FALLBACK_EXCHANGE_RATE)
@@ -5944,6 +6608,8 @@ def api_submit_order():
         
         # Consolidate items with same product_code + order_type + supplier
         consolidated = {}
+        # Per consolidated line: (code, supplier) trimmed for messages + uppercased for the product index
+        normalized_keys = {}
         for item in data.get('items', []):
             # Include supplier in key to handle duplicate codes across suppliers
             # Default to 'Default' if supplier is not provided
@@ -5958,6 +6624,9 @@ def api_submit_order():
                     'supplier': supplier,
                     'qty': item['qty']
                 }
+                code_trimmed = str(item['product_code']).strip()
+                supplier_trimmed = str(supplier).strip()
+                normalized_keys[key] = (code_trimmed, supplier_trimmed, code_trimmed.upper(), supplier_trimmed.upper())
         
         # Calculate totals
         total_usd = 0
@@ -5971,6 +6640,10 @@ def api_submit_order():
                 'error': 'Failed to load product information. Please try again.'
             }), 500
         
+        products_by_key, products_by_code = get_product_index(products)
+        
+        # Vials are tallied in the pricing pass for the tiered admin fee (product already resolved there)
+        total_vials = 0
         for key, item in consolidated.items():
             # Validate item has product_code
             product_code_raw = item.get('product_code')
@@ -5981,79 +6654,52 @@ def api_submit_order():
                     'error': f'Item is missing product_code. Item data: {item}'
                 }), 400
             
-            # Normalize product_code and supplier for comparison (strip whitespace, handle case)
-            product_code = str(product_code_raw).strip()
-            supplier = str(item.get('supplier', 'Default')).strip()
-            print(f"🔍 Looking for product: code='{product_code}', supplier='{supplier}'")
-            print(f"   Total products available: {len(products)}")
-            
-            # Debug: Show all products with matching code (case-insensitive)
-            matching_codes_debug = [p for p in products if str(p.get('code', '')).strip().upper() == product_code.upper()]
-            if matching_codes_debug:
-                print(f"   Found {len(matching_codes_debug)} product(s) with code '{product_code}' (case-insensitive):")
-                for p in matching_codes_debug:
-                    p_code = str(p.get('code', '')).strip()
-                    p_supplier = str(p.get('supplier', 'Default')).strip()
-                    print(f"     - {p.get('name')} (code: '{p_code}', supplier: '{p_supplier}')")
-                    print(f"       Code match: {p_code == product_code}, Supplier match: {p_supplier.lower() == supplier.lower()}")
+            # product_code/supplier trimmed, plus their uppercased index keys (normalized once at consolidation)
+            product_code, supplier, code_upper, supplier_upper = normalized_keys[key]
+            if debug:
+                logger.debug("Looking for product: code=%r supplier=%r", product_code, supplier)
+                # Show all products with matching code (case-insensitive)
+                for p in products_by_code.get(code_upper, ()):
+                    logger.debug("  candidate %s (code=%r, supplier=%r)", p.get('name'),
+                                 str(p.get('code', '')).strip(), str(p.get('supplier', 'Default')).strip())
             
             # Try to find product with matching code AND supplier (case-insensitive, trimmed)
-            product = None
-            for p in products:
-                p_code = str(p.get('code', '')).strip()
-                p_supplier = str(p.get('supplier', 'Default')).strip()
-                # Case-insensitive comparison for both code and supplier
-                if p_code.upper() == product_code.upper() and p_supplier.upper() == supplier.upper():
-                    product = p
-                    print(f"✅ Found product: {p.get('name')} (code: '{p_code}', supplier: '{p_supplier}')")
-                    break
+            product = products_by_key.get((code_upper, supplier_upper))
             
             # Fallback: if not found, try without supplier match (for backward compatibility)
             # BUT only if there's exactly ONE product with this code (to avoid ambiguity)
             if not product:
-                print(f"⚠️ Product '{product_code}' not found with supplier '{supplier}', trying without supplier match")
-                # Show available products with this code for debugging
-                matching_codes = [p for p in products if str(p.get('code', '')).strip().upper() == product_code.upper()]
+                logger.debug("Product %r not found with supplier %r, trying without supplier match", product_code, supplier)
+                matching_codes = products_by_code.get(code_upper, [])
                 if matching_codes:
-                    print(f"   Found {len(matching_codes)} product(s) with code '{product_code}':")
-                    for p in matching_codes:
-                        print(f"     - {p.get('name')} (supplier: '{p.get('supplier', 'Default')}')")
-                    
                     # Only use fallback if there's exactly ONE product with this code
                     if len(matching_codes) == 1:
                         product = matching_codes[0]
-                        print(f"✅ Using single matching product: {product.get('name')} (supplier: '{product.get('supplier', 'Default')}')")
+                        logger.debug("Using single matching product %s (supplier %r)", product.get('name'), product.get('supplier', 'Default'))
                     else:
                         # Multiple products with same code but different suppliers - this is ambiguous!
-                        print(f"❌ AMBIGUOUS: Multiple products found with code '{product_code}' from different suppliers")
-                        print(f"   User requested supplier: '{supplier}'")
-                        print(f"   Available suppliers: {[p.get('supplier', 'Default') for p in matching_codes]}")
+                        logger.warning("Ambiguous product code %r: requested supplier %r, available suppliers %s",
+                                       product_code, supplier, [p.get('supplier', 'Default') for p in matching_codes])
                         return jsonify({
                             'success': False,
                             'error': f'Product {product_code} not found for supplier {supplier}. Please contact support.'
                         }), 404
             
             if not product:
-                print(f"❌ Product {product_code} not found in products list")
-                print(f"   Searching for: code='{product_code}', supplier='{supplier}'")
-                print(f"   Total products in cache: {len(products)}")
-                
-                # Show all LEMBOT products for debugging
-                lembot_products = [p for p in products if 'LEMBOT' in str(p.get('code', '')).upper()]
-                if lembot_products:
-                    print(f"   Found {len(lembot_products)} LEMBOT product(s):")
+                logger.warning("Product %r (supplier %r) not found among %s products", product_code, supplier, len(products))
+                if debug:
+                    # Show all LEMBOT products and the first 20 codes for reference
+                    lembot_products = [p for p in products if 'LEMBOT' in str(p.get('code', '')).upper()]
                     for p in lembot_products:
-                        print(f"     - Code: '{p.get('code')}', Supplier: '{p.get('supplier')}', Name: {p.get('name')}")
-                
-                # Show first 20 product codes for reference
-                print(f"   Sample product codes: {[p.get('code') for p in products[:20]]}")
+                        logger.debug("  LEMBOT product: code=%r supplier=%r name=%s", p.get('code'), p.get('supplier'), p.get('name'))
+                    logger.debug("  Sample product codes: %s", [p.get('code') for p in products[:20]])
                 
                 return jsonify({
                     'success': False,
                     'error': f'Product {product_code} not found' + (f' for supplier {supplier}' if supplier else '')
                 }), 404
             
-            print(f"✅ Found product: {product.get('name', 'Unknown')} (code: {product_code}, supplier: {product.get('supplier', 'Default')})")
+            logger.debug("Found product %s (code %s, supplier %s)", product.get('name', 'Unknown'), product_code, product.get('supplier', 'Default'))
             
             # Always use supplier from product (product is source of truth)
             # This ensures supplier is always populated correctly
@@ -6061,7 +6707,7 @@ def api_submit_order():
             
             try:
                 order_type = item.get('order_type', 'Vial')
-                qty = float(item.get('qty', 0))
+                qty = item.get('qty', 0)  # validated int/float above
                 
                 if qty <= 0:
                     print(f"❌ Invalid quantity for {product_code}: {qty}")
@@ -6093,10 +6739,13 @@ def api_submit_order():
                     'line_total_php': line_total_php
                 })
                 total_usd += line_total_usd
-                print(f"✅ Added item: {product.get('name')} ({order_type} x{qty}) = ${line_total_usd:.2f}")
+                if order_type == 'Kit':
+                    total_vials += qty * product.get('vials_per_kit', 10)
+                else:
+                    total_vials += qty
+                logger.debug("Added item %s (%s x%s) = $%.2f", product.get('name'), order_type, qty, line_total_usd)
             except (KeyError, TypeError, ValueError) as e:
                 print(f"❌ Error calculating price for {product_code}: {e}")
-                import traceback
                 traceback.print_exc()
                 return jsonify({
                     'success': False,
@@ -6105,40 +6754,7 @@ def api_submit_order():
         
         total_php = total_usd * exchange_rate
         
-        # Calculate tiered admin fee based on total vials
-        total_vials = 0
-        for item in items_with_prices:
-            qty = float(item.get('qty', 0))
-            order_type = item.get('order_type', 'Vial')
-            product_code = str(item.get('product_code', '')).strip()
-            supplier = str(item.get('supplier', 'Default')).strip()
-            
-            # Find product to get vials_per_kit (normalize comparison like earlier in code)
-            product = None
-            for p in products:
-                p_code = str(p.get('code', '')).strip()
-                p_supplier = str(p.get('supplier', 'Default')).strip()
-                # Case-insensitive comparison for both code and supplier
-                if p_code.upper() == product_code.upper() and p_supplier.upper() == supplier.upper():
-                    product = p
-                    break
-            
-            # Fallback: if not found with supplier match, try without supplier (backward compatibility)
-            # BUT only if there's exactly ONE product with this code (to avoid ambiguity)
-            if not product:
-                matching_codes = [p for p in products if str(p.get('code', '')).strip().upper() == product_code.upper()]
-                if len(matching_codes) == 1:
-                    product = matching_codes[0]
-            
-            vials_per_kit = product.get('vials_per_kit', 10) if product else 10
-            
-            if order_type == 'Kit':
-                total_vials += qty * vials_per_kit
-            else:
-                total_vials += qty
-        
-        # Tiered admin fee: ₱300 for every 50 vials (or part thereof)
-        admin_fee_php = math.ceil(total_vials / 50) * 300 if total_vials > 0 else 0
+        admin_fee_php = admin_fee_for_vials(total_vials)
         grand_total_php = total_php + admin_fee_php
         
         order_data = {
@@ -6153,13 +6769,10 @@ def api_submit_order():
         
         # Save order to sheets
         try:
-            print(f"📝 Saving order to sheets: {len(order_data['items'])} items")
-            print(f"📝 Order data keys: {list(order_data.keys())}")
-            print(f"📝 First item keys: {list(order_data['items'][0].keys()) if order_data['items'] else 'No items'}")
+            logger.debug("Saving order to sheets: %s items", len(order_data['items']))
             order_id = save_order_to_sheets(order_data)
         except Exception as e:
             print(f"❌ Error saving order to sheets: {e}")
-            import traceback
             traceback.print_exc()
             return jsonify({
                 'success': False,
@@ -6197,14 +6810,14 @@ def api_submit_order():
 <b>Status:</b> Pending Payment
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
         except Exception as e:
             print(f"⚠️ Error sending Telegram notification: {e}")
             # Don't fail the order if Telegram fails
         
-        # Also notify customer if registered (non-blocking)
+        # Also notify customer if registered (non-blocking, runs alongside the admin notification)
         try:
-            notify_customer_order(order_data, order_id)
+            notify_in_background(notify_customer_order, order_data, order_id)
         except Exception as e:
             print(f"⚠️ Error notifying customer: {e}")
             # Don't fail the order if customer notification fails
@@ -6223,7 +6836,6 @@ def api_submit_order():
     
     except Exception as e:
         print(f"❌ Unexpected error in api_submit_order: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({
             'success': False,
@@ -6281,6 +6893,80 @@ def api_add_items(order_id=None):
             print(f"⚠️ Error checking order form lock status: {e}")
             # Continue if lock check fails (fail open for availability)
         
+        # Load products for item validation and pricing
+        try:
+            products = get_products()
+            product_index = get_product_index(products)
+        except Exception as e:
+            print(f"❌ Error getting products: {e}")
+            return jsonify({
+                'success': False,
+                'error': 'Failed to load product information. Please try again.'
+            }), 500
+        
+        # Resolve and validate every item against the product list before any order lookup or Sheets work,
+        # so a bad item fails fast and the pricing step below can't fail part-way
+        resolved_items = []
+        for idx, item in enumerate(items):
+            try:
+                # Read the item fields once
+                raw_product_code = item['product_code']
+                order_type = item.get('order_type', 'Vial')
+                qty = item['qty']
+                
+                # Normalize product_code and supplier for comparison (strip whitespace, handle case)
+                product_code = str(raw_product_code).strip()
+                item_supplier = str(item.get('supplier', 'Default')).strip()
+                
+                # Try to find product with matching code AND supplier (case-insensitive, trimmed)
+                product = product_index.by_key.get((product_code.upper(), item_supplier.upper()))
+                
+                # Fallback: if not found with supplier match, try without supplier (backward compatibility)
+                # BUT only if there's exactly ONE product with this code (to avoid ambiguity)
+                if not product:
+                    matching_codes = product_index.by_code.get(product_code.upper(), [])
+                    if len(matching_codes) == 1:
+                        product = matching_codes[0]
+                    elif len(matching_codes) > 1:
+                        # Multiple products with same code - ambiguous!
+                        print(f"❌ AMBIGUOUS: Multiple products found with code '{product_code}' from different suppliers")
+                        return jsonify({
+                            'success': False,
+                            'error': f'Product {product_code} not found for supplier {item_supplier}. Please contact support.'
+                        }), 404
+                
+                if not product:
+                    return jsonify({
+                        'success': False,
+                        'error': f'Product {raw_product_code} not found'
+                    }), 404
+                
+                # Always use supplier from product (product is source of truth)
+                # This ensures supplier is always populated correctly
+                supplier = product.get('supplier', 'Default')
+                
+                unit_price = product['kit_price'] if order_type == 'Kit' else product['vial_price']
+                if not unit_price or unit_price <= 0:
+                    return jsonify({
+                        'success': False,
+                        'error': f'Invalid price for product {raw_product_code}'
+                    }), 400
+                
+                resolved_items.append({
+                    'product_code': raw_product_code,
+                    'product_name': product['name'],
+                    'order_type': order_type,
+                    'supplier': supplier,  # CRITICAL: Always include supplier from product
+                    'qty': qty,
+                    'unit_price_usd': unit_price
+                })
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"❌ Error processing item {idx + 1}: {e}")
+                return jsonify({
+                    'success': False,
+                    'error': f'Error processing item {idx + 1}: {str(e)}'
+                }), 500
+        
         # If order_id not in URL, try to get from request body or use telegram lookup
         if not order_id:
             order_id = data.get('order_id')
@@ -6318,12 +7004,11 @@ def api_add_items(order_id=None):
                             'error': 'Failed to load orders. Please try again.'
                         }), 500
                     
-                    telegram_normalized = telegram_username.lower().strip().lstrip('@')
+                    telegram_normalized = normalize_telegram_username(telegram_username)
                     found_order_id = None
                     
                     for o in orders:
-                        order_telegram = str(o.get('Telegram Username', '')).lower().strip().lstrip('@')
-                        if order_telegram == telegram_normalized:
+                        if normalize_telegram_username(o.get('Telegram Username', '')) == telegram_normalized:
                             # Get the most recent non-cancelled, non-locked order
                             order_status = o.get('Order Status', 'Pending')
                             order_locked = str(o.get('Locked', 'No')).lower() == 'yes'
@@ -6352,7 +7037,6 @@ def api_add_items(order_id=None):
                     
         except Exception as e:
             print(f"❌ Error finding order: {e}")
-            import traceback
             traceback.print_exc()
             return jsonify({
                 'success': False,
@@ -6398,18 +7082,8 @@ def api_add_items(order_id=None):
         if is_paid and not is_admin:
             return jsonify({
                 'success': False,
-                'error': 'Cannot add items to a paid order. Please contact admin.'
-            }), 403
-        
-        # Calculate prices with error handling
-        try:
-            products = get_products()
-        except Exception as e:
-            print(f"❌ Error getting products: {e}")
-            return jsonify({
-                'success': False,
-                'error': 'Failed to load product information. Please try again.'
-            }), 500
+                'error': 'Cannot add items to a paid order. Please contact admin.'
+            }), 403
         
         try:
             exchange_rate = normalize_exchange_rate(order.get('exchange_rate'))
@@ -6430,77 +7104,17 @@ def api_add_items(order_id=None):
             existing_key = _qty_change_key(existing_item.get('product_code'), existing_item.get('order_type'))
             previous_qty_by_key[existing_key] = existing_qty
         
+        # Price the validated items (products were resolved before the order lookup)
         items_with_prices = []
-        for idx, item in enumerate(items):
-            try:
-                # Normalize product_code and supplier for comparison (strip whitespace, handle case)
-                product_code = str(item['product_code']).strip()
-                item_supplier = str(item.get('supplier', 'Default')).strip()
-                
-                # Try to find product with matching code AND supplier (case-insensitive, trimmed)
-                product = None
-                for p in products:
-                    p_code = str(p.get('code', '')).strip()
-                    p_supplier = str(p.get('supplier', 'Default')).strip()
-                    # Case-insensitive comparison for both code and supplier
-                    if p_code.upper() == product_code.upper() and p_supplier.upper() == item_supplier.upper():
-                        product = p
-                        break
-                
-                # Fallback: if not found with supplier match, try without supplier (backward compatibility)
-                # BUT only if there's exactly ONE product with this code (to avoid ambiguity)
-                if not product:
-                    matching_codes = [p for p in products if str(p.get('code', '')).strip().upper() == product_code.upper()]
-                    if len(matching_codes) == 1:
-                        product = matching_codes[0]
-                    elif len(matching_codes) > 1:
-                        # Multiple products with same code - ambiguous!
-                        print(f"❌ AMBIGUOUS: Multiple products found with code '{product_code}' from different suppliers")
-                        return jsonify({
-                            'success': False,
-                            'error': f'Product {product_code} not found for supplier {item_supplier}. Please contact support.'
-                        }), 404
-                
-                if not product:
-                    return jsonify({
-                        'success': False,
-                        'error': f'Product {item["product_code"]} not found'
-                    }), 404
-                
-                # Always use supplier from product (product is source of truth)
-                # This ensures supplier is always populated correctly
-                supplier = product.get('supplier', 'Default')
-                
-                unit_price = product['kit_price'] if item.get('order_type') == 'Kit' else product['vial_price']
-                if not unit_price or unit_price <= 0:
-                    return jsonify({
-                        'success': False,
-                        'error': f'Invalid price for product {item["product_code"]}'
-                    }), 400
-                
-                line_total_usd = unit_price * item['qty']
-                line_total_php = line_total_usd * exchange_rate
-                
-                items_with_prices.append({
-                    'product_code': item['product_code'],
-                    'product_name': product['name'],
-                    'order_type': item.get('order_type', 'Vial'),
-                    'supplier': supplier,  # CRITICAL: Always include supplier from product
-                    'qty': item['qty'],
-                    'unit_price_usd': unit_price,
-                    'line_total_usd': line_total_usd,
-                    'line_total_php': line_total_php
-                })
-            except (KeyError, TypeError, ValueError) as e:
-                print(f"❌ Error processing item {idx + 1}: {e}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Error processing item {idx + 1}: {str(e)}'
-                }), 500
-        
-        # Filter out 0 quantity items before adding
-        items_with_prices = [item for item in items_with_prices if item.get('qty', 0) > 0]
+        for item in resolved_items:
+            line_total_usd = item['unit_price_usd'] * item['qty']
+            items_with_prices.append({
+                **item,
+                'line_total_usd': line_total_usd,
+                'line_total_php': line_total_usd * exchange_rate
+            })
         
+        # Every qty was validated > 0 up front, so no 0-quantity filter pass is needed here
         if not items_with_prices:
             return jsonify({
                 'success': False,
@@ -6515,7 +7129,6 @@ def api_add_items(order_id=None):
                                         is_post_payment=is_paid)
         except Exception as e:
             print(f"❌ Error adding items to order: {e}")
-            import traceback
             traceback.print_exc()
             return jsonify({
                 'success': False,
@@ -6582,7 +7195,6 @@ def api_add_items(order_id=None):
     
     except Exception as e:
         print(f"❌ Unexpected error in api_add_items: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({
             'success': False,
@@ -6651,7 +7263,7 @@ def api_update_item(order_id):
 {updated_product_line}
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
         except Exception as notify_error:
             print(f"⚠️ Error sending item update notification: {notify_error}")
 
@@ -6670,11 +7282,8 @@ def api_finalize_order(order_id):
         # Clean up 0 quantity rows before finalizing
         cleanup_zero_quantity_rows(order_id)
         
-        # Recalculate totals to ensure accuracy
-        recalculate_order_total(order_id)
-        
-        # Get fresh order data
-        order = get_order_by_id(order_id)
+        # Recalculate totals to ensure accuracy - returns the fresh order with the new totals
+        order = recalculate_order_total(order_id) or get_order_by_id(order_id)
         if not order:
             return jsonify({'error': 'Order not found after recalculation'}), 404
         
@@ -6683,11 +7292,26 @@ def api_finalize_order(order_id):
 
         # Send Telegram notification to PepHaul Admin
         try:
+            # One pass over the items builds the message lines, the subtotal and the vial count
             item_lines = []
             removed_lines = []
+            subtotal_php = 0
+            total_vials = 0
+            products = get_products()
             for item in order.get('items', []):
                 if item.get('qty', 0) <= 0:
                     continue
+                subtotal_php += item.get('line_total_php', 0)
+                
+                # Find product to get vials_per_kit (falls back to the only product with that code)
+                qty = item.get('qty', 0)
+                product = find_product(products, str(item.get('product_code', '')).strip(), str(item.get('supplier', 'Default')).strip())
+                vials_per_kit = product.get('vials_per_kit', 10) if product else 10
+                if item.get('order_type', 'Vial') == 'Kit':
+                    total_vials += qty * vials_per_kit
+                else:
+                    total_vials += qty
+                
                 lookup_key = _qty_change_key(item.get('product_code'), item.get('order_type'))
                 payload_change = request_qty_change_lookup.get(lookup_key, {})
                 old_qty = payload_change.get('old_qty')
@@ -6718,44 +7342,10 @@ def api_finalize_order(order_id):
                 removed_lines.append(removed_line)
             removed_items_text = '\n'.join(removed_lines)
             
-            subtotal_php = sum(item.get('line_total_php', 0) for item in order.get('items', []) if item.get('qty', 0) > 0)
             grand_total_php = order.get('grand_total_php', 0)
             
-            # Calculate total vials and tiered admin fee
-            total_vials = 0
-            products = get_products()
-            for item in order.get('items', []):
-                if item.get('qty', 0) > 0:
-                    qty = item.get('qty', 0)
-                    order_type = item.get('order_type', 'Vial')
-                    product_code = str(item.get('product_code', '')).strip()
-                    supplier = str(item.get('supplier', 'Default')).strip()
-                    
-                    # Find product to get vials_per_kit
-                    product = None
-                    for p in products:
-                        p_code = str(p.get('code', '')).strip()
-                        p_supplier = str(p.get('supplier', 'Default')).strip()
-                        if p_code.upper() == product_code.upper() and p_supplier.upper() == supplier.upper():
-                            product = p
-                            break
-                    
-                    # Fallback: try without supplier match if not found
-                    if not product:
-                        matching_codes = [p for p in products if str(p.get('code', '')).strip().upper() == product_code.upper()]
-                        if len(matching_codes) == 1:
-                            product = matching_codes[0]
-                    
-                    vials_per_kit = product.get('vials_per_kit', 10) if product else 10
-                    
-                    if order_type == 'Kit':
-                        total_vials += qty * vials_per_kit
-                    else:
-                        total_vials += qty
-            
             # Calculate tiered admin fee: ₱300 for every 50 vials (or part thereof)
-            import math
-            admin_fee_calculated = math.ceil(total_vials / 50) * 300 if total_vials > 0 else 0
+            admin_fee_calculated = admin_fee_for_vials(total_vials)
             date_summary = build_order_date_summary(order)
             
             removed_items_block = ""
@@ -6780,17 +7370,16 @@ def api_finalize_order(order_id):
 <b>Status:</b> Finalized - Pending Payment
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
             clear_order_qty_changes(order_id)
         except Exception as e:
             print(f"⚠️ Error sending Telegram notification: {e}")
-            import traceback
             traceback.print_exc()
             # Don't fail if Telegram fails
         
         # Also notify customer if registered (non-blocking)
         try:
-            notify_customer_order(order, order_id)
+            notify_in_background(notify_customer_order, order, order_id)
         except Exception as e:
             print(f"⚠️ Error notifying customer: {e}")
             # Don't fail if customer notification fails
@@ -6802,7 +7391,6 @@ def api_finalize_order(order_id):
         })
     except Exception as e:
         print(f"❌ Error finalizing order: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': 'Failed to finalize order'}), 500
 
@@ -6812,61 +7400,61 @@ def cleanup_zero_quantity_rows(order_id=None):
         return False
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = get_pephaul_worksheet(spreadsheet)
+        worksheet = get_pephaul_worksheet()
         if not worksheet:
             return None
         
         all_values = worksheet.get_all_values()
         headers = all_values[0] if all_values else []
+        col_idx = sheet_column_index(headers)
         
-        col_order_id = headers.index('Order ID') if 'Order ID' in headers else 0
-        col_qty = headers.index('QTY') if 'QTY' in headers else 8
-        
-        # Find first row for each order (to preserve header rows)
-        order_first_rows = {}
-        for row_num, row in enumerate(all_values[1:], start=2):
-            if len(row) > col_order_id and row[col_order_id]:
-                order_id_val = row[col_order_id]
-                if order_id_val not in order_first_rows:
-                    order_first_rows[order_id_val] = row_num
+        col_order_id = col_idx.get('Order ID', 0)
+        col_qty = col_idx.get('QTY', 8)
         
-        # Find all rows with 0 quantity to delete
-        zero_qty_rows = []
-        for row_num, row in enumerate(all_values[1:], start=2):
-            if len(row) > col_qty:
-                qty = int(row[col_qty] or 0) if row[col_qty] else 0
+        if order_id:
+            # Only this order's rows matter - skip other orders on a single equality check
+            order_rows = [
+                (row_num, row) for row_num, row in enumerate(all_values[1:], start=2)
+                if len(row) > col_order_id and row[col_order_id] == order_id
+            ]
+            # Don't delete the order's first row (contains totals)
+            zero_qty_rows = [
+                row_num for row_num, row in order_rows[1:]
+                if len(row) > col_qty and (int(row[col_qty] or 0) if row[col_qty] else 0) <= 0
+            ]
+        else:
+            # Single pass: note each order's first row (it holds the totals) as we reach it, then classify the row.
+            # A row's order has always been seen by the time we look at it, so the first-row check is complete.
+            order_first_rows = {}
+            zero_qty_rows = []
+            for row_num, row in enumerate(all_values[1:], start=2):
                 order_id_val = row[col_order_id] if len(row) > col_order_id else ''
+                if order_id_val and order_id_val not in order_first_rows:
+                    order_first_rows[order_id_val] = row_num
                 
-                # If order_id specified, only clean that order
-                if order_id and order_id_val != order_id:
-                    continue
-                
-                # Don't delete first row of any order (contains totals)
-                if qty <= 0 and order_id_val:
-                    first_row = order_first_rows.get(order_id_val)
-                    if first_row and row_num != first_row:
+                if len(row) > col_qty:
+                    qty = int(row[col_qty] or 0) if row[col_qty] else 0
+                    
+                    # Don't delete first row of any order (contains totals)
+                    if qty <= 0 and order_id_val:
+                        if row_num != order_first_rows[order_id_val]:
+                            zero_qty_rows.append(row_num)
+                    elif qty <= 0 and not order_id_val:
+                        # Orphaned row with 0 qty (no order ID) - can delete
                         zero_qty_rows.append(row_num)
-                elif qty <= 0 and not order_id_val:
-                    # Orphaned row with 0 qty (no order ID) - can delete
-                    zero_qty_rows.append(row_num)
         
         # Delete rows in reverse order to avoid index shifting
         if zero_qty_rows:
-            zero_qty_rows.sort(reverse=True)
-            for row_num in zero_qty_rows:
-                worksheet.delete_rows(row_num)
+            delete_rows_batched(worksheet, zero_qty_rows)
             print(f"🧹 Cleaned up {len(zero_qty_rows)} rows with 0 quantity" + (f" for order {order_id}" if order_id else ""))
             
             # Clear cache (tab-scoped keys)
-            clear_cache_prefix('orders_')
-            clear_cache_prefix('inventory_')
-            clear_cache_prefix('order_stats_')
+            clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         
         return True
     except Exception as e:
         print(f"❌ Error cleaning up zero quantity rows: {e}")
-        import traceback
+        drop_stale_pephaul_worksheet(e)
         traceback.print_exc()
         return False
 
@@ -6876,8 +7464,8 @@ def update_item_quantity(order_id, product_code, order_type, new_qty):
         return False
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = get_pephaul_worksheet(spreadsheet)
+        from gspread.utils import rowcol_to_a1
+        worksheet = get_pephaul_worksheet()
         if not worksheet:
             return None
         
@@ -6886,33 +7474,33 @@ def update_item_quantity(order_id, product_code, order_type, new_qty):
         headers = all_values[0] if all_values else []
         
         # Find column indices
-        order_id_col = headers.index('Order ID') if 'Order ID' in headers else -1
-        product_code_col = headers.index('Product Code') if 'Product Code' in headers else -1
-        order_type_col = headers.index('Order Type') if 'Order Type' in headers else -1
-        qty_col = headers.index('QTY') if 'QTY' in headers else -1
-        unit_price_col = headers.index('Unit Price USD') if 'Unit Price USD' in headers else -1
-        line_total_usd_col = headers.index('Line Total USD') if 'Line Total USD' in headers else -1
-        line_total_php_col = headers.index('Line Total PHP') if 'Line Total PHP' in headers else -1
-        exchange_rate_col = headers.index('Exchange Rate') if 'Exchange Rate' in headers else -1
-        grand_total_col = headers.index('Grand Total PHP') if 'Grand Total PHP' in headers else -1
+        col_idx = sheet_column_index(headers)
+        order_id_col = col_idx.get('Order ID', -1)
+        product_code_col = col_idx.get('Product Code', -1)
+        order_type_col = col_idx.get('Order Type', -1)
+        qty_col = col_idx.get('QTY', -1)
+        unit_price_col = col_idx.get('Unit Price USD', -1)
+        line_total_usd_col = col_idx.get('Line Total USD', -1)
+        line_total_php_col = col_idx.get('Line Total PHP', -1)
+        exchange_rate_col = col_idx.get('Exchange Rate', -1)
+        grand_total_col = col_idx.get('Grand Total PHP', -1)
         
         if -1 in [order_id_col, product_code_col, order_type_col, qty_col]:
             print("Missing required columns")
             return False
         
-        # Find the specific row to update
+        # Find the specific row to update. No early exit once the order's run ends: items added
+        # later can sit below other orders, and the last matching row wins as before.
         target_row = None
         first_order_row = None
-        order_rows = []
+        item_cols_len = max(product_code_col, order_type_col) + 1
         
         for i, row in enumerate(all_values[1:], start=2):  # Start at row 2 (1-indexed, skip header)
             if len(row) > order_id_col and row[order_id_col] == order_id:
                 if first_order_row is None:
                     first_order_row = i
-                order_rows.append(i)
-                
-                if (len(row) > product_code_col and row[product_code_col] == product_code and
-                    len(row) > order_type_col and row[order_type_col] == order_type):
+                if (len(row) >= item_cols_len and row[product_code_col] == product_code and
+                        row[order_type_col] == order_type):
                     target_row = i
         
         if target_row is None:
@@ -6933,9 +7521,7 @@ def update_item_quantity(order_id, product_code, order_type, new_qty):
             if target_row != first_order_row:
                 worksheet.delete_rows(target_row)
                 # Clear cache and recalculate totals (tab-scoped keys)
-                clear_cache_prefix('orders_')
-                clear_cache_prefix('inventory_')
-                clear_cache_prefix('order_stats_')
+                clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
                 recalculate_order_total(order_id)
                 print(f"Deleted {product_code} row (qty=0) for order {order_id}")
                 return True
@@ -6947,80 +7533,87 @@ def update_item_quantity(order_id, product_code, order_type, new_qty):
         
         # Update the item row
         updates = []
-        updates.append({'range': f'{chr(65 + qty_col)}{target_row}', 'values': [[new_qty]]})
+        updates.append({'range': rowcol_to_a1(target_row, qty_col + 1), 'values': [[new_qty]]})
         
         if line_total_usd_col >= 0:
-            updates.append({'range': f'{chr(65 + line_total_usd_col)}{target_row}', 'values': [[new_line_total_usd]]})
+            updates.append({'range': rowcol_to_a1(target_row, line_total_usd_col + 1), 'values': [[new_line_total_usd]]})
         
         if line_total_php_col >= 0:
-            updates.append({'range': f'{chr(65 + line_total_php_col)}{target_row}', 'values': [[new_line_total_php]]})
+            updates.append({'range': rowcol_to_a1(target_row, line_total_php_col + 1), 'values': [[new_line_total_php]]})
         
-        # Apply item updates
-        for update in updates:
-            worksheet.update(update['range'], update['values'])
+        # Apply item updates in one request
+        worksheet.batch_update(updates)
         
-        # Also check and delete any other rows with 0 quantity for this order (except first row)
-        all_values_updated = worksheet.get_all_values()
+        # Mirror the write into the snapshot so the checks below don't re-read the sheet
+        current_row = all_values[target_row - 1]
+        for col, value in ((qty_col, new_qty), (line_total_usd_col, new_line_total_usd), (line_total_php_col, new_line_total_php)):
+            if col >= 0:
+                if len(current_row) <= col:
+                    current_row.extend([''] * (col + 1 - len(current_row)))
+                current_row[col] = value
+        
+        # One pass over the order's rows: pick out other 0-qty rows to delete (never the first row) and
+        # collect what the grand-total recalculation needs from the rows that stay
         zero_qty_rows = []
-        for i, row in enumerate(all_values_updated[1:], start=2):
+        line_totals_php = []
+        order_items = []
+        for i, row in enumerate(all_values[1:], start=2):
             if len(row) > order_id_col and row[order_id_col] == order_id:
-                if i != first_order_row:  # Don't delete first row
-                    qty = int(row[qty_col] or 0) if len(row) > qty_col else 0
-                    if qty <= 0:
-                        zero_qty_rows.append(i)
+                qty = int(row[qty_col] or 0) if len(row) > qty_col else 0
+                if i != first_order_row and qty <= 0:
+                    zero_qty_rows.append(i)
+                    continue
+                
+                if len(row) > line_total_php_col and row[line_total_php_col]:
+                    line_totals_php.append(row[line_total_php_col])
+                
+                # Collect item info for admin fee calculation
+                row_code = row[product_code_col] if len(row) > product_code_col else ''
+                row_type = row[order_type_col] if len(row) > order_type_col else 'Vial'
+                if row_code and qty > 0:
+                    order_items.append({
+                        'product_code': row_code,
+                        'order_type': row_type,
+                        'qty': qty
+                    })
         
         if zero_qty_rows:
-            zero_qty_rows.sort(reverse=True)
-            for row_num in zero_qty_rows:
-                worksheet.delete_rows(row_num)
+            delete_rows_batched(worksheet, zero_qty_rows)
         
         # Recalculate grand total for the entire order with tiered admin fee
         if first_order_row and grand_total_col >= 0:
-            # Get fresh data after update and recalculate with tiered admin fee
-            all_values = worksheet.get_all_values()
-            new_subtotal_php = 0
-            order_items = []
-            
-            # Collect all items to calculate tiered admin fee
-            for i, row in enumerate(all_values[1:], start=2):
-                if len(row) > order_id_col and row[order_id_col] == order_id:
-                    if len(row) > line_total_php_col and row[line_total_php_col]:
-                        try:
-                            new_subtotal_php += float(row[line_total_php_col])
-                        except:
-                            pass
-                    
-                    # Collect item info for admin fee calculation
-                    product_code = row[product_code_col] if len(row) > product_code_col else ''
-                    order_type = row[order_type_col] if len(row) > order_type_col else 'Vial'
-                    qty = int(row[qty_col] or 0) if len(row) > qty_col else 0
-                    if product_code and qty > 0:
-                        order_items.append({
-                            'product_code': product_code,
-                            'order_type': order_type,
-                            'qty': qty
-                        })
+            # Deleted rows come after first_order_row, so it doesn't move
+            try:
+                new_subtotal_php = sum(map(float, line_totals_php))
+            except (TypeError, ValueError):
+                # Some cell isn't numeric - fall back to skipping the bad values
+                new_subtotal_php = 0
+                for value in line_totals_php:
+                    try:
+                        new_subtotal_php += float(value)
+                    except (TypeError, ValueError):
+                        pass
             
             # Calculate tiered admin fee based on items
             admin_fee = calculate_tiered_admin_fee(order_items)
             new_grand_total = new_subtotal_php + admin_fee
             
-            # Update both grand total and admin fee
-            worksheet.update(f'{chr(65 + grand_total_col)}{first_order_row}', [[new_grand_total]])
-            admin_fee_col = headers.index('Admin Fee PHP') if 'Admin Fee PHP' in headers else -1
+            # Update both grand total and admin fee in one request
+            total_updates = [{'range': rowcol_to_a1(first_order_row, grand_total_col + 1), 'values': [[new_grand_total]]}]
+            admin_fee_col = col_idx.get('Admin Fee PHP', -1)
             if admin_fee_col >= 0:
-                worksheet.update(f'{chr(65 + admin_fee_col)}{first_order_row}', [[admin_fee]])
+                total_updates.append({'range': rowcol_to_a1(first_order_row, admin_fee_col + 1), 'values': [[admin_fee]]})
+            worksheet.batch_update(total_updates)
         
         # Clear cache since orders changed (tab-scoped keys)
-        clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
+        clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         
         print(f"Updated {product_code} qty to {new_qty} for order {order_id}")
         return True
         
     except Exception as e:
         print(f"Error updating item: {e}")
+        drop_stale_pephaul_worksheet(e)
         return False
 
 @app.route('/api/orders/<order_id>/cancel', methods=['POST'])
@@ -7044,23 +7637,20 @@ def api_cancel_order(order_id=None):
     if order_id:
         order = get_order_by_id(order_id)
     elif telegram_username:
-        # Find order by telegram username
-        orders = get_orders_from_sheets()
-        telegram_normalized = telegram_username.lower().strip().lstrip('@')
+        # Find order by telegram username (raw cached rows - supplier enrichment isn't needed here)
+        tab_name = get_current_pephaul_tab()
+        orders = get_cached(f'orders_{tab_name}', lambda: _fetch_orders_from_sheets(tab_name), cache_duration=180)
+        telegram_normalized = normalize_telegram_username(telegram_username)
         
-        # Get the most recent non-cancelled order for this telegram username
-        matching_orders = []
-        for o in orders:
-            order_telegram = str(o.get('Telegram Username', '')).lower().strip().lstrip('@')
-            if order_telegram == telegram_normalized:
-                order_status = o.get('Order Status', 'Pending')
-                if order_status != 'Cancelled':
-                    matching_orders.append(o)
+        # Get the most recent non-cancelled order for this telegram username - exact matches come
+        # straight from the per-tab telegram index instead of a scan over every row
+        positions = _get_orders_telegram_columns(tab_name, orders).by_telegram.get(telegram_normalized, ())
+        matching_orders = [orders[i] for i in positions if orders[i].get('Order Status', 'Pending') != 'Cancelled']
         
         if matching_orders:
             # Get the most recent order (by order date or order ID)
-            matching_orders.sort(key=lambda x: x.get('Order Date', ''), reverse=True)
-            order_id = matching_orders[0].get('Order ID')
+            latest = max(matching_orders, key=lambda x: x.get('Order Date', ''))
+            order_id = latest.get('Order ID')
             order = get_order_by_id(order_id)
     
     if not order:
@@ -7068,9 +7658,7 @@ def api_cancel_order(order_id=None):
     
     # Verify telegram username matches if provided
     if telegram_username:
-        order_telegram = str(order.get('telegram', '')).lower().strip().lstrip('@')
-        provided_telegram = telegram_username.lower().strip().lstrip('@')
-        if order_telegram != provided_telegram:
+        if normalize_telegram_username(order.get('telegram', '')) != normalize_telegram_username(telegram_username):
             return jsonify({
                 'error': f'Telegram username mismatch. Order belongs to @{order.get("telegram", "unknown")}, not @{telegram_username}'
             }), 400
@@ -7100,7 +7688,7 @@ def api_cancel_order(order_id=None):
         )
         
         try:
-            send_telegram_notification(notification_message)
+            notify_in_background(send_telegram_notification, notification_message)
             print(f"📲 Cancellation notification sent to admin")
         except Exception as e:
             print(f"⚠️ Could not send cancellation notification: {e}")
@@ -7120,8 +7708,7 @@ def delete_order_rows(order_id, telegram_username=None):
         return False
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = get_pephaul_worksheet(spreadsheet)
+        worksheet = get_pephaul_worksheet()
         if not worksheet:
             return None
         
@@ -7130,22 +7717,22 @@ def delete_order_rows(order_id, telegram_username=None):
         headers = all_values[0] if all_values else []
         
         # Find column indices
-        col_order_id = headers.index('Order ID') if 'Order ID' in headers else 0
-        col_telegram = headers.index('Telegram Username') if 'Telegram Username' in headers else 3
+        col_idx = sheet_column_index(headers)
+        col_order_id = col_idx.get('Order ID', 0)
+        col_telegram = col_idx.get('Telegram Username', 3)
         
         # Normalize telegram username for comparison
-        telegram_normalized = None
-        if telegram_username:
-            telegram_normalized = str(telegram_username).lower().strip().lstrip('@')
+        telegram_normalized = normalize_telegram_username(telegram_username) or None
         
         # Find all rows belonging to this order
         order_rows = []
         for row_num, row in enumerate(all_values[1:], start=2):  # Skip header
             if len(row) > col_order_id:
                 row_order_id = row[col_order_id] if len(row) > col_order_id else ''
+                # Only rows of this order need their telegram normalized
                 row_telegram = ''
-                if len(row) > col_telegram:
-                    row_telegram = str(row[col_telegram]).lower().strip().lstrip('@') if row[col_telegram] else ''
+                if telegram_normalized and len(row) > col_telegram and (row_order_id == order_id or (order_rows and not row_order_id)):
+                    row_telegram = normalize_telegram_username(row[col_telegram])
                 
                 # Check if this row belongs to the order
                 if row_order_id == order_id:
@@ -7167,19 +7754,19 @@ def delete_order_rows(order_id, telegram_username=None):
                     # New order started, stop
                     break
         
-        # Also find rows by searching for order_id anywhere (for added items)
-        cells = worksheet.findall(order_id)
-        for cell in cells:
-            if cell.row not in order_rows:
-                # Verify telegram username matches if provided
-                if cell.row <= len(all_values):
-                    row = all_values[cell.row - 1]  # 0-indexed
-                    if len(row) > col_telegram:
-                        row_telegram = str(row[col_telegram]).lower().strip().lstrip('@') if row[col_telegram] else ''
-                        if telegram_normalized and row_telegram:
-                            if row_telegram != telegram_normalized:
-                                continue  # Skip if telegram doesn't match
-                    order_rows.append(cell.row)
+        # Also pick up rows for this order further down the sheet (for added items) - from the same snapshot,
+        # no second full-sheet findall() request
+        seen_rows = set(order_rows)
+        for row_num, row in enumerate(all_values[1:], start=2):
+            if row_num in seen_rows or len(row) <= col_order_id or row[col_order_id] != order_id:
+                continue
+            # Verify telegram username matches if provided
+            if telegram_normalized and len(row) > col_telegram:
+                row_telegram = normalize_telegram_username(row[col_telegram])
+                if row_telegram:
+                    if row_telegram != telegram_normalized:
+                        continue  # Skip if telegram doesn't match
+            order_rows.append(row_num)
         
         if not order_rows:
             print(f"⚠️ No rows found for order {order_id}" + (f" with telegram @{telegram_username}" if telegram_username else ""))
@@ -7187,17 +7774,13 @@ def delete_order_rows(order_id, telegram_username=None):
         
         print(f"🗑️ Deleting {len(order_rows)} rows for order {order_id}" + (f" (Telegram: @{telegram_username})" if telegram_username else "") + f": {order_rows}")
         
-        # Delete rows in reverse order (from bottom to top) to avoid index shifting
-        for row_num in sorted(order_rows, reverse=True):
-            worksheet.delete_rows(row_num)
-            print(f"  Deleted row {row_num}")
+        # Delete all rows in one batched request (bottom-up, so indexes don't shift)
+        delete_rows_batched(worksheet, order_rows)
         
         print(f"✅ Successfully deleted all rows for order {order_id}" + (f" (Telegram: @{telegram_username})" if telegram_username else ""))
         
         # Clear cache since orders changed - this triggers automatic recalculation
-        clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
+        clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         
         # Force recalculation by getting fresh inventory stats
         # This ensures inventory is immediately updated after cancellation
@@ -7210,7 +7793,7 @@ def delete_order_rows(order_id, telegram_username=None):
         return True
     except Exception as e:
         print(f"❌ Error deleting order rows: {e}")
-        import traceback
+        drop_stale_pephaul_worksheet(e)
         traceback.print_exc()
         return False
 
@@ -7241,7 +7824,7 @@ def api_upload_payment(order_id):
             'details': {'drive_configured': False}
         }), 500
     
-    data = request.json
+    data = request.get_json(silent=True) or {}
     screenshot_data = data.get('screenshot')
     
     if not screenshot_data:
@@ -7272,7 +7855,7 @@ def api_upload_payment(order_id):
 ⚠️ Please verify and confirm payment in Admin Panel.
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
         
         print(f"✅ Upload successful: {drive_link}")
         return jsonify({'success': True, 'link': drive_link})
@@ -7283,7 +7866,7 @@ def api_upload_payment(order_id):
 @app.route('/api/orders/<order_id>/payment-link', methods=['POST'])
 def api_submit_payment_link(order_id):
     """Submit payment screenshot link (Google Drive, Imgur, etc.)"""
-    data = request.json
+    data = request.get_json(silent=True) or {}
     payment_link = data.get('payment_link', '').strip()
     
     if not payment_link:
@@ -7318,7 +7901,7 @@ def api_submit_payment_link(order_id):
 ⚠️ Please verify and confirm payment in Admin Panel.
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
         
         print(f"✅ Payment link saved successfully")
         return jsonify({'success': True, 'link': payment_link})
@@ -7350,11 +7933,11 @@ Customer has marked payment as sent to PepHaul Admin.
 Please check GCash and confirm payment in Admin Panel.
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
         
         # Also notify customer if registered (non-blocking)
         try:
-            notify_customer_payment_sent(order, order_id)
+            notify_in_background(notify_customer_payment_sent, order, order_id)
         except Exception as e:
             print(f"⚠️ Error notifying customer: {e}")
             # Don't fail if customer notification fails
@@ -7385,7 +7968,7 @@ def api_upload_payment_generic():
             }
         }), 500
     
-    data = request.json
+    data = request.get_json(silent=True) or {}
     order_id = data.get('order_id')
     file_data = data.get('file_data')
     file_name = data.get('file_name', 'payment.jpg')
@@ -7421,7 +8004,7 @@ def api_upload_payment_generic():
 ⚠️ Please verify and confirm payment in Admin Panel.
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
         
         print(f"✅ Upload successful: {drive_link}")
         return jsonify({'success': True, 'link': drive_link})
@@ -7429,76 +8012,98 @@ def api_upload_payment_generic():
     print(f"❌ Upload failed for order {order_id}")
     return jsonify({'error': 'Upload failed - please check server logs'}), 500
 
+# worksheet id -> mailing column layout, recorded once that tab's mailing headers are
+# known to be in place, so later saves skip the header check entirely
+_mailing_columns = {}
+
 @app.route('/api/orders/<order_id>/mailing-address', methods=['POST'])
 def api_save_mailing_address(order_id):
     """Save mailing address for an order (only for paid orders)"""
-    data = request.json
-    mailing_name = data.get('mailing_name', '')
-    mailing_phone = data.get('mailing_phone', '')
-    mailing_address = data.get('mailing_address', '')
-    
-    if not mailing_name or not mailing_phone or not mailing_address:
-        return jsonify({'error': 'All fields are required'}), 400
+    data = request.get_json(silent=True) or {}
+    fields = {key: str(data.get(key) or '').strip() for key in ('mailing_name', 'mailing_phone', 'mailing_address')}
+    missing = [key for key, value in fields.items() if not value]
+    if missing:
+        return jsonify({'error': 'All fields are required', 'missing': missing}), 400
+    mailing_name = fields['mailing_name']
+    mailing_phone = fields['mailing_phone']
+    mailing_address = fields['mailing_address']
     
     if not sheets_client:
         return jsonify({'error': 'Sheets not configured'}), 500
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = get_pephaul_worksheet(spreadsheet)
+        from gspread.utils import rowcol_to_a1
+        worksheet = get_pephaul_worksheet()
         if not worksheet:
             return None
         
         # Find the order's first row
-        cell = worksheet.find(order_id)
-        if not cell:
+        order_row = find_order_first_row(worksheet, order_id)
+        if not order_row:
             return jsonify({'error': 'Order not found'}), 404
         
-        # Resolve mailing columns dynamically across old/new schemas.
-        headers = [str(h or '').strip() for h in worksheet.row_values(1)]
-        def ensure_col(header_name):
-            nonlocal headers
-            if header_name in headers:
-                return headers.index(header_name) + 1
-            col = len(headers) + 1
-            worksheet.update_cell(1, col, header_name)
-            headers.append(header_name)
-            return col
-
-        col_full_name = ensure_col('Full Name')
-        col_contact = ensure_col('Contact Number')
-        col_mailing = ensure_col('Mailing Address')
-        
-        # Update the order row with mailing info
-        worksheet.update_cell(cell.row, col_full_name, mailing_name)
-        worksheet.update_cell(cell.row, col_contact, mailing_phone)
-        worksheet.update_cell(cell.row, col_mailing, mailing_address)
+        # Resolve mailing columns dynamically across old/new schemas. The header check
+        # only runs on the first save per tab; missing headers go out in the same batch_update.
+        header_updates = []
+        layout = _mailing_columns.get(worksheet.id)
+        if layout is None:
+            headers = get_sheet_headers(worksheet)
+            def ensure_col(header_name):
+                if header_name in headers:
+                    return headers.index(header_name) + 1
+                col = len(headers) + 1
+                header_updates.append({'range': rowcol_to_a1(1, col), 'values': [[header_name]]})
+                headers.append(header_name)
+                return col
+
+            col_full_name = ensure_col('Full Name')
+            col_contact = ensure_col('Contact Number')
+            col_mailing = ensure_col('Mailing Address')
+            
+            # Lock the order (Column Q = 17) when shipping details are added
+            # Ensure header exists
+            if len(headers) < 17 or headers[16] != 'Locked':
+                header_updates.append({'range': 'Q1', 'values': [['Locked']]})  # Column Q
+            # Telegram Username is column D (index 3) in the standard schema
+            tg_col_idx = headers.index('Telegram Username') if 'Telegram Username' in headers else 3
+            layout = (col_full_name, col_contact, col_mailing, tg_col_idx)
+        col_full_name, col_contact, col_mailing, tg_col_idx = layout
+        
+        # Update the order row with mailing info (one U:W range in the standard layout)
+        if col_contact == col_full_name + 1 and col_mailing == col_contact + 1:
+            row_updates = [{
+                'range': f'{rowcol_to_a1(order_row, col_full_name)}:{rowcol_to_a1(order_row, col_mailing)}',
+                'values': [[mailing_name, mailing_phone, mailing_address]],
+            }]
+        else:
+            row_updates = [
+                {'range': rowcol_to_a1(order_row, col_full_name), 'values': [[mailing_name]]},
+                {'range': rowcol_to_a1(order_row, col_contact), 'values': [[mailing_phone]]},
+                {'range': rowcol_to_a1(order_row, col_mailing), 'values': [[mailing_address]]},
+            ]
+        # Set order to locked
+        row_updates.append({'range': f'Q{order_row}', 'values': [['Yes']]})  # Column Q: Locked
+        
+        # RAW: customer-typed text is stored as-is (no formula parsing, phone leading zeros kept)
+        worksheet.batch_update(header_updates + row_updates, value_input_option='RAW')
+        if header_updates:
+            invalidate_sheet_headers(worksheet)
+        # Headers are in place now (written above if they were missing)
+        _mailing_columns[worksheet.id] = layout
 
         # Auto-populate Shipping Details tab with this customer's info (new rows only)
         try:
             order_telegram = ''
-            row_data = worksheet.row_values(cell.row)
-            # Telegram Username is column D (index 3) in the standard schema
-            tg_headers = [str(h or '').strip() for h in worksheet.row_values(1)]
-            tg_col_idx = tg_headers.index('Telegram Username') if 'Telegram Username' in tg_headers else 3
+            row_data = worksheet.row_values(order_row)
             if len(row_data) > tg_col_idx:
                 order_telegram = row_data[tg_col_idx].strip()
             if order_telegram:
                 _upsert_shipping_details_tab(order_telegram, mailing_name, mailing_phone, mailing_address)
         except Exception as upsert_err:
             print(f"⚠️ Could not upsert Shipping Details tab: {upsert_err}")
-
-        # Lock the order (Column Q = 17) when shipping details are added
-        # Ensure header exists
-        if len(headers) < 17 or headers[16] != 'Locked':
-            worksheet.update_cell(1, 17, 'Locked')  # Column Q
-        # Set order to locked
-        worksheet.update_cell(cell.row, 17, 'Yes')  # Column Q: Locked
         
-        # Clear cache since orders changed
+        # Only the orders cache: inventory and order stats don't read shipping fields
         clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
         
         # Send notification to admin (non-blocking - don't fail if this fails)
         try:
@@ -7519,11 +8124,11 @@ def api_save_mailing_address(order_id):
 ✅ Ready for fulfillment!
 
 {date_summary}"""
-                send_telegram_notification(telegram_msg)
+                notify_in_background(send_telegram_notification, telegram_msg)
                 
                 # Also notify customer if registered (non-blocking)
                 try:
-                    notify_customer_shipping_details(order, order_id, mailing_name, mailing_phone, mailing_address)
+                    notify_in_background(notify_customer_shipping_details, order, order_id, mailing_name, mailing_phone, mailing_address)
                 except Exception as customer_notify_error:
                     print(f"⚠️ Error notifying customer: {customer_notify_error}")
                     # Don't fail if customer notification fails
@@ -7534,10 +8139,10 @@ def api_save_mailing_address(order_id):
         return jsonify({'success': True})
         
     except Exception as e:
-        print(f"Error saving mailing address: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'success': False, 'error': str(e)}), 500
+        # Traceback goes to the log; the client gets a generic message, not internal details
+        logger.exception("Error saving mailing address for order %s", order_id)
+        drop_stale_pephaul_worksheet(e)
+        return jsonify({'success': False, 'error': 'Could not save mailing address'}), 500
 
 @app.route('/api/admin/orders/<order_id>/tracking-number', methods=['POST'])
 def api_save_tracking_number(order_id):
@@ -7545,8 +8150,8 @@ def api_save_tracking_number(order_id):
     if not session.get('is_admin'):
         return jsonify({'error': 'Unauthorized'}), 401
     
-    data = request.json or {}
-    tracking_number = data.get('tracking_number', '').strip()
+    data = request.get_json(silent=True) or {}
+    tracking_number = str(data.get('tracking_number') or '').strip()
     
     if not tracking_number:
         return jsonify({'error': 'Tracking number is required'}), 400
@@ -7568,31 +8173,33 @@ def api_save_tracking_number(order_id):
         if not mailing_address or not mailing_address.strip():
             return jsonify({'error': 'Shipping details must be added before tracking number'}), 400
         
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = get_pephaul_worksheet(spreadsheet)
+        from gspread.utils import rowcol_to_a1
+        worksheet = get_pephaul_worksheet()
         if not worksheet:
             return jsonify({'error': 'Worksheet not found'}), 404
         
         # Find the order's first row
-        cell = worksheet.find(order_id)
-        if not cell:
+        order_row = find_order_first_row(worksheet, order_id)
+        if not order_row:
             return jsonify({'error': 'Order not found in sheets'}), 404
         
-        # Resolve tracking-number column dynamically so it works across old/new schemas.
-        headers = [str(h or '').strip() for h in worksheet.row_values(1)]
+        # Resolve tracking-number column dynamically so it works across old/new schemas (cached header row).
+        headers = get_sheet_headers(worksheet)
+        updates = []
         if 'Tracking Number' in headers:
             tracking_col = headers.index('Tracking Number') + 1  # 1-indexed
         else:
             tracking_col = len(headers) + 1
-            worksheet.update_cell(1, tracking_col, 'Tracking Number')
+            updates.append({'range': rowcol_to_a1(1, tracking_col), 'values': [['Tracking Number']]})
 
-        # Update the order row with tracking number
-        worksheet.update_cell(cell.row, tracking_col, tracking_number)
+        # Update the order row with tracking number (header fixup, if any, rides in the same request)
+        updates.append({'range': rowcol_to_a1(order_row, tracking_col), 'values': [[tracking_number]]})
+        worksheet.batch_update(updates, value_input_option='USER_ENTERED')
+        if len(updates) > 1:
+            invalidate_sheet_headers(worksheet)
         
-        # Clear cache since orders changed
+        # Only the orders cache: inventory and order stats don't read shipping fields
         clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
         
         # Send notification to admin (non-blocking)
         try:
@@ -7607,20 +8214,50 @@ def api_save_tracking_number(order_id):
 ✅ Order is ready for shipment!
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
         except Exception as notify_error:
             print(f"⚠️ Error sending notification (tracking number saved successfully): {notify_error}")
         
         return jsonify({'success': True})
         
     except Exception as e:
-        print(f"Error saving tracking number: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({'success': False, 'error': str(e)}), 500
+        logger.exception("Error saving tracking number for order %s", order_id)
+        drop_stale_pephaul_worksheet(e)
+        return jsonify({'success': False, 'error': 'Could not save tracking number'}), 500
+
+# Telegram customer notifications storage (in-memory; the PepHaulers tab is the persistent copy)
+TELEGRAM_CUSTOMERS_MAX = int(os.getenv('TELEGRAM_CUSTOMERS_MAX', 10000))
+
+class TelegramChatMap:
+    """Bounded LRU of normalized username -> chat_id (one entry per user, least recently used evicted first)"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username):
+        key = normalize_telegram_username(username)
+        with self._lock:
+            chat_id = self._entries.get(key)
+            if chat_id is not None:
+                self._entries.move_to_end(key)
+            return chat_id
+
+    def remember(self, username, chat_id):
+        key = normalize_telegram_username(username)
+        if not key or chat_id is None:
+            return
+        with self._lock:
+            self._entries[key] = str(chat_id)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
 
-# Telegram customer notifications storage (in-memory, consider using database for production)
-telegram_customers = {}  # {telegram_username: chat_id}
+telegram_customers = TelegramChatMap(TELEGRAM_CUSTOMERS_MAX)  # {telegram_username: chat_id}
 
 def send_customer_telegram(chat_id, message, parse_mode='HTML'):
     """Send notification to a specific customer via Telegram"""
@@ -7632,9 +8269,10 @@ def send_customer_telegram(chat_id, message, parse_mode='HTML'):
         data = {
             'chat_id': chat_id,
             'text': message,
-            'parse_mode': parse_mode
+            'parse_mode': parse_mode,
+            'disable_web_page_preview': True
         }
-        response = requests.post(url, data=data, timeout=10)
+        response = telegram_http.post(url, json=data, timeout=TELEGRAM_TIMEOUT)
         return response.status_code == 200
     except Exception as e:
         print(f"Error sending customer Telegram: {e}")
@@ -7657,11 +8295,35 @@ def notify_admin_customer_delivery(action_label, order_id, telegram_handle, succ
     except Exception as e:
         print(f"⚠️ Failed to send admin delivery status: {e}")
 
+# Recently handled Telegram update_ids, so webhook retries of the same update are dropped
+_seen_telegram_updates = deque(maxlen=1024)
+_seen_telegram_updates_lock = threading.Lock()
+
+def _is_duplicate_telegram_update(update_id):
+    """Record update_id; True if it was already seen recently"""
+    if update_id is None:
+        return False
+    with _seen_telegram_updates_lock:
+        if update_id in _seen_telegram_updates:
+            return True
+        _seen_telegram_updates.append(update_id)
+        return False
+
 @app.route('/api/telegram/webhook', methods=['POST'])
 def telegram_webhook():
-    """Handle incoming Telegram messages (for customer registration)"""
+    """Handle incoming Telegram messages (for customer registration).
+
+    Acknowledges right away and processes the update on the notification pool,
+    so Telegram doesn't time out and redeliver it while we talk to Sheets.
+    """
+    data = request.get_json(silent=True) or {}
+    if not _is_duplicate_telegram_update(data.get('update_id')):
+        notify_in_background(_handle_telegram_update, data)
+    return jsonify({'ok': True})
+
+def _handle_telegram_update(data):
+    """Register the sender's chat and answer /start (runs off the request thread)"""
     try:
-        data = request.json
         message = data.get('message', {})
         chat_id = message.get('chat', {}).get('id')
         text = message.get('text', '')
@@ -7674,8 +8336,7 @@ def telegram_webhook():
 
         # Register contact on any inbound message (not only /start).
         if normalized_username and chat_id:
-            telegram_customers[normalized_username] = str(chat_id)
-            telegram_customers[f"@{normalized_username}"] = str(chat_id)
+            telegram_customers.remember(normalized_username, chat_id)
             upsert_pephauler_contact(normalized_username, chat_id)
             print(f"Registered Telegram customer: @{normalized_username} -> {chat_id}")
         
@@ -7718,11 +8379,8 @@ When you place an order on our website with your Telegram username, you'll recei
 Thank you for joining PepHaul! 💜✨"""
             
             send_customer_telegram(chat_id, welcome_msg)
-        
-        return jsonify({'ok': True})
     except Exception as e:
         print(f"Telegram webhook error: {e}")
-        return jsonify({'ok': False}), 500
 
 @app.route('/api/telegram/set-webhook', methods=['POST'])
 def set_telegram_webhook():
@@ -7741,7 +8399,7 @@ def set_telegram_webhook():
         
         # Set webhook
         url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/setWebhook"
-        response = requests.post(url, json={'url': webhook_url}, timeout=10)
+        response = telegram_http.post(url, json={'url': webhook_url}, timeout=TELEGRAM_TIMEOUT)
         result = response.json()
         
         if result.get('ok'):
@@ -7769,7 +8427,7 @@ def notify_customer_order(order_data, order_id):
         print(f"   Once they message the bot, they'll automatically receive notifications for future orders")
         return False
     
-    items_text = '\n'.join([f"• {item['product_name']} ({item['order_type']} x{item['qty']})" for item in order_data.get('items', [])])
+    items_text = _format_items(order_data)
     
     message = f"""✨ <b>Order Confirmed!</b> ✨
 
@@ -7859,133 +8517,104 @@ def api_admin_orders():
     if not session.get('is_admin'):
         return jsonify({'error': 'Unauthorized'}), 401
     
-    # Clear cache to ensure fresh data (admin needs latest)
-    clear_cache_prefix('orders_')
+    # Served from the orders cache: every write endpoint clears it, so edits made through
+    # the app show up on the next poll without re-reading the whole sheet each time
     orders = get_orders_from_sheets()
     
     print(f"📊 Admin panel: Loaded {len(orders)} raw order records from sheets")
     
-    # Debug: Show first few records to understand structure
-    if orders and len(orders) > 0:
-        print(f"📋 First record keys: {list(orders[0].keys())[:15]}")
-        first_order_id = orders[0].get('Order ID', None)
-        print(f"📋 First record Order ID: {repr(first_order_id)}")
-        first_product_code = orders[0].get('Product Code', None)
-        print(f"📋 First record Product Code: {repr(first_product_code)}")
+    # Per-row diagnostics only at DEBUG level (LOG_LEVEL=DEBUG) - checked once, %-style so nothing is formatted otherwise
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug and orders:
+        logger.debug("First record keys: %s", list(orders[0].keys())[:15])
+        logger.debug("First record Order ID: %r, Product Code: %r", orders[0].get('Order ID', None), orders[0].get('Product Code', None))
     
     # Group by Order ID with full details
     grouped = {}
     orders_without_id = 0
     orders_processed = 0
     
+    # Resolve the Order ID / telegram column names once - rows of one sheet read share the same keys.
+    # Per row we only try these candidates in order (dynamic matches first, then common variations).
+    sample_keys = list(orders[0].keys()) if orders else []
+    order_id_columns = [k for k in sample_keys if 'order' in k.lower() and 'id' in k.lower()]
+    order_id_columns.extend(k for k in ['Order ID', 'order id', 'OrderID', 'Order Id'] if k not in order_id_columns)
+    telegram_columns = _telegram_columns(sample_keys)
+    
+    last_order_id = last_group = None
     for order in orders:
-        # Find Order ID column dynamically (handle variations)
+        get = order.get  # bound once - the row is read ~15 times below
+        
+        # First non-empty Order ID column
         order_id = None
-        order_id_key_found = None
-        for key in order.keys():
-            if 'order' in key.lower() and 'id' in key.lower():
-                value = order.get(key, None)
-                if value is not None:
-                    value_str = str(value).strip()
-                    if value_str:  # Only use if non-empty
-                        order_id = value_str
-                        order_id_key_found = key
-                        break
+        for key in order_id_columns:
+            value = get(key, None)
+            if value is not None:
+                value_str = str(value).strip()
+                if value_str:  # Only use if non-empty
+                    order_id = value_str
+                    break
         
-        # Fallback to common variations
         if not order_id:
-            for fallback_key in ['Order ID', 'order id', 'OrderID', 'Order Id']:
-                value = order.get(fallback_key, None)
-                if value is not None:
-                    value_str = str(value).strip()
-                    if value_str:
-                        order_id = value_str
-                        order_id_key_found = fallback_key
-                        break
-        
-        if not order_id or not str(order_id).strip():
             orders_without_id += 1
-            if orders_without_id <= 3:
-                print(f"⚠️ Skipping record without Order ID: keys={list(order.keys())[:5]}")
+            if debug and orders_without_id <= 3:
+                logger.debug("Skipping record without Order ID: keys=%s", list(order.keys())[:5])
             continue
         
         orders_processed += 1
         
-        # Find telegram column dynamically (handle variations)
-        telegram_value = None
-        telegram_key_found = None
-        for key in order.keys():
-            if 'telegram' in key.lower():
-                value = order.get(key, None)
-                if value is not None:
-                    value_str = str(value).strip()
-                    if value_str:  # Only use if non-empty
-                        telegram_value = value
-                        telegram_key_found = key
-                        break
-        
-        # Fallback to common variations if not found
-        if telegram_value is None:
-            for fallback_key in ['Telegram Username', 'telegram username', 'Telegram Username ', 'TelegramUsername']:
-                value = order.get(fallback_key, None)
-                if value is not None:
-                    value_str = str(value).strip()
-                    if value_str:
-                        telegram_value = value
-                        telegram_key_found = fallback_key
-                        break
-        
-        # Default to empty string if still not found
-        if telegram_value is None:
-            telegram_value = ''
-        
-        # Debug: Log first few orders being processed
-        if orders_processed <= 5:
-            print(f"  [{orders_processed}] Processing Order {order_id}: telegram_key='{telegram_key_found}', telegram='{telegram_value}'")
-        
-        if order_id not in grouped:
-            payment_status_value = order.get('Payment Status', order.get('Confirmed Paid?', 'Unpaid'))
-            grand_total_value = float(order.get('Grand Total PHP', 0) or 0)
+        # Item rows of an order are written contiguously - reuse the previous row's group on a run
+        if order_id == last_order_id:
+            group = last_group
+        else:
+            group = grouped.get(order_id)
+        if group is None:
+            # Order-level fields come from the order's first row only
+            telegram_value = _order_telegram_value(order, telegram_columns)  # first non-empty telegram column ('' if none)
+            if debug and len(grouped) < 5:
+                logger.debug("[%s] Processing Order %s: telegram=%r", orders_processed, order_id, telegram_value)
+            
+            payment_status_value = _first_present(order, 'Payment Status', 'Confirmed Paid?', default='Unpaid')
+            grand_total_value = float(get('Grand Total PHP', 0) or 0)
             amount_paid_php, remaining_balance_php = derive_payment_amounts(
                 grand_total_value,
                 payment_status_value,
-                order.get('Partial Payment', order.get('Amount Paid PHP', order.get('Amount Paid', ''))),
-                order.get('Remaining Balance', order.get('Remaining Balance PHP', order.get('Remaining Balance', '')))
+                _first_present(order, 'Partial Payment', 'Amount Paid PHP', 'Amount Paid'),
+                _first_present(order, 'Remaining Balance', 'Remaining Balance PHP')
             )
-            grouped[order_id] = {
+            group = grouped[order_id] = {
                 'order_id': order_id,
-                'order_date': order.get('Order Date', ''),
-                'full_name': order.get('Name', order.get('Full Name', '')),
+                'order_date': get('Order Date', ''),
+                'full_name': _first_present(order, 'Name', 'Full Name'),
                 'telegram': telegram_value,
                 'grand_total_php': grand_total_value,
-                'status': order.get('Order Status', 'Pending'),
-                'locked': str(order.get('Locked', 'No')).lower() == 'yes',
+                'status': get('Order Status', 'Pending'),
+                'locked': str(get('Locked', 'No')).lower() == 'yes',
                 'payment_status': payment_status_value,
                 'amount_paid_php': amount_paid_php,
                 'remaining_balance_php': remaining_balance_php,
-                'payment_screenshot': order.get('Link to Payment', order.get('Payment Screenshot Link', order.get('Payment Screenshot', ''))),
-                'contact_number': order.get('Contact Number', ''),
-                'mailing_address': order.get('Mailing Address', ''),
+                'payment_screenshot': _first_present(order, 'Link to Payment', 'Payment Screenshot Link', 'Payment Screenshot'),
+                'contact_number': get('Contact Number', ''),
+                'mailing_address': get('Mailing Address', ''),
                 'items': []
             }
+        last_order_id, last_group = order_id, group
         
         # Add items (only if Product Code exists)
-        product_code = order.get('Product Code', '')
-        product_code_raw = str(product_code) if product_code is not None else 'None'
+        product_code = get('Product Code', '')
         
         if product_code and str(product_code).strip():
-            qty = int(order.get('QTY', 0) or 0)
             # Include all items, even with qty 0 (admin should see everything)
-            grouped[order_id]['items'].append({
+            group['items'].append({
                 'product_code': product_code,
-                'product_name': order.get('Product Name', ''),
-                'order_type': order.get('Order Type', ''),
-                'qty': qty,
-                'unit_price_usd': float(order.get('Unit Price USD', 0) or 0),
-                'line_total_php': float(order.get('Line Total PHP', 0) or 0)
+                'product_name': get('Product Name', ''),
+                'order_type': get('Order Type', ''),
+                'qty': int(get('QTY', 0) or 0),
+                'unit_price_usd': float(get('Unit Price USD', 0) or 0),
+                'line_total_php': float(get('Line Total PHP', 0) or 0)
             })
-        elif orders_processed <= 10:  # Debug: Log why items aren't being added
-            print(f"    ⚠️ Order {order_id} row skipped (no Product Code): product_code={repr(product_code_raw)}")
+        elif debug and orders_processed <= 10:  # Debug: Log why items aren't being added
+            logger.debug("Order %s row skipped (no Product Code): product_code=%r", order_id, product_code)
     
     print(f"📊 Admin panel: Processed {orders_processed} records with Order IDs, {orders_without_id} without Order IDs")
     print(f"📊 Admin panel: Grouped into {len(grouped)} unique orders")
@@ -8006,7 +8635,9 @@ def api_admin_orders():
             # Update grand total if different from stored value
             stored_grand_total = order_data['grand_total_php']
             if abs(stored_grand_total - calculated_grand_total) > 0.01:  # Allow for floating point differences
-                print(f"📊 Order {order_id}: Recalculated grand total - stored: ₱{stored_grand_total:.2f}, calculated: ₱{calculated_grand_total:.2f} (tiered admin fee: ₱{admin_fee:.2f})")
+                if debug:
+                    logger.debug("Order %s: recalculated grand total - stored: %.2f, calculated: %.2f (tiered admin fee: %.2f)",
+                                 order_id, stored_grand_total, calculated_grand_total, admin_fee)
                 order_data['grand_total_php'] = calculated_grand_total
             
             # Store admin fee for reference
@@ -8022,16 +8653,17 @@ def api_admin_orders():
     
     # Debug: Log ALL orders (not just samples) to see what's being returned
     if grouped:
-        print(f"📋 All grouped orders:")
-        for oid, order_data in grouped.items():
-            print(f"  Order {oid}: name='{order_data['full_name']}', telegram='{order_data['telegram']}', items={len(order_data['items'])}, status='{order_data['status']}'")
+        if debug:
+            for oid, order_data in grouped.items():
+                logger.debug("Order %s: name=%r, telegram=%r, items=%s, status=%r", oid, order_data['full_name'],
+                             order_data['telegram'], len(order_data['items']), order_data['status'])
     else:
         print(f"⚠️ WARNING: No orders grouped! This means no orders have Order IDs or all were filtered out.")
         # Debug: Show what we have
         if orders:
-            print(f"📋 Sample raw records (first 10):")
-            for i, order in enumerate(orders[:10]):
-                print(f"  Record {i+1}: {dict(list(order.items())[:10])}")
+            if debug:
+                for i, order in enumerate(orders[:10]):
+                    logger.debug("Sample raw record %s: %s", i + 1, dict(list(order.items())[:10]))
         else:
             print(f"⚠️ CRITICAL: No orders returned from get_orders_from_sheets() at all!")
     
@@ -8046,7 +8678,11 @@ def api_admin_orders():
     # Sort by date (newest first)
     sorted_orders = sorted(orders_with_items.values(), key=lambda x: x.get('order_date', '') or '', reverse=True)
     print(f"📊 Admin panel: Returning {len(sorted_orders)} orders to frontend (after filtering empty orders)")
-    return jsonify(sorted_orders)
+    # ETag over the body: the browser revalidates each poll (no-cache) and gets an empty 304 when nothing changed
+    response = app.response_class(_dumps_bytes(sorted_orders), mimetype='application/json')
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.add_etag()
+    return response.make_conditional(request)
 
 
 @app.route('/api/admin/supplier-filter', methods=['GET', 'POST'])
@@ -8136,7 +8772,7 @@ def api_admin_confirm_payment(order_id):
         # Get order details for notifications
         order = updated_order or get_order_by_id(order_id)
         if order:
-            items_text = '\n'.join([f"• {item['product_name']} ({item['order_type']} x{item['qty']})" for item in order.get('items', [])])
+            items_text = _format_items(order)
             date_summary = build_order_date_summary(order)
             payment_status = order.get('payment_status', 'Unpaid')
             amount_paid = _to_float(order.get('amount_paid_php', 0), 0.0)
@@ -8160,7 +8796,7 @@ def api_admin_confirm_payment(order_id):
 {"Payment has been confirmed and order is ready for fulfillment." if str(payment_status).lower() == "paid" else "Partial payment recorded. Awaiting remaining balance."}
 
 {date_summary}"""
-            send_telegram_notification(admin_msg)
+            notify_in_background(send_telegram_notification, admin_msg)
             
             # Try to notify customer via Telegram
             telegram_handle = order.get('telegram', '').strip().lower()
@@ -8168,7 +8804,7 @@ def api_admin_confirm_payment(order_id):
                 if telegram_handle.startswith('@'):
                     telegram_handle = telegram_handle[1:]
                 
-                chat_id = telegram_customers.get(telegram_handle) or telegram_customers.get(f"@{telegram_handle}")
+                chat_id = telegram_customers.get(telegram_handle)
                 
                 if chat_id:
                     customer_msg = f"""✅ <b>Payment Update Received</b> ✅
@@ -8188,8 +8824,8 @@ def api_admin_confirm_payment(order_id):
 
 Thank you for being a responsible PepHauler! 💜 — Until our next PepHaul🫡"""
                     
-                    send_customer_telegram(chat_id, customer_msg)
-                    print(f"✅ Payment confirmation sent to customer @{telegram_handle}")
+                    notify_in_background(send_customer_telegram, chat_id, customer_msg)
+                    print(f"✅ Payment confirmation queued for customer @{telegram_handle}")
                 else:
                     print(f"⚠️ Customer @{telegram_handle} hasn't messaged @{TELEGRAM_BOT_USERNAME} yet")
         
@@ -8246,7 +8882,7 @@ def api_admin_notify_customer(order_id):
         }), 404
     
     # Send notification
-    items_text = '\n'.join([f"• {item['product_name']} ({item['order_type']} x{item['qty']})" for item in order.get('items', [])])
+    items_text = _format_items(order)
     
     customer_msg = f"""✅ <b>Payment Confirmed!</b> ✅
 
@@ -8336,14 +8972,16 @@ def api_admin_bulk_lock_orders():
     if not order_ids:
         return jsonify({'error': 'No order IDs provided'}), 400
     
-    success_count = 0
-    failed_count = 0
-    
-    for order_id in order_ids:
-        if update_order_status(order_id, locked=is_locked):
-            success_count += 1
-        else:
-            failed_count += 1
+    try:
+        updated_ids, failed_ids = bulk_update_order_status(order_ids, is_locked)
+    except Exception as e:
+        # Nothing was written (the sheet read failed) - count every order as failed, like the per-order loop did
+        print(f"Error bulk updating lock status: {e}")
+        drop_stale_pephaul_worksheet(e)
+        traceback.print_exc()
+        updated_ids, failed_ids = [], list(order_ids)
+    success_count = len(updated_ids)
+    failed_count = len(failed_ids)
     
     action = 'locked' if is_locked else 'unlocked'
     print(f"✅ Bulk {action}: {success_count} succeeded, {failed_count} failed")
@@ -8385,10 +9023,10 @@ def api_admin_confirm_payment_post():
                 if telegram_handle.startswith('@'):
                     telegram_handle = telegram_handle[1:]
                 
-                chat_id = telegram_customers.get(telegram_handle) or telegram_customers.get(f"@{telegram_handle}")
+                chat_id = telegram_customers.get(telegram_handle)
                 
                 if chat_id:
-                    items_text = '\n'.join([f"• {item['product_name']} ({item['order_type']} x{item['qty']})" for item in order.get('items', [])])
+                    items_text = _format_items(order)
                     amount_paid = _to_float(order.get('amount_paid_php', 0), 0.0)
                     remaining = _to_float(order.get('remaining_balance_php', 0), 0.0)
                     payment_status = order.get('payment_status', 'Unpaid')
@@ -8410,8 +9048,8 @@ def api_admin_confirm_payment_post():
 
 Thank you for being a responsible PepHauler! 💜 — Until our next PepHaul🫡"""
                     
-                    send_customer_telegram(chat_id, customer_msg)
-                    print(f"✅ Payment confirmation sent to customer @{telegram_handle}")
+                    notify_in_background(send_customer_telegram, chat_id, customer_msg)
+                    print(f"✅ Payment confirmation queued for customer @{telegram_handle}")
                 else:
                     print(f"⚠️ Customer @{telegram_handle} not registered for Telegram notifications")
         
@@ -8477,7 +9115,7 @@ def api_admin_mark_fulfilled(order_id):
 <b>Status:</b> Fulfilled
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
         except Exception as notify_error:
             print(f"⚠️ Error sending fulfilled notification: {notify_error}")
 
@@ -8516,8 +9154,8 @@ def api_admin_customer_summary():
     
     products = get_products()
     
-    # Build product lookup for vials_per_kit
-    product_vials_map = {p['code']: p.get('vials_per_kit', VIALS_PER_KIT) for p in products}
+    # Product lookup for vials_per_kit
+    product_vials_map = get_product_vials_map(products)
     
     # Group orders by customer name and order_id to recalculate admin fees
     customer_summary = {}
@@ -8556,25 +9194,31 @@ def api_admin_customer_summary():
             continue
         
         # Initialize customer if not exists
-        if customer_name not in customer_summary:
-            customer_summary[customer_name] = {
+        customer = customer_summary.get(customer_name)
+        if customer is None:
+            customer = customer_summary[customer_name] = {
                 'customer_name': customer_name,
                 'order_count': 0,
                 'order_ids': set(),
                 'total_vials': 0,
-                'total_grand_total_php': 0
+                'total_grand_total_php': 0,
+                'paid_count': 0,
+                'waiting_count': 0
             }
             customer_product_keys[customer_name] = set()
         
         # Track payment status for this order (store once per order_id)
-        payment_status = order.get('Payment Status', order.get('Confirmed Paid?', 'Unpaid'))
-        if order_id not in order_payment_status:
-            order_payment_status[order_id] = payment_status
-        
-        # Track unique orders (only count once per order_id)
-        if order_id not in customer_summary[customer_name]['order_ids']:
-            customer_summary[customer_name]['order_ids'].add(order_id)
-            customer_summary[customer_name]['order_count'] += 1
+        order_status = order_payment_status.setdefault(order_id, _first_present(order, 'Payment Status', 'Confirmed Paid?', default='Unpaid'))
+        
+        # Track unique orders (only count once per order_id), tallying their payment status as we go
+        customer_order_ids = customer['order_ids']
+        if order_id not in customer_order_ids:
+            customer_order_ids.add(order_id)
+            customer['order_count'] += 1
+            if order_status == 'Paid':
+                customer['paid_count'] += 1
+            elif order_status == 'Waiting for Confirmation':
+                customer['waiting_count'] += 1
         
         # Collect all items for this order to recalculate admin fee
         product_code = order.get('Product Code', '')
@@ -8583,20 +9227,21 @@ def api_admin_customer_summary():
         qty = int(order.get('QTY', 0) or 0)
         line_total_php = float(order.get('Line Total PHP', 0) or 0)
         
-        if order_id not in order_items:
-            order_items[order_id] = {
+        order_entry = order_items.get(order_id)
+        if order_entry is None:
+            order_entry = order_items[order_id] = {
                 'customer_name': customer_name,
                 'items': [],
                 'subtotal_php': 0
             }
         
         if product_code and qty > 0:
-            order_items[order_id]['items'].append({
+            order_entry['items'].append({
                 'product_code': product_code,
                 'order_type': order_type,
                 'qty': qty
             })
-            order_items[order_id]['subtotal_php'] += line_total_php
+            order_entry['subtotal_php'] += line_total_php
             product_key = f"{str(product_code).strip().upper()}||{product_supplier.upper()}"
             customer_product_keys[customer_name].add(product_key)
             
@@ -8609,7 +9254,7 @@ def api_admin_customer_summary():
                 # Vial = 1 vial
                 vials = qty
             
-            customer_summary[customer_name]['total_vials'] += vials
+            customer['total_vials'] += vials
             product_total_vials[product_key] = product_total_vials.get(product_key, 0) + vials
     
     # Second pass: Calculate tiered admin fee per order and add to customer totals
@@ -8621,6 +9266,8 @@ def api_admin_customer_summary():
         # Calculate tiered admin fee based on actual vials ordered
         admin_fee_php = calculate_tiered_admin_fee(items, products)
         grand_total_php = subtotal_php + admin_fee_php
+        # Kept for the summary cards below so the fee is computed once per order
+        order_data['admin_fee_php'] = admin_fee_php
         
         # Add to customer's total grand total
         customer_summary[customer_name]['total_grand_total_php'] += grand_total_php
@@ -8637,16 +9284,14 @@ def api_admin_customer_summary():
     result = []
     for name, data in customer_summary.items():
         # Get order IDs as sorted list for display
-        order_ids_list = sorted(list(data['order_ids']))
-        order_numbers = ', '.join(order_ids_list)
+        order_numbers = ', '.join(sorted(data['order_ids']))
         
-        # Determine payment status: if all orders are paid, show "Paid", otherwise show "Unpaid" or mixed status
-        payment_statuses = [order_payment_status.get(order_id, 'Unpaid') for order_id in order_ids_list]
-        if all(status == 'Paid' for status in payment_statuses):
+        # Determine payment status from the per-customer tallies: all paid -> "Paid", otherwise mixed/unpaid
+        if data['paid_count'] == data['order_count']:
             payment_status = 'Paid'
-        elif any(status == 'Paid' for status in payment_statuses):
+        elif data['paid_count']:
             payment_status = 'Partially Paid'
-        elif any(status == 'Waiting for Confirmation' for status in payment_statuses):
+        elif data['waiting_count']:
             payment_status = 'Waiting for Confirmation'
         else:
             payment_status = 'Unpaid'
@@ -8689,7 +9334,7 @@ def api_admin_customer_summary():
 
     for order_id, order_data in order_items.items():
         subtotal_php = float(order_data.get('subtotal_php', 0) or 0)
-        admin_fee_php = float(calculate_tiered_admin_fee(order_data.get('items', []), products) or 0)
+        admin_fee_php = float(order_data['admin_fee_php'] or 0)
         grand_total_php = subtotal_php + admin_fee_php
 
         total_product_subtotal_php += subtotal_php
@@ -8749,9 +9394,7 @@ def api_admin_update_item(order_id):
     if update_item_quantity(order_id, product_code, order_type, new_qty):
         record_order_qty_change(order_id, product_code, order_type, old_qty, new_qty)
         # Clear cache and reload to ensure inventory is recalculated (tab-scoped keys)
-        clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
+        clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         # Recalculate order total
         recalculate_order_total(order_id)
 
@@ -8784,7 +9427,7 @@ def api_admin_update_item(order_id):
 {f"• Supplier: {supplier}" if supplier else ""}
 
 {date_summary}"""
-            send_telegram_notification(telegram_msg)
+            notify_in_background(send_telegram_notification, telegram_msg)
         except Exception as notify_error:
             print(f"⚠️ Error sending admin item update notification: {notify_error}")
 
@@ -8838,7 +9481,7 @@ def api_admin_send_reminder(order_id):
         order.get('amount_paid_php', 0),
         order.get('remaining_balance_php', 0)
     )
-    items_text = '\n'.join([f"• {item['product_name']} ({item['order_type']} x{item['qty']})" for item in order.get('items', [])])
+    items_text = _format_items(order)
     
     message = f"""🔔 <b>Payment Reminder - PepHaul Order</b>
 
@@ -9085,9 +9728,7 @@ def api_admin_update_supplier(order_id):
             return jsonify({'error': 'Item not found in order'}), 404
         
         # Clear cache and recalculate order total
-        clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
+        clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         recalculate_order_total(order_id)
         
         return jsonify({
@@ -9100,7 +9741,6 @@ def api_admin_update_supplier(order_id):
         
     except Exception as e:
         print(f"❌ Error updating supplier: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': f'Failed to update supplier: {str(e)}'}), 500
 
@@ -9149,14 +9789,25 @@ def set_current_pephaul_tab(tab_name):
     except Exception as e:
         print(f"⚠️ Could not persist current tab: {e}")
 
+def _pephaul_worksheet_names():
+    """Titles get_pephaul_worksheet tries, in order: current tab, then the default and old names"""
+    return (get_current_pephaul_tab(), 'PepHaul Entry-01', 'PepHaul Entry')
+
 def get_pephaul_worksheet(spreadsheet=None):
     """Get the current PepHaul Entry worksheet"""
+    tab_name = get_current_pephaul_tab()
     if not spreadsheet:
         if not sheets_client:
             return None
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
+        # Reuse the cached Spreadsheet/worksheet handles instead of an open_by_key + worksheet() RPC per call.
+        # Handles go stale if a tab is renamed/deleted - callers' error paths call drop_stale_pephaul_worksheet.
+        for name in _pephaul_worksheet_names():
+            try:
+                return _get_worksheet(name)
+            except Exception:
+                continue
+        return None
     
-    tab_name = get_current_pephaul_tab()
     try:
         return spreadsheet.worksheet(tab_name)
     except:
@@ -9195,29 +9846,12 @@ def api_admin_list_pephaul_tabs():
             }), 500
         
         print(f"📋 Fetching PepHaul Entry tabs from Google Sheets...")
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        all_sheets = spreadsheet.worksheets()
-        
         # Filter tabs that start with "PepHaul Entry"
-        pephaul_tabs = [ws.title for ws in all_sheets if ws.title.startswith('PepHaul Entry')]
+        pephaul_tabs = [title for title in _sheet_titles(_get_spreadsheet()) if title.startswith('PepHaul Entry')]
         print(f"📋 Found {len(pephaul_tabs)} PepHaul Entry tabs: {pephaul_tabs}")
         
         # Sort tabs: "PepHaul Entry-01" first, then other numbered ones, then old "PepHaul Entry"
-        def sort_key(name):
-            if name == 'PepHaul Entry-01':
-                return (0, 1)  # Highest priority
-            if name == 'PepHaul Entry':
-                return (1, 0)  # Second priority (old name)
-            # Extract number from "PepHaul Entry-02", "PepHaul Entry-03", etc.
-            if '-' in name:
-                try:
-                    num = int(name.split('-')[-1])
-                    return (1, num)  # After -01, sorted by number
-                except:
-                    return (2, name)
-            return (2, name)
-        
-        pephaul_tabs.sort(key=sort_key)
+        pephaul_tabs.sort(key=pephaul_tab_sort_key)
         
         current_tab = get_current_pephaul_tab()
         print(f"📋 Current tab: {current_tab}")
@@ -9229,7 +9863,6 @@ def api_admin_list_pephaul_tabs():
         })
     except Exception as e:
         print(f"❌ Error listing tabs: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({
             'error': str(e),
@@ -9247,22 +9880,17 @@ def api_admin_create_pephaul_tab():
         return jsonify({'error': 'Sheets not configured'}), 500
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        all_sheets = spreadsheet.worksheets()
+        spreadsheet = _get_spreadsheet()
         
         # Find existing PepHaul Entry tabs
-        existing_tabs = [ws.title for ws in all_sheets if ws.title.startswith('PepHaul Entry')]
+        existing_tabs = [title for title in _sheet_titles(spreadsheet) if title.startswith('PepHaul Entry')]
         
         # Determine next tab number
         next_num = 1
         for tab_name in existing_tabs:
-            if '-' in tab_name:
-                try:
-                    num = int(tab_name.split('-')[-1])
-                    if num >= next_num:
-                        next_num = num + 1
-                except:
-                    pass
+            m = _PEPHAUL_TAB_RE.match(tab_name)
+            if m and m.group(1):
+                next_num = max(next_num, int(m.group(1)) + 1)
         
         # Create new tab name (e.g., "PepHaul Entry-01")
         new_tab_name = f"PepHaul Entry-{next_num:02d}"
@@ -9288,7 +9916,6 @@ def api_admin_create_pephaul_tab():
         })
     except Exception as e:
         print(f"Error creating tab: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
@@ -9340,7 +9967,6 @@ def api_admin_fix_pephaul_tab_headers():
         })
     except Exception as e:
         print(f"Error fixing tab headers: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
@@ -9397,9 +10023,7 @@ def api_admin_switch_pephaul_tab():
                 set_current_pephaul_tab(old_tab)
         
         # Clear cache to force reload from new tab (tab-scoped keys)
-        clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
+        clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         clear_cache_prefix('timeline_entries_')
         
         print(f"✅ Switched to PepHaul Entry tab: {tab_name} (Supplier: {supplier_filter})")
@@ -9412,7 +10036,6 @@ def api_admin_switch_pephaul_tab():
         })
     except Exception as e:
         print(f"❌ Error switching tab: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': str(e), 'details': 'Check server logs for more information'}), 500
 
@@ -9478,7 +10101,6 @@ def api_admin_tab_settings():
             })
         except Exception as e:
             print(f"Error updating tab settings: {e}")
-            import traceback
             traceback.print_exc()
             return jsonify({'error': str(e)}), 500
 
@@ -9521,64 +10143,71 @@ def api_admin_backfill_suppliers():
         return jsonify({'success': False, 'error': 'Google Sheets not configured'}), 500
     
     try:
-        spreadsheet = sheets_client.open_by_key(GOOGLE_SHEETS_ID)
-        worksheet = get_pephaul_worksheet(spreadsheet)
+        from gspread.utils import rowcol_to_a1
+        worksheet = get_pephaul_worksheet()
         if not worksheet:
             return jsonify({'success': False, 'error': 'PepHaul Entry worksheet not found'}), 404
         
-        # Get all values
-        all_values = worksheet.get_all_values()
-        if not all_values or len(all_values) <= 1:
-            return jsonify({'success': True, 'updated': 0, 'message': 'No orders found'})
-        
-        # Get headers
-        headers = _normalize_order_sheet_headers(all_values[0])
+        # Get headers (cached row 1)
+        headers = _normalize_order_sheet_headers(get_sheet_headers(worksheet))
         supplier_col_idx = headers.index('Supplier') if 'Supplier' in headers else None
         product_code_col_idx = headers.index('Product Code') if 'Product Code' in headers else None
         
         if supplier_col_idx is None or product_code_col_idx is None:
             return jsonify({'success': False, 'error': 'Required columns not found'}), 400
         
+        # Read just the Supplier and Product Code columns (rows 2+) in one batchGet instead of the whole sheet
+        def column_range(col_idx):
+            # Open-ended "E2:E" - the cached handle's row_count can be stale, so don't bound the read by it
+            col_letters = rowcol_to_a1(1, col_idx + 1).rstrip('0123456789')
+            return f"{col_letters}2:{col_letters}"
+        # major_dimension=COLUMNS: each range comes back as one flat list of cell strings, not a list per row
+        supplier_column, product_code_column = (
+            value_range[0] if value_range else []
+            for value_range in worksheet.batch_get(
+                [column_range(supplier_col_idx), column_range(product_code_col_idx)],
+                major_dimension='COLUMNS'
+            )
+        )
+        if not supplier_column and not product_code_column:
+            return jsonify({'success': True, 'updated': 0, 'message': 'No orders found'})
+        
         # Get products to build product_code -> supplier map
-        products = get_products()
-        code_to_supplier_map = {}
-        code_to_suppliers_map = defaultdict(set)
-        for p in products:
-            code = p['code']
-            supplier = p.get('supplier', 'Default')
-            code_to_suppliers_map[code].add(supplier)
-            if code not in code_to_supplier_map:
-                code_to_supplier_map[code] = supplier
+        # (a code listed under several suppliers maps to the first one in the price list)
+        code_default_supplier = {}
+        for p in get_products():
+            code_default_supplier.setdefault(p['code'], p.get('supplier', 'Default'))
         
         # Find rows that need supplier backfill
         updates = []
         updated_count = 0
+        skipped_count = 0  # rows missing a supplier whose product code isn't in the price list
+        last_row_idx = run_start = None  # previous queued row / first cell of the current run
         
-        for row_idx, row in enumerate(all_values[1:], start=2):  # Start from row 2 (skip header)
-            # Pad row if needed
-            while len(row) <= max(supplier_col_idx, product_code_col_idx):
-                row.append('')
-            
-            supplier_value = row[supplier_col_idx].strip() if len(row) > supplier_col_idx else ''
-            product_code = row[product_code_col_idx].strip() if len(row) > product_code_col_idx else ''
+        # Trailing blank cells are trimmed per column, hence zip_longest
+        for row_idx, (supplier_value, product_code) in enumerate(
+            zip_longest(supplier_column, product_code_column, fillvalue=''), start=2  # Start from row 2 (skip header)
+        ):
+            supplier_value = str(supplier_value).strip()
+            product_code = str(product_code).strip()
             
             # If supplier is missing but product code exists, infer supplier
             if not supplier_value and product_code:
-                if product_code in code_to_supplier_map:
-                    # Unique code - use mapped supplier
-                    inferred_supplier = code_to_supplier_map[product_code]
-                elif product_code in code_to_suppliers_map:
-                    # Multiple suppliers - default to first one (usually WWB)
-                    inferred_supplier = sorted(code_to_suppliers_map[product_code])[0]
-                else:
+                inferred_supplier = code_default_supplier.get(product_code)
+                if not inferred_supplier:
                     # Product code not found - skip
+                    skipped_count += 1
                     continue
                 
-                # Add to updates
-                updates.append({
-                    'range': f'E{row_idx}',  # Column E is Supplier
-                    'values': [[inferred_supplier]]
-                })
+                # Add to updates - a run of consecutive rows shares one range (fewer ranges per batch_update)
+                cell = rowcol_to_a1(row_idx, supplier_col_idx + 1)  # Supplier column (E in the standard layout)
+                if last_row_idx == row_idx - 1:
+                    updates[-1]['values'].append([inferred_supplier])
+                    updates[-1]['range'] = f"{run_start}:{cell}"
+                else:
+                    run_start = cell
+                    updates.append({'range': cell, 'values': [[inferred_supplier]]})
+                last_row_idx = row_idx
                 updated_count += 1
         
         # Batch update if there are updates
@@ -9590,19 +10219,18 @@ def api_admin_backfill_suppliers():
                 worksheet.batch_update(batch)
             
             # Clear cache to refresh data (new tab-scoped keys)
-            clear_cache_prefix('orders_')
-            clear_cache_prefix('inventory_')
-            clear_cache_prefix('order_stats_')
+            clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         
         return jsonify({
             'success': True,
             'updated': updated_count,
+            'skipped': skipped_count,
             'message': f'Successfully backfilled suppliers for {updated_count} order rows'
         })
     
     except Exception as e:
         print(f"❌ Error backfilling suppliers: {e}")
-        import traceback
+        drop_stale_pephaul_worksheet(e)
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -9635,12 +10263,14 @@ def api_admin_rename_pephaul_tab():
             return jsonify({'error': f'Tab "{old_name}" not found'}), 404
         
         # Check if new name already exists
-        all_sheets = [ws.title for ws in spreadsheet.worksheets()]
-        if new_name in all_sheets:
+        if new_name in _sheet_titles(spreadsheet):
             return jsonify({'error': f'Tab "{new_name}" already exists'}), 400
         
         # Rename the tab
         worksheet.update_title(new_name)
+        # Cached handles under either title are now wrong (old title is gone / new title was a miss or another sheet)
+        invalidate_spreadsheet_cache(old_name)
+        invalidate_spreadsheet_cache(new_name)
         
         # If this was the current tab, update session
         current_tab = get_current_pephaul_tab()
@@ -9648,9 +10278,7 @@ def api_admin_rename_pephaul_tab():
             set_current_pephaul_tab(new_name)
         
         # Clear cache
-        clear_cache_prefix('orders_')
-        clear_cache_prefix('inventory_')
-        clear_cache_prefix('order_stats_')
+        clear_cache_prefix('orders_', 'inventory_', 'order_stats_')
         
         print(f"✅ Renamed tab from '{old_name}' to '{new_name}'")
         
@@ -9662,7 +10290,6 @@ def api_admin_rename_pephaul_tab():
         })
     except Exception as e:
         print(f"Error renaming tab: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
 
@@ -9680,17 +10307,17 @@ def _initialize_services():
     except Exception as e:
         print(f"⚠️ Warning: Could not initialize Google services: {e}")
         print("   App will start but some features may not work")
-        import traceback
         traceback.print_exc()
 
     try:
         print("📋 Ensuring worksheets exist...")
         ensure_worksheets_exist()
+        if sheets_client:
+            _ensure_timeline_sheet()
         print("✅ Worksheets check complete")
     except Exception as e:
         print(f"⚠️ Warning: Could not ensure worksheets exist: {e}")
         print("   App will start but some sheets may need to be created manually")
-        import traceback
         traceback.print_exc()
     
     # Load supplier filters from Google Sheets as fallback if JSON was empty